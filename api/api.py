@@ -1,8 +1,23 @@
 import uvicorn
 import os
-from fastapi import FastAPI
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from sse_starlette.sse import EventSourceResponse
 from models import UserProfile
-from main import find_eb1a_lawyers
+from main import find_eb1a_lawyers, stream_eb1a_lawyers
+from graph import get_eb1a_agent
+from singleflight import SingleFlight, profile_key
+from jobs import JobRunner, get_job_store
+from http_clients import close_http_clients
+from chunking import get_encoding
+from lawyer_index import get_lawyer_index
+from metrics import render_metrics
+import config
 
 # --- Start of Debugging Code ---
 print("--- Verifying Environment Variables at Startup ---")
@@ -21,27 +36,143 @@ else:
 print("----------------------------------------------")
 # --- End of Debugging Code ---
 
+# Identical profiles submitted while a run is in flight share that run's result
+recommendation_flights = SingleFlight()
+
+async def run_recommendation(user_profile: UserProfile, bypass_cache: bool = False,
+                             include_summary: bool = True) -> dict:
+    return await recommendation_flights.do(
+        profile_key(user_profile, bypass_cache, include_summary),
+        lambda: find_eb1a_lawyers(user_profile, bypass_cache=bypass_cache, include_summary=include_summary)
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the graph once at startup so the first request doesn't pay for it
+    get_eb1a_agent()
+    # tiktoken may download its encoding on first use; do it off the event loop now
+    await asyncio.to_thread(get_encoding)
+    # Build or refresh the local lawyer index from the scraped CSVs before taking traffic
+    if config.LAWYER_INDEX_ENABLED:
+        await asyncio.to_thread(get_lawyer_index)
+
+    # Background workers for /recommendations/jobs and /recommendations/batch
+    app.state.job_runner = JobRunner(
+        get_job_store(),
+        run_recommendation,
+        workers=config.JOB_WORKERS,
+        poll_interval=config.JOB_POLL_INTERVAL_SECONDS
+    )
+    app.state.job_runner.start()
+    yield
+    await app.state.job_runner.stop()
+    await close_http_clients()
+
 app = FastAPI(
     title="EB-1A Lawyer Recommendation API",
     description="An API to recommend EB-1A immigration lawyers based on user profiles.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 @app.get("/", tags=["Health Check"])
 async def read_root():
     return {"status": "ok"}
 
+@app.get("/metrics", tags=["Health Check"], response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus text-format metrics: per-node latency, LLM call latency, tokens, cost,
+    retries, cache hits and errors.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.post("/recommendations", tags=["Recommendations"])
-async def get_recommendations(user_profile: UserProfile):
+async def get_recommendations(user_profile: UserProfile, x_cache_bypass: bool = Header(False)):
     """
     Takes a user profile and returns a list of recommended EB-1A lawyers.
+    Send `X-Cache-Bypass: true` to skip cached LLM responses.
     """
-    full_output = await find_eb1a_lawyers(user_profile)
+    # Only the lawyers are returned, so don't wait on the summary LLM call
+    full_output = await run_recommendation(user_profile, bypass_cache=x_cache_bypass, include_summary=False)
     
     # Extract just the lawyer profiles from the full output
     lawyer_profiles = [rec["lawyer"] for rec in full_output.get("recommendations", [])]
     
     return lawyer_profiles
 
+@app.post("/recommendations/stream", tags=["Recommendations"])
+async def stream_recommendations(user_profile: UserProfile, x_cache_bypass: bool = Header(False)):
+    """
+    Server-Sent Events variant of /recommendations.
+    Emits `queries`, one `search_result` per query, `profiles`, `scores`, `recommendations`
+    and `progress` events as the graph runs, then `summary` and a final `done` event with the full output.
+    """
+    async def event_generator():
+        async for event, data in stream_eb1a_lawyers(user_profile, bypass_cache=x_cache_bypass):
+            yield {"event": event, "data": json.dumps(data)}
+
+    return EventSourceResponse(event_generator())
+
+async def enqueue_jobs(profiles: List[UserProfile], bypass_cache: bool, batch_id: str = None) -> List[str]:
+    store = get_job_store()
+    if await asyncio.to_thread(store.count_queued) + len(profiles) > config.JOB_MAX_QUEUED:
+        raise HTTPException(status_code=429, detail="Too many queued jobs, try again later.")
+    job_ids = await asyncio.to_thread(store.create, profiles, bypass_cache, batch_id)
+    app.state.job_runner.notify()
+    return job_ids
+
+@app.post("/recommendations/jobs", status_code=202, tags=["Jobs"])
+async def create_recommendation_job(user_profile: UserProfile, x_cache_bypass: bool = Header(False)):
+    """
+    Queues a recommendation run and returns its job id immediately.
+    Poll `GET /recommendations/jobs/{job_id}` for the status and result.
+    """
+    job_ids = await enqueue_jobs([user_profile], x_cache_bypass)
+    return {"job_id": job_ids[0], "status": "queued"}
+
+@app.get("/recommendations/jobs/{job_id}", tags=["Jobs"])
+async def get_recommendation_job(job_id: str):
+    """
+    Returns the job status (`queued`, `running`, `succeeded`, `failed`) and, once finished,
+    the full recommendation output or the error.
+    """
+    job = await asyncio.to_thread(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/recommendations/batch", status_code=202, tags=["Jobs"])
+async def create_recommendation_batch(user_profiles: List[UserProfile], x_cache_bypass: bool = Header(False)):
+    """
+    Queues one job per profile and returns the batch id and job ids.
+    Poll `GET /recommendations/batch/{batch_id}` for all results at once.
+    """
+    if not user_profiles:
+        raise HTTPException(status_code=400, detail="At least one profile is required.")
+    if len(user_profiles) > config.JOB_BATCH_MAX_PROFILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch can contain at most {config.JOB_BATCH_MAX_PROFILES} profiles."
+        )
+    batch_id = uuid.uuid4().hex
+    job_ids = await enqueue_jobs(user_profiles, x_cache_bypass, batch_id)
+    return {"batch_id": batch_id, "job_ids": job_ids, "status": "queued"}
+
+@app.get("/recommendations/batch/{batch_id}", tags=["Jobs"])
+async def get_recommendation_batch(batch_id: str):
+    """
+    Returns every job in the batch, in submission order.
+    """
+    jobs = await asyncio.to_thread(get_job_store().get_batch, batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return {
+        "batch_id": batch_id,
+        "completed": sum(job["status"] in ("succeeded", "failed") for job in jobs),
+        "total": len(jobs),
+        "jobs": jobs
+    }
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,238 @@
+# benchmark_agent.py - Offline load benchmark for the full EB-1A agent.
+#
+# Starts fake_llm_server.py on a local port, points both ChatOpenAI clients at it
+# and drives either find_eb1a_lawyers directly ("graph") or the FastAPI app
+# ("api", POST /recommendations in-process) under concurrent load. Reports
+# p50/p95/p99 latency, requests per second, errors and memory.
+#
+# Usage:
+#   python benchmark_agent.py --requests 200 --concurrency 20 --latency-ms 300 --jitter-ms 100
+#   python benchmark_agent.py --target api --failure-rate 0.05 --max-p95-ms 5000 --json
+#
+# Exits with status 1 when a --max-* threshold is exceeded, so it can gate CI and deploys.
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+import uvicorn
+
+from fake_llm_server import add_arguments, create_app, settings_from_args
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_server(settings, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(create_app(settings), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def configure_environment(args, port: int):
+    """Must run before the app modules are imported: they read config at import time."""
+    base_url = f"http://127.0.0.1:{port}"
+    os.environ["PERPLEXITY_BASE_URL"] = base_url
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ.setdefault("PERPLEXITY_API_KEY", "benchmark")
+    os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+    os.environ["LLM_CACHE_ENABLED"] = "true" if args.cache else "false"
+    if args.cache:
+        os.environ["LLM_CACHE_PATH"] = args.cache_path
+    os.environ["JOB_DB_PATH"] = args.job_db_path
+    # Every request must take the full path to the fake server: warm cohort pools or local index
+    # hits would skip the searches being measured and read the developer's real data files
+    os.environ["COHORT_CACHE_ENABLED"] = "false"
+    os.environ["LAWYER_INDEX_ENABLED"] = "false"
+    os.environ["HTTP_MAX_CONNECTIONS"] = str(max(args.concurrency * 10, 100))
+    os.environ["HTTP_MAX_KEEPALIVE_CONNECTIONS"] = str(max(args.concurrency * 5, 20))
+
+
+def make_profiles(count: int, unique: bool):
+    from models import UserProfile
+
+    industries = ["Technology", "Research", "Healthcare", "Arts"]
+    nationalities = ["Indian", "Chinese", "Brazilian", "Nigerian"]
+    locations = ["California", "New York", "Texas", None]
+    profiles = []
+    for i in range(count):
+        # Unique names keep single-flight from coalescing identical requests
+        profiles.append(UserProfile(
+            name=f"Benchmark User {i if unique else 0}",
+            occupation="Research Scientist",
+            industry=industries[i % len(industries)],
+            nationality=nationalities[i % len(nationalities)],
+            budget_range={"min": 10000, "max": 25000},
+            location_preference=locations[i % len(locations)],
+            timeline_urgency="moderate",
+            achievements=["Published 30 papers", "2 patents", "Keynote speaker"],
+            publications=30,
+            citations=800,
+            priority_factors=["success_rate", "cost", "location"],
+        ))
+    return profiles
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+async def run_load(target: str, profiles, concurrency: int, warmup_profiles=(), trace_memory: bool = False):
+    """Run warmup then measured load in one event loop (the pooled HTTP clients are loop-bound)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    if target == "api":
+        import httpx
+        from api import app
+
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None)
+
+        async def call(profile):
+            response = await client.post("/recommendations", json=profile.model_dump(mode="json"))
+            response.raise_for_status()
+    else:
+        from main import find_eb1a_lawyers
+        from graph import get_eb1a_agent
+
+        get_eb1a_agent()
+
+        async def call(profile):
+            await find_eb1a_lawyers(profile)
+
+    async def one(profile):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call(profile)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    try:
+        await asyncio.gather(*(one(profile) for profile in warmup_profiles))
+        latencies.clear()
+        errors.clear()
+
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(profile) for profile in profiles))
+        elapsed = time.perf_counter() - start
+    finally:
+        if target == "api":
+            await client.aclose()
+            await lifespan.__aexit__(None, None, None)
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load benchmark for the EB-1A agent.")
+    parser.add_argument("--target", choices=["graph", "api"], default="graph")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2, help="Requests run (and discarded) before measuring")
+    parser.add_argument("--same-profile", action="store_true", help="Send identical profiles (exercises single-flight)")
+    parser.add_argument("--cache", action="store_true", help="Keep the LLM response cache enabled")
+    parser.add_argument("--cache-path", default="benchmark_llm_cache.sqlite3")
+    parser.add_argument("--job-db-path", default="benchmark_jobs.sqlite3")
+    parser.add_argument("--trace-memory", action="store_true", help="Report Python heap peak via tracemalloc (slower)")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if p95 latency exceeds this")
+    parser.add_argument("--max-error-rate", type=float, help="Fail if the error rate (0-1) exceeds this")
+    parser.add_argument("--min-rps", type=float, help="Fail if throughput falls below this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = start_fake_server(settings_from_args(args), port)
+    configure_environment(args, port)
+
+    # Warmup profiles get their own names so they never coalesce with measured requests
+    warmup_profiles = make_profiles(args.warmup, True)
+    for profile in warmup_profiles:
+        profile.name = f"Warmup {profile.name}"
+
+    latencies, errors, elapsed = asyncio.run(run_load(
+        args.target,
+        make_profiles(args.requests, not args.same_profile),
+        args.concurrency,
+        warmup_profiles=warmup_profiles,
+        trace_memory=args.trace_memory
+    ))
+    heap_peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+
+    latencies.sort()
+    report = {
+        "target": args.target,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "fake_llm": vars(settings_from_args(args)),
+        "succeeded": len(latencies),
+        "errors": len(errors),
+        "error_rate": len(errors) / args.requests if args.requests else 0.0,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99": round(percentile(latencies, 0.99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        },
+        "upstream_calls": server.config.app.state.requests,
+        # ru_maxrss is KiB on Linux
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "heap_peak_mb": round(heap_peak / 1024 / 1024, 1) if heap_peak is not None else None,
+        "sample_errors": errors[:5],
+    }
+
+    server.should_exit = True
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        latency = report["latency_ms"]
+        print(f"Target: {args.target}   requests: {args.requests}   concurrency: {args.concurrency}")
+        print(f"Succeeded: {report['succeeded']}   errors: {report['errors']} ({report['error_rate']:.1%})")
+        print(f"Throughput: {report['rps']} req/s over {report['elapsed_s']}s "
+              f"({report['upstream_calls']} fake LLM calls incl. warmup)")
+        print(f"Latency ms: mean {latency['mean']}  p50 {latency['p50']}  p95 {latency['p95']}  "
+              f"p99 {latency['p99']}  max {latency['max']}")
+        print(f"Memory: max RSS {report['max_rss_mb']} MB"
+              + (f", heap peak {report['heap_peak_mb']} MB" if heap_peak is not None else ""))
+        for error in report["sample_errors"]:
+            print(f"  error: {error}")
+
+    failures = []
+    if args.max_p95_ms is not None and report["latency_ms"]["p95"] > args.max_p95_ms:
+        failures.append(f"p95 {report['latency_ms']['p95']} ms > {args.max_p95_ms} ms")
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {report['error_rate']:.3f} > {args.max_error_rate}")
+    if args.min_rps is not None and report["rps"] < args.min_rps:
+        failures.append(f"throughput {report['rps']} req/s < {args.min_rps}")
+    for failure in failures:
+        print(f"FAILED: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# benchmark_graph.py - Measures the per-request cost of getting a compiled agent.
+#
+# Compares rebuilding + compiling the StateGraph on every request (the old behaviour)
+# with reusing the shared compiled graph from get_eb1a_agent(). No LLM calls are made.
+#
+# Usage: python benchmark_graph.py [iterations]
+
+import statistics
+import sys
+import time
+
+from graph import create_eb1a_agent, get_eb1a_agent, set_eb1a_agent
+
+
+def time_calls(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<32} mean {statistics.mean(samples):9.4f} ms   "
+          f"p50 {statistics.median(samples):9.4f} ms   p95 {p95:9.4f} ms")
+
+
+def main(iterations=200):
+    print(f"Getting a compiled agent, {iterations} iterations\n")
+
+    report("compile per request (before)", time_calls(create_eb1a_agent, iterations))
+
+    set_eb1a_agent(None)
+    report("shared compiled agent (after)", time_calls(get_eb1a_agent, iterations))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,41 @@
+from functools import lru_cache
+from typing import List
+
+import tiktoken
+
+import config
+
+# Rough chars-per-token ratio used when the tiktoken encoding can't be loaded
+# (tiktoken downloads its BPE files on first use, which fails on offline hosts).
+APPROX_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    """Load the tokenizer used for chunking, or None if it isn't available."""
+    try:
+        return tiktoken.get_encoding(config.EXTRACT_TOKENIZER)
+    except Exception:
+        return None
+
+
+def split_by_tokens(text: str, max_tokens: int, overlap: int = 0) -> List[str]:
+    """Split text into windows of at most max_tokens tokens, overlapping by `overlap` tokens.
+
+    Overlap keeps a lawyer's name and contact details together when they straddle a boundary.
+    """
+    max_tokens = max(1, max_tokens)
+    overlap = min(max(0, overlap), max_tokens - 1)
+    step = max_tokens - overlap
+
+    encoding = get_encoding()
+    if encoding is None:
+        size, stride = max_tokens * APPROX_CHARS_PER_TOKEN, step * APPROX_CHARS_PER_TOKEN
+        if len(text) <= size:
+            return [text]
+        return [text[start:start + size] for start in range(0, len(text) - overlap * APPROX_CHARS_PER_TOKEN, stride)]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return [text]
+    return [encoding.decode(tokens[start:start + max_tokens]) for start in range(0, len(tokens) - overlap, step)]
@@ -0,0 +1,167 @@
+import hashlib
+import itertools
+import json
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from models import LawyerProfile, UserProfile
+from lawyer_index import STATE_NAMES, US_STATES
+
+import config
+
+# Warm lawyer pools for common user cohorts. Most traffic falls into a few combinations of
+# the profile fields that drive the live search (e.g. Indian nationals in Technology in
+# California), so precompute_cohorts.py runs query generation, the Perplexity searches and
+# profile extraction once per cohort and stores the result here. A request whose profile
+# maps onto a warm cohort loads the pool and goes straight to its personalized ranking.
+#
+# Only the cohort fields pick the pool; everything else in the profile (occupation,
+# achievements, budget, priorities) still feeds the per-request scoring.
+
+COHORT_FIELDS = ("nationality", "industry", "location_preference")
+ANY = "any"
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_location(location: Optional[str]) -> str:
+    """State-level cohort location: 'California', 'CA' and 'San Jose, CA' all map to 'ca'."""
+    location = " ".join((location or "").split())
+    if not location:
+        return ANY
+    if location.lower() in US_STATES:
+        return US_STATES[location.lower()].lower()
+    code = location.rsplit(",", 1)[-1].strip().upper()
+    if code in STATE_NAMES and ("," in location or code == location.upper()):
+        return code.lower()
+    return _NON_WORD.sub(" ", location.lower()).strip() or ANY
+
+
+def cohort_of(user_profile: UserProfile) -> Dict[str, str]:
+    """The normalized cohort a profile belongs to."""
+    return {
+        "nationality": _NON_WORD.sub(" ", user_profile.nationality.lower()).strip() or ANY,
+        "industry": _NON_WORD.sub(" ", user_profile.industry.lower()).strip() or ANY,
+        "location_preference": normalize_location(user_profile.location_preference),
+    }
+
+
+def cohort_key(cohort: Dict[str, str]) -> str:
+    payload = json.dumps([cohort[field] for field in COHORT_FIELDS], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def expand_matrix(matrix: Dict[str, List[Optional[str]]]) -> List[Dict[str, Optional[str]]]:
+    """Every combination of the cohort matrix values, e.g. 2 nationalities x 2 industries x 2 locations = 8."""
+    return [dict(zip(COHORT_FIELDS, values)) for values in itertools.product(*(matrix[field] for field in COHORT_FIELDS))]
+
+
+def cohort_profile(cohort: Dict[str, Optional[str]]) -> UserProfile:
+    """A representative profile for a cohort, filled in from COHORT_PROFILE_DEFAULTS."""
+    defaults = dict(config.COHORT_PROFILE_DEFAULTS)
+    defaults["occupation"] = defaults["occupation"].format(**cohort)
+    return UserProfile(name="cohort", **defaults, **cohort)
+
+
+class CohortStore:
+    """Precomputed search queries, search results and lawyer pools per cohort, in SQLite with an in-memory copy."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._memory: Dict[str, tuple] = {}
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cohort_pools (
+                    key TEXT PRIMARY KEY,
+                    cohort TEXT NOT NULL,
+                    search_queries TEXT NOT NULL,
+                    raw_search_results TEXT NOT NULL,
+                    lawyer_profiles TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, cohort: Dict[str, str]) -> Optional[dict]:
+        """The warm pool for a cohort, or None if it was never precomputed or has expired."""
+        key = cohort_key(cohort)
+        entry = self._memory.get(key)
+        if entry is None or entry[1] <= time.time():
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT search_queries, raw_search_results, lawyer_profiles, expires_at FROM cohort_pools WHERE key = ?",
+                    (key,)
+                ).fetchone()
+            if row is None or row[3] <= time.time():
+                self._memory.pop(key, None)
+                return None
+            entry = ({
+                "search_queries": json.loads(row[0]),
+                "raw_search_results": json.loads(row[1]),
+                "lawyer_profiles": json.loads(row[2]),
+            }, row[3])
+            self._memory[key] = entry
+        pool = entry[0]
+        # Fresh copies, since graph nodes mutate their state
+        return {
+            "search_queries": list(pool["search_queries"]),
+            "raw_search_results": [dict(result) for result in pool["raw_search_results"]],
+            "lawyer_profiles": [LawyerProfile(**profile) for profile in pool["lawyer_profiles"]],
+        }
+
+    def set(self, cohort: Dict[str, str], search_queries: List[str], raw_search_results: List[dict],
+            lawyer_profiles: List[LawyerProfile], ttl: float):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO cohort_pools
+                    (key, cohort, search_queries, raw_search_results, lawyer_profiles, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    cohort_key(cohort), json.dumps(cohort), json.dumps(search_queries),
+                    json.dumps(raw_search_results, ensure_ascii=False),
+                    json.dumps([profile.model_dump() for profile in lawyer_profiles], ensure_ascii=False),
+                    now, now + ttl
+                )
+            )
+        self._memory.pop(cohort_key(cohort), None)
+
+    def list(self) -> List[dict]:
+        """Every stored cohort with its pool size and expiry, for reporting."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT cohort, lawyer_profiles, created_at, expires_at FROM cohort_pools ORDER BY created_at"
+            ).fetchall()
+        return [
+            {"cohort": json.loads(cohort), "lawyers": len(json.loads(profiles)), "created_at": created_at,
+             "expires_at": expires_at}
+            for cohort, profiles, created_at, expires_at in rows
+        ]
+
+    def clear(self):
+        self._memory.clear()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cohort_pools")
+
+
+_store: Optional[CohortStore] = None
+
+
+def get_cohort_store() -> CohortStore:
+    global _store
+    if _store is None:
+        _store = CohortStore(config.COHORT_CACHE_PATH)
+    return _store
@@ -0,0 +1,111 @@
+import json
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Runtime tuning knobs. Everything can be overridden from the environment / .env file.
+
+# Upstream LLM APIs (point both at a local stand-in for offline benchmarks, see benchmark_agent.py)
+PERPLEXITY_BASE_URL = os.environ.get("PERPLEXITY_BASE_URL", "https://api.perplexity.ai")
+OPENROUTER_BASE_URL = os.environ.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+# Perplexity search fan-out
+SEARCH_CONCURRENCY = int(os.environ.get("SEARCH_CONCURRENCY", "5"))
+SEARCH_TIMEOUT_SECONDS = float(os.environ.get("SEARCH_TIMEOUT_SECONDS", "45"))
+
+# LLM response cache
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_MEMORY_ENTRIES = int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+# Per-node TTLs in seconds (0 disables caching for that node). Search results go stale
+# much faster than generated queries or extractions from identical input.
+LLM_CACHE_TTL_SECONDS = {
+    "generate_queries": float(os.environ.get("LLM_CACHE_TTL_QUERIES", str(7 * 24 * 3600))),
+    "search_lawyers": float(os.environ.get("LLM_CACHE_TTL_SEARCH", str(6 * 3600))),
+    "extract_profiles": float(os.environ.get("LLM_CACHE_TTL_EXTRACT", str(24 * 3600))),
+    "generate_recommendations": float(os.environ.get("LLM_CACHE_TTL_RECOMMEND", str(24 * 3600))),
+}
+
+# Background recommendation jobs
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_MAX_QUEUED = int(os.environ.get("JOB_MAX_QUEUED", "500"))
+JOB_BATCH_MAX_PROFILES = int(os.environ.get("JOB_BATCH_MAX_PROFILES", "100"))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1"))
+# Running jobs whose worker hasn't renewed this lease (a crashed or killed process) are requeued
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "60"))
+
+# Pooled HTTP clients for the Perplexity / OpenRouter APIs
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_READ_TIMEOUT_SECONDS = float(os.environ.get("HTTP_READ_TIMEOUT_SECONDS", "60"))
+HTTP_POOL_TIMEOUT_SECONDS = float(os.environ.get("HTTP_POOL_TIMEOUT_SECONDS", "10"))
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Map-reduce profile extraction
+EXTRACT_CONCURRENCY = int(os.environ.get("EXTRACT_CONCURRENCY", "5"))
+EXTRACT_CHUNK_TOKENS = int(os.environ.get("EXTRACT_CHUNK_TOKENS", "3000"))
+EXTRACT_CHUNK_OVERLAP_TOKENS = int(os.environ.get("EXTRACT_CHUNK_OVERLAP_TOKENS", "100"))
+EXTRACT_TOKENIZER = os.environ.get("EXTRACT_TOKENIZER", "cl100k_base")
+
+# Local lawyer index (see lawyer_index.py), searched before Perplexity
+LAWYER_INDEX_ENABLED = os.environ.get("LAWYER_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+LAWYER_INDEX_PATH = os.environ.get("LAWYER_INDEX_PATH", "lawyer_index.sqlite3")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAWYER_INDEX_SOURCES = [
+    path.strip() for path in os.environ.get(
+        "LAWYER_INDEX_SOURCES",
+        ",".join(os.path.join(REPO_ROOT, name) for name in (
+            "lawyer_corpus.sqlite3", "lawyers.csv", "lawyers_5_pages.csv", "eb1_lawyers.csv"
+        ))
+    ).split(",") if path.strip()
+]
+# Full-text terms every local hit must contain, also used to rank them (bm25). Empty by default:
+# LAWYER_INDEX_EB1_ONLY already restricts hits to lawyers vetted for EB-1 expertise
+LAWYER_INDEX_QUERY = os.environ.get("LAWYER_INDEX_QUERY", "")
+# How often the running API checks its sources for changes and re-indexes them
+LAWYER_INDEX_REFRESH_SECONDS = float(os.environ.get("LAWYER_INDEX_REFRESH_SECONDS", "300"))
+# Only serve lawyers vetted by lawyer_finder.py; unvetted listings are general immigration lawyers
+LAWYER_INDEX_EB1_ONLY = os.environ.get("LAWYER_INDEX_EB1_ONLY", "true").lower() in ("1", "true", "yes")
+LAWYER_INDEX_MIN_RATING = float(os.environ["LAWYER_INDEX_MIN_RATING"]) if os.environ.get("LAWYER_INDEX_MIN_RATING") else None
+# Skip the live search only when the index returns at least this many lawyers
+LAWYER_INDEX_MIN_RESULTS = int(os.environ.get("LAWYER_INDEX_MIN_RESULTS", "5"))
+LAWYER_INDEX_MAX_RESULTS = int(os.environ.get("LAWYER_INDEX_MAX_RESULTS", "20"))
+
+# Warm cohort pools (see cohorts.py), precomputed by precompute_cohorts.py
+COHORT_CACHE_ENABLED = os.environ.get("COHORT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+COHORT_CACHE_PATH = os.environ.get("COHORT_CACHE_PATH", "cohort_cache.sqlite3")
+# Pools are built from Perplexity results, so refresh them at least this often
+COHORT_CACHE_TTL_SECONDS = float(os.environ.get("COHORT_CACHE_TTL", str(24 * 3600)))
+# Values precomputed for each cohort field; null location means "no preference".
+# Override with COHORT_MATRIX_JSON='{"nationality": [...], "industry": [...], "location_preference": [...]}'
+COHORT_MATRIX = json.loads(os.environ.get("COHORT_MATRIX_JSON") or json.dumps({
+    "nationality": ["Indian", "Chinese"],
+    "industry": ["Technology", "Research"],
+    "location_preference": ["California", "New York", None],
+}))
+# The rest of the representative profile a cohort is searched with ("{industry}" etc. are filled in)
+COHORT_PROFILE_DEFAULTS = json.loads(os.environ.get("COHORT_PROFILE_JSON") or json.dumps({
+    "occupation": "{industry} professional",
+    "budget_range": {"min": 10000, "max": 30000},
+    "timeline_urgency": "moderate",
+    "achievements": [],
+    "priority_factors": ["success_rate", "industry_expertise"],
+}))
+COHORT_PRECOMPUTE_CONCURRENCY = int(os.environ.get("COHORT_PRECOMPUTE_CONCURRENCY", "2"))
+
+# Metrics and tracing
+# Attach a structured per-request trace (node timings, LLM calls, tokens, cost) to the output
+REQUEST_TRACE_ENABLED = os.environ.get("REQUEST_TRACE_ENABLED", "false").lower() in ("1", "true", "yes")
+# USD per million (prompt, completion) tokens, used for the cost counter.
+# Override with LLM_PRICING_JSON='{"model": [prompt, completion], ...}'
+LLM_PRICING = {
+    "sonar": (1.0, 1.0),
+    "mistralai/mistral-small-3.2-24b-instruct:free": (0.0, 0.0),
+}
+LLM_PRICING.update({
+    model: tuple(prices) for model, prices in json.loads(os.environ.get("LLM_PRICING_JSON", "{}")).items()
+})
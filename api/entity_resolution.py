@@ -0,0 +1,350 @@
+import csv
+import re
+import sys
+import unicodedata
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from models import LawyerProfile
+
+from scraped_values import MISSING_VALUES
+
+# Entity resolution for lawyer records. The same lawyer shows up under several search
+# queries and scraped pages with small differences ("John A. Smith, Esq." / "Smith, John",
+# "(212) 555-0100" / "212.555.0100"). Records are first grouped into blocks that share a
+# cheap key (name prefix + initial, email, phone, profile URL, website domain), and only
+# records in the same block are compared with the fuzzy match rules, so resolving n
+# records costs roughly the sum of squared block sizes instead of n². Matches are merged
+# with union-find, so A~B and B~C puts all three in one entity.
+#
+# Resolve a scraped CSV by hand with: python entity_resolution.py lawyers.csv [--output merged.csv]
+
+# A name that matches at least this well is the same lawyer unless the firms disagree
+NAME_THRESHOLD = 0.9
+# Firms at least this similar back up a weaker (initials-only) name match
+FIRM_THRESHOLD = 0.8
+# Firms below this similarity veto a name match that no shared contact detail supports
+FIRM_CONFLICT = 0.5
+# Blocks larger than this (a very common name, a big firm's switchboard) aren't compared
+# pairwise; their records can still match through their other keys
+MAX_BLOCK_SIZE = 100
+
+NAME_TITLES = {
+    "mr", "mrs", "ms", "dr", "esq", "esquire", "attorney", "atty", "lawyer", "jd", "llm", "phd",
+    "hon", "jr", "sr", "ii", "iii",
+}
+FIRM_STOPWORDS = {
+    "the", "of", "and", "law", "laws", "firm", "group", "office", "offices", "llp", "llc", "pllc", "pc", "pa",
+    "plc", "ltd", "inc", "associates", "attorneys", "attorney", "at", "immigration", "lawyers", "legal",
+}
+# Shared by unrelated lawyers, so they say nothing about identity
+DIRECTORY_DOMAINS = {
+    "avvo.com", "justia.com", "martindale.com", "lawyers.com", "superlawyers.com", "findlaw.com", "linkedin.com",
+    "facebook.com", "instagram.com", "twitter.com", "x.com", "youtube.com", "yelp.com", "google.com",
+}
+FREEMAIL_DOMAINS = {
+    "gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "aol.com", "icloud.com", "protonmail.com", "live.com",
+}
+# Scraper placeholders plus the ones the extraction LLM writes for fields it couldn't find.
+# These are shared by unrelated records, so they must never count as a match.
+PLACEHOLDERS = MISSING_VALUES | {"n/a", "na", "none", "null", "unknown", "not provided", "not available", "-"}
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STATE = re.compile(r",\s*([A-Za-z]{2})\b")
+
+
+def _present(value: Optional[str]) -> str:
+    """The value with whitespace collapsed, or '' if it is a placeholder like 'Link not found'."""
+    value = " ".join(str(value or "").split())
+    return "" if value.lower() in PLACEHOLDERS else value
+
+
+def _ascii(value: str) -> str:
+    return unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def name_tokens(name: str) -> Tuple[str, ...]:
+    """'Smith, John A., Esq.' -> ('john', 'a', 'smith'): titles dropped, 'Last, First' reordered."""
+    name = _ascii(_present(name))
+    segments = [[word for word in _WORD.findall(segment) if word not in NAME_TITLES] for segment in name.split(",")]
+    segments = [segment for segment in segments if segment]
+    if len(segments) >= 2:
+        segments = segments[1:] + segments[:1]
+    return tuple(word for segment in segments for word in segment)
+
+
+def firm_tokens(firm: str) -> Tuple[str, ...]:
+    return tuple(word for word in _WORD.findall(_ascii(_present(firm))) if word not in FIRM_STOPWORDS)
+
+
+def normalize_phone(phone: str) -> str:
+    """Last 10 digits, so '+1 (212) 555-0100' and '212.555.0100' agree; '' if too short to be a number."""
+    digits = re.sub(r"\D", "", _present(phone))
+    return digits[-10:] if len(digits) >= 7 else ""
+
+
+def _registered_domain(host: str) -> str:
+    host = host.lower().split(":")[0].strip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def _is_shared_domain(domain: str, shared: set) -> bool:
+    return any(domain == known or domain.endswith("." + known) for known in shared)
+
+
+def _split_url(website: str) -> Tuple[str, str]:
+    """(host, path) of a URL, or ('', '') unless it has a dotted host."""
+    website = _present(website)
+    if not website or " " in website:
+        return "", ""
+    parts = urlsplit(website if "://" in website else "//" + website)
+    host = _registered_domain(parts.netloc)
+    return (host, parts.path.rstrip("/").lower()) if "." in host else ("", "")
+
+
+def website_domain(website: str) -> str:
+    """'https://www.smithlaw.com/team' -> 'smithlaw.com'; '' for directories like Avvo."""
+    domain = _split_url(website)[0]
+    return "" if not domain or _is_shared_domain(domain, DIRECTORY_DOMAINS) else domain
+
+
+def normalize_url(website: str) -> str:
+    """'https://www.avvo.com/attorneys/x.html?utm=1' -> 'avvo.com/attorneys/x.html': one page, one identity."""
+    host, path = _split_url(website)
+    return host + path if host else ""
+
+
+def normalize_email(email: str) -> str:
+    """Lowercased address, or '' unless it looks like one ('name@domain.tld')."""
+    email = _present(email).lower()
+    local, _, domain = email.rpartition("@")
+    return email if local and "." in domain and " " not in email else ""
+
+
+def email_domain(email: str) -> str:
+    domain = email.rpartition("@")[2]
+    return "" if not domain or _is_shared_domain(domain, FREEMAIL_DOMAINS | DIRECTORY_DOMAINS) else domain
+
+
+def _similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _firms_conflict(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    return bool(a and b) and _similarity(" ".join(a), " ".join(b)) < FIRM_CONFLICT
+
+
+def _names_conflict(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    return bool(a and b) and not _initials_match(a, b) and _similarity(" ".join(a), " ".join(b)) < NAME_THRESHOLD
+
+
+def _initials_match(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    """Same last name, and first names that are equal or one is the other's initial ('j' / 'john')."""
+    if a[-1] != b[-1] or len(a) < 2 or len(b) < 2:
+        return False
+    first_a, first_b = a[0], b[0]
+    return first_a == first_b or (min(len(first_a), len(first_b)) == 1 and first_a[0] == first_b[0])
+
+
+class EntityRecord:
+    """The normalized fields of one record that identity is judged on."""
+
+    __slots__ = ("name", "firm", "email", "phone", "url", "domains", "state")
+
+    def __init__(self, name: str = "", firm: str = "", email: str = "", phone: str = "", website: str = "",
+                 location: str = ""):
+        self.name = name_tokens(name)
+        self.firm = firm_tokens(firm)
+        self.email = normalize_email(email)
+        self.phone = normalize_phone(phone)
+        self.url = normalize_url(website)
+        self.domains = {domain for domain in (website_domain(website), email_domain(self.email)) if domain}
+        state = _STATE.search(_present(location))
+        self.state = state.group(1).upper() if state else ""
+
+    def blocking_keys(self) -> List[str]:
+        keys = []
+        if len(self.name) >= 2:
+            first, last = self.name[0], self.name[-1]
+            keys.append(f"last:{last[:4]}:{first[0]}")
+            # Still meets its duplicates when the last name is misspelled
+            keys.append(f"first:{first[:4]}:{last[0]}")
+        elif self.name:
+            keys.append(f"name:{self.name[0]}")
+        if self.email:
+            keys.append(f"email:{self.email}")
+        if self.phone:
+            keys.append(f"phone:{self.phone}")
+        if self.url:
+            keys.append(f"url:{self.url}")
+        keys.extend(f"domain:{domain}" for domain in self.domains)
+        return keys
+
+
+def _shares_contact(a: EntityRecord, b: EntityRecord) -> bool:
+    return (bool(a.email and a.email == b.email) or bool(a.phone and a.phone == b.phone)
+            or bool(a.url and a.url == b.url) or bool(a.domains & b.domains))
+
+
+def is_same_entity(a: EntityRecord, b: EntityRecord) -> bool:
+    """Match rules for two records that share a block."""
+    if a.url and a.url == b.url:
+        # The same profile page (an Avvo link seen on several results pages)
+        return not _names_conflict(a.name, b.name)
+    if not a.name or not b.name:
+        # Nameless records only merge on an identical email
+        return bool(a.email) and a.email == b.email
+    name_score = _similarity(" ".join(a.name), " ".join(b.name))
+    same_initials = _initials_match(a.name, b.name)
+    if a.email and a.email == b.email:
+        return name_score >= 0.6 or same_initials
+
+    shared_contact = _shares_contact(a, b)
+    if a.state and b.state and a.state != b.state and not shared_contact:
+        return False
+    if name_score >= NAME_THRESHOLD:
+        return shared_contact or not _firms_conflict(a.firm, b.firm)
+    firm_score = _similarity(" ".join(a.firm), " ".join(b.firm)) if a.firm and b.firm else None
+    if same_initials:
+        # 'J. Smith' vs 'John A. Smith': only with corroboration
+        return shared_contact or (firm_score is not None and firm_score >= FIRM_THRESHOLD)
+    return False
+
+
+def resolve(records: List[EntityRecord]) -> List[List[int]]:
+    """
+    Group records that describe the same entity.
+
+    Returns:
+        Clusters of record indices, each in input order, ordered by their first record.
+    """
+    parent = list(range(len(records)))
+    # Names and firms seen in each cluster (by root), so a vaguer record ('J. Smith', no firm)
+    # can't chain two different lawyers into one entity
+    names: Dict[int, set] = {i: {record.name} for i, record in enumerate(records) if record.name}
+    firms: Dict[int, set] = {i: {record.firm} for i, record in enumerate(records) if record.firm}
+
+    def clusters_conflict(root_i: int, root_j: int) -> bool:
+        return (any(_names_conflict(a, b) for a in names.get(root_i, ()) for b in names.get(root_j, ()))
+                or any(_firms_conflict(a, b) for a in firms.get(root_i, ()) for b in firms.get(root_j, ())))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    blocks: Dict[str, List[int]] = {}
+    for i, record in enumerate(records):
+        for key in record.blocking_keys():
+            blocks.setdefault(key, []).append(i)
+
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for i, j in combinations(members, 2):
+            root_i, root_j = find(i), find(j)
+            if root_i == root_j or not is_same_entity(records[i], records[j]):
+                continue
+            if clusters_conflict(root_i, root_j) and not _shares_contact(records[i], records[j]):
+                continue
+            # The earlier record stays the root, so clusters keep input order
+            root, child = min(root_i, root_j), max(root_i, root_j)
+            parent[child] = root
+            for seen in (names, firms):
+                if child in seen:
+                    seen[root] = seen.get(root, set()) | seen.pop(child)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(records)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def profile_record(profile: LawyerProfile) -> EntityRecord:
+    contact = profile.contact_info or {}
+    return EntityRecord(profile.name, profile.firm, contact.get("email", ""), contact.get("phone", ""),
+                        contact.get("website", ""))
+
+
+def merge_profiles(profiles: List[LawyerProfile]) -> LawyerProfile:
+    """One profile from a cluster: the fullest name, the first firm and every contact field found."""
+    merged = profiles[0].model_copy(deep=True)
+    merged.name = max((profile.name for profile in profiles), key=lambda name: len(name_tokens(name)))
+    for profile in profiles[1:]:
+        if not merged.firm.strip() and profile.firm.strip():
+            merged.firm = profile.firm
+        for field, value in profile.contact_info.items():
+            if value and not merged.contact_info.get(field):
+                merged.contact_info[field] = value
+    return merged
+
+
+def dedupe_lawyer_profiles(profiles: List[LawyerProfile]) -> List[LawyerProfile]:
+    """Merge profiles of the same lawyer. Earlier profiles win ties and keep their position."""
+    clusters = resolve([profile_record(profile) for profile in profiles])
+    return [merge_profiles([profiles[i] for i in cluster]) for cluster in clusters]
+
+
+def row_record(row: Dict[str, str]) -> EntityRecord:
+    """A record for a scraper / lawyer_finder CSV row (Name, Profile Link, Location, ...)."""
+    return EntityRecord(row.get("Name", ""), row.get("Firm", ""), row.get("Email", ""), row.get("Phone", ""),
+                        row.get("Profile Link", ""), row.get("Location", ""))
+
+
+def dedupe_rows(rows: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[List[int]]]:
+    """
+    Merge CSV rows of the same lawyer: the first row of each cluster, with its empty
+    columns filled from the others.
+
+    Returns:
+        The merged rows, and the clusters of row indices (for reporting)
+    """
+    clusters = resolve([row_record(row) for row in rows])
+    merged = []
+    for cluster in clusters:
+        row = dict(rows[cluster[0]])
+        for i in cluster[1:]:
+            for field, value in rows[i].items():
+                if value and not row.get(field):
+                    row[field] = value
+        merged.append(row)
+    return merged, clusters
+
+
+def read_rows(paths: Iterable[str]) -> Tuple[List[Dict[str, str]], List[str]]:
+    rows, fieldnames = [], []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", newline="") as csvfile:
+            reader = csv.DictReader(csvfile)
+            fieldnames += [field for field in reader.fieldnames or [] if field not in fieldnames]
+            rows.extend(reader)
+    return rows, fieldnames
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find and merge duplicate lawyers in scraped CSVs.")
+    parser.add_argument("paths", nargs="+", help="Scraper, scheduler or lawyer_finder CSVs")
+    parser.add_argument("--output", help="Write the merged rows to this CSV")
+    args = parser.parse_args(argv)
+
+    rows, fieldnames = read_rows(args.paths)
+    merged, clusters = dedupe_rows(rows)
+    for cluster in clusters:
+        if len(cluster) > 1:
+            print(" = ".join(f"{rows[i].get('Name', '')} <{rows[i].get('Profile Link', '')}>" for i in cluster))
+    print(f"{len(rows)} rows -> {len(merged)} lawyers")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(merged)
+        print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
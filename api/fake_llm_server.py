@@ -0,0 +1,189 @@
+# fake_llm_server.py - Deterministic stand-in for the Perplexity and OpenRouter chat APIs.
+#
+# Serves an OpenAI-compatible POST /chat/completions so the real ChatOpenAI clients,
+# pooled httpx clients and SDK retries are all exercised, without network access or cost.
+# Responses are generated from the prompt, so the whole graph runs end to end.
+# Latency, jitter and failures are drawn from a seeded RNG keyed on the prompt, so a
+# given prompt gets the same latency and outcome on every run, whatever the concurrency.
+#
+# Usage: python fake_llm_server.py --port 8100 --latency-ms 800 --jitter-ms 300 --failure-rate 0.02
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+FIRST_NAMES = ["Sarah", "Michael", "Priya", "Wei", "David", "Elena", "Rahul", "Grace", "Omar", "Linda",
+               "James", "Mei", "Carlos", "Anita", "Thomas"]
+LAST_NAMES = ["Johnson", "Chen", "Patel", "Garcia", "Kim", "Nguyen", "Shah", "Rossi", "Cohen", "Okafor"]
+FIRM_SUFFIXES = ["Immigration Law", "Visa Partners", "Law Group", "& Associates", "Global Immigration"]
+CITIES = ["San Francisco, CA", "Los Angeles, CA", "New York, NY", "Houston, TX", "Seattle, WA",
+          "Chicago, IL", "Boston, MA", "Miami, FL"]
+INDUSTRIES = ["Technology", "Research", "Healthcare", "Arts", "Business", "Academia"]
+
+# "**Name** - Firm (City). ... Email: x, Phone: y, Website: z."
+_LAWYER_LINE = re.compile(
+    r"\*\*(?P<name>[^*]+)\*\* - (?P<firm>[^(]+) \((?P<city>[^)]+)\)\..*?"
+    r"Email: (?P<email>\S+), Phone: (?P<phone>[\d-]+), Website: (?P<website>\S+?)\.(?:\s|$|\\n)"
+)
+_SELECTED = re.compile(r'"name":\s*"([^"]+)"')
+
+
+@dataclass
+class FakeLLMSettings:
+    latency_ms: float = 500.0
+    jitter_ms: float = 200.0
+    failure_rate: float = 0.0
+    failure_status: int = 500
+    lawyers_per_search: int = 3
+    seed: int = 0
+
+
+def make_lawyer(index: int) -> dict:
+    rng = random.Random(index)
+    first, last = FIRST_NAMES[index % len(FIRST_NAMES)], LAST_NAMES[(index * 7) % len(LAST_NAMES)]
+    firm = f"{last} {FIRM_SUFFIXES[index % len(FIRM_SUFFIXES)]}"
+    domain = re.sub(r"[^a-z]", "", firm.lower()) + ".com"
+    return {
+        "name": f"{first} {last}",
+        "firm": firm,
+        "city": CITIES[index % len(CITIES)],
+        "industry": INDUSTRIES[index % len(INDUSTRIES)],
+        "approval_rate": rng.randint(80, 99),
+        "fee": rng.randrange(8000, 35000, 500),
+        "email": f"{first.lower()}@{domain}",
+        "phone": f"{rng.randint(200, 999)}-555-{rng.randint(1000, 9999)}",
+        "website": f"www.{domain}",
+    }
+
+
+LAWYERS = [make_lawyer(i) for i in range(60)]
+
+
+def prompt_rng(settings: FakeLLMSettings, prompt: str) -> random.Random:
+    digest = hashlib.sha256(f"{settings.seed}:{prompt}".encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def fake_completion(prompt: str, settings: FakeLLMSettings) -> str:
+    """Produce a plausible response for each prompt the graph sends."""
+    rng = prompt_rng(settings, prompt)
+
+    if "crafting search queries" in prompt:
+        return json.dumps([
+            "EB-1A immigration lawyers 90% success rate",
+            "Top EB-1A attorneys for foreign nationals",
+            "EB-1A lawyers by industry specialization",
+            "Best EB-1A lawyers near me",
+            "Affordable EB-1A attorneys flat fee",
+        ])
+
+    if "Search for information about EB-1A" in prompt:
+        lines = []
+        for lawyer in rng.sample(LAWYERS, settings.lawyers_per_search):
+            lines.append(
+                f"**{lawyer['name']}** - {lawyer['firm']} ({lawyer['city']}). EB-1A practice with a "
+                f"{lawyer['approval_rate']}% approval rate; typical fees ${lawyer['fee']:,}. Works with "
+                f"{lawyer['industry']} clients and offers premium processing. "
+                f"Email: {lawyer['email']}, Phone: {lawyer['phone']}, Website: {lawyer['website']}."
+            )
+        return "Here are EB-1A lawyers matching the query:\n\n" + "\n".join(lines)
+
+    if "extracting structured information" in prompt:
+        return json.dumps([
+            {
+                "name": match["name"],
+                "firm": match["firm"].strip(),
+                "contact_info": {"email": match["email"], "phone": match["phone"], "website": match["website"]},
+            }
+            for match in _LAWYER_LINE.finditer(prompt)
+        ])
+
+    if "Selected Lawyers" in prompt:
+        section = prompt.split("Selected Lawyers", 1)[1].split("For each selected lawyer", 1)[0]
+        return json.dumps([
+            {
+                "name": name,
+                "reason": f"{name} has strong EB-1A experience relevant to this profile.",
+                "next_steps": "Book a consultation and prepare evidence for each EB-1A criterion.",
+            }
+            for name in _SELECTED.findall(section)
+        ])
+
+    return "These lawyers were selected for their EB-1A track record and fit with the user's priorities."
+
+
+def create_app(settings: FakeLLMSettings) -> FastAPI:
+    app = FastAPI(title="Fake LLM server")
+    app.state.requests = 0
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        app.state.requests += 1
+
+        # Keyed on the attempt number too, so SDK retries of a failed prompt can succeed
+        attempt = request.headers.get("x-stainless-retry-count", "0")
+        rng = prompt_rng(settings, f"{attempt}:{prompt}")
+        latency = max(0.0, settings.latency_ms + rng.uniform(-settings.jitter_ms, settings.jitter_ms)) / 1000
+        await asyncio.sleep(latency)
+
+        if rng.random() < settings.failure_rate:
+            return JSONResponse(
+                status_code=settings.failure_status,
+                content={"error": {"message": "Injected failure", "type": "server_error"}},
+            )
+
+        content = fake_completion(prompt, settings)
+        prompt_tokens, completion_tokens = len(prompt) // 4 + 1, len(content) // 4 + 1
+        return {
+            "id": f"fake-{app.state.requests}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Mean fake LLM latency")
+    parser.add_argument("--jitter-ms", type=float, default=200.0, help="Uniform +/- jitter around the mean")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of calls that fail (0-1)")
+    parser.add_argument("--failure-status", type=int, default=500, help="HTTP status returned for failures")
+    parser.add_argument("--lawyers-per-search", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def settings_from_args(args) -> FakeLLMSettings:
+    return FakeLLMSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        lawyers_per_search=args.lawyers_per_search,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deterministic stand-in for the Perplexity and OpenRouter chat APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(settings_from_args(args)), host=args.host, port=args.port)
@@ -1,5 +1,6 @@
 from models import AgentState
-from nodes import generate_search_queries, search_with_perplexity, extract_lawyer_profiles, generate_recommendations
+from nodes import load_cohort_pool, route_after_cohort, search_local_index, route_after_local_search, generate_search_queries, search_with_perplexity, extract_lawyer_profiles, score_lawyer_profiles, generate_recommendations
+from metrics import instrument_node
 from langgraph.graph import StateGraph, END
 
 
@@ -7,21 +8,49 @@ from langgraph.graph import StateGraph, END
 def create_eb1a_agent():
     workflow = StateGraph(AgentState)
     
-    # Add nodes
-    workflow.add_node("generate_queries", generate_search_queries)
-    workflow.add_node("search_lawyers", search_with_perplexity)
-    workflow.add_node("extract_profiles", extract_lawyer_profiles)
-    workflow.add_node("generate_recommendations", generate_recommendations)
+    # Add nodes (each wrapped to record timing/error metrics)
+    workflow.add_node("load_cohort", instrument_node("load_cohort", load_cohort_pool))
+    workflow.add_node("search_local", instrument_node("search_local", search_local_index))
+    workflow.add_node("generate_queries", instrument_node("generate_queries", generate_search_queries))
+    workflow.add_node("search_lawyers", instrument_node("search_lawyers", search_with_perplexity))
+    workflow.add_node("extract_profiles", instrument_node("extract_profiles", extract_lawyer_profiles))
+    workflow.add_node("score_lawyers", instrument_node("score_lawyers", score_lawyer_profiles))
+    workflow.add_node("generate_recommendations", instrument_node("generate_recommendations", generate_recommendations))
     
     # Define edges
-    workflow.set_entry_point("generate_queries")
+    workflow.set_entry_point("load_cohort")
+    # Requests in a precomputed cohort skip the searches and go straight to ranking
+    workflow.add_conditional_edges("load_cohort", route_after_cohort, ["search_local", "score_lawyers"])
+    # Served from the local index when it has enough lawyers, otherwise search live
+    workflow.add_conditional_edges("search_local", route_after_local_search, ["generate_queries", "score_lawyers"])
     workflow.add_edge("generate_queries", "search_lawyers")
     workflow.add_edge("search_lawyers", "extract_profiles")
-    workflow.add_edge("extract_profiles", "generate_recommendations")
+    workflow.add_edge("extract_profiles", "score_lawyers")
+    workflow.add_edge("score_lawyers", "generate_recommendations")
     workflow.add_edge("generate_recommendations", END)
     
     return workflow.compile()
 
+# Compiled graph shared by every request. Building and compiling the StateGraph is
+# pure overhead on the request path, so it's done once and reused.
+_compiled_agent = None
+
+def get_eb1a_agent():
+    """Return the shared compiled agent, compiling it on first use."""
+    global _compiled_agent
+    if _compiled_agent is None:
+        _compiled_agent = create_eb1a_agent()
+    return _compiled_agent
+
+def set_eb1a_agent(agent=None):
+    """Hot-swap the shared agent. Pass a compiled graph, or None to rebuild from create_eb1a_agent().
+
+    In-flight runs keep the graph they started with; new requests pick up the replacement.
+    """
+    global _compiled_agent
+    _compiled_agent = agent if agent is not None else create_eb1a_agent()
+    return _compiled_agent
+
 def create_eb1a_agent_dev():
     return create_eb1a_agent()
 
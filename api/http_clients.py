@@ -0,0 +1,80 @@
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+import config
+from metrics import make_upstream_hook
+
+# Pooled clients per upstream API, shared by every request in the process so
+# connections (and their TLS sessions) are kept alive and reused.
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+# Event loop each async client's connections belong to (None until first used inside one)
+_async_client_loops: Dict[str, Optional[asyncio.AbstractEventLoop]] = {}
+_sync_clients: Dict[str, httpx.Client] = {}
+
+
+def get_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        config.HTTP_READ_TIMEOUT_SECONDS,
+        connect=config.HTTP_CONNECT_TIMEOUT_SECONDS,
+        pool=config.HTTP_POOL_TIMEOUT_SECONDS
+    )
+
+
+def get_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY_SECONDS
+    )
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Return the shared AsyncClient for an upstream, creating it on first use.
+
+    Pooled connections are tied to the event loop that opened them, so a client first used
+    in another loop (e.g. an earlier asyncio.run() in a script) is replaced, not reused.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    client = _async_clients.get(name)
+    client_loop = _async_client_loops.get(name)
+    if client is not None and loop is not None and client_loop is not None and client_loop is not loop:
+        # Its loop has finished or belongs to another thread; it can't be closed from here
+        client = None
+    if client is None or client.is_closed:
+        # HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+        client = httpx.AsyncClient(
+            limits=get_limits(),
+            timeout=get_timeout(),
+            http2=config.HTTP2_ENABLED,
+            event_hooks={"response": [make_upstream_hook(name)]}
+        )
+        _async_clients[name] = client
+        client_loop = None
+    if client_loop is None:
+        _async_client_loops[name] = loop
+    return client
+
+
+def get_sync_http_client(name: str) -> httpx.Client:
+    """Sync counterpart of get_http_client, used by .invoke() in scripts."""
+    client = _sync_clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.Client(limits=get_limits(), timeout=get_timeout(), http2=config.HTTP2_ENABLED)
+        _sync_clients[name] = client
+    return client
+
+
+async def close_http_clients():
+    """Close every shared client, e.g. on application shutdown. Later calls get fresh clients."""
+    for client in list(_async_clients.values()):
+        await client.aclose()
+    for client in list(_sync_clients.values()):
+        client.close()
+    _async_clients.clear()
+    _async_client_loops.clear()
+    _sync_clients.clear()
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from typing import Awaitable, Callable, List, Optional
+
+from models import UserProfile
+
+import config
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobStore:
+    """SQLite-backed job table, shared by every uvicorn worker process on the host."""
+
+    def __init__(self, path: str, lease_seconds: float = 60.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    batch_id TEXT,
+                    status TEXT NOT NULL,
+                    profile TEXT NOT NULL,
+                    bypass_cache INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    claimed_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs (batch_id)")
+
+    def create(self, profiles: List[UserProfile], bypass_cache: bool = False, batch_id: Optional[str] = None) -> List[str]:
+        now = time.time()
+        job_ids = [uuid.uuid4().hex for _ in profiles]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (id, batch_id, status, profile, bypass_cache, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, batch_id, QUEUED, profile.model_dump_json(), int(bypass_cache), now, now)
+                    for job_id, profile in zip(job_ids, profiles)
+                ]
+            )
+        return job_ids
+
+    def count_queued(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+
+    # A claim is identified by its claimed_at time, so a worker that lost its job to an expired
+    # lease can't renew, requeue or finish the run another worker claimed since. The lease
+    # itself is renewed through updated_at.
+
+    def _requeue_expired(self, conn: sqlite3.Connection) -> int:
+        # Running jobs whose worker stopped renewing the lease (crashed or killed process)
+        now = time.time()
+        return conn.execute(
+            "UPDATE jobs SET status = ?, claimed_at = NULL, updated_at = ? "
+            "WHERE status = ? AND updated_at < ?",
+            (QUEUED, now, RUNNING, now - self.lease_seconds)
+        ).rowcount
+
+    def requeue_expired(self) -> int:
+        """Put running jobs with an expired lease back in the queue. Returns how many were requeued."""
+        with self._connect() as conn:
+            return self._requeue_expired(conn)
+
+    def claim_next(self) -> Optional[dict]:
+        """Atomically move the oldest queued job (or one with an expired lease) to running and return its row."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._requeue_expired(conn)
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row:
+                    now = time.time()
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, claimed_at = ?, updated_at = ? WHERE id = ?",
+                        (RUNNING, now, now, row["id"])
+                    )
+                    row = {**dict(row), "status": RUNNING, "claimed_at": now, "updated_at": now}
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return row
+
+    def renew(self, job_id: str, claimed_at: float):
+        """Extend the lease of a running job's claim."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ? AND claimed_at = ?",
+                (time.time(), job_id, RUNNING, claimed_at)
+            )
+
+    def requeue(self, job_id: str, claimed_at: float):
+        """Give a running job back to the queue, e.g. when its worker shuts down."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, claimed_at = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND claimed_at = ?",
+                (QUEUED, time.time(), job_id, RUNNING, claimed_at)
+            )
+
+    def finish(self, job_id: str, claimed_at: float, result: Optional[dict] = None,
+               error: Optional[str] = None) -> bool:
+        """Store a claim's outcome. Returns False if the claim was lost (the job was requeued or re-claimed)."""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND claimed_at = ?",
+                (
+                    FAILED if error else SUCCEEDED,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    RUNNING,
+                    claimed_at
+                )
+            ).rowcount == 1
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_batch(self, batch_id: str) -> List[dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs WHERE batch_id = ? ORDER BY rowid", (batch_id,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            "batch_id": row["batch_id"],
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+
+
+class JobRunner:
+    """Bounded pool of asyncio workers that pull queued jobs from the JobStore.
+
+    Jobs submitted to this process start immediately. Workers also poll the store,
+    so jobs queued by other processes are picked up too.
+    """
+
+    def __init__(self, store: JobStore, run: Callable[[UserProfile, bool], Awaitable[dict]],
+                 workers: int = 4, poll_interval: float = 1.0):
+        self.store = store
+        self.run = run
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        # Jobs left running by a process that died before finishing them
+        self.store.requeue_expired()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers after new jobs have been queued."""
+        self._wakeup.set()
+
+    async def _worker(self):
+        while True:
+            self._wakeup.clear()
+            row = await asyncio.to_thread(self.store.claim_next)
+            if row is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, claimed_at = row["id"], row["claimed_at"]
+            heartbeat = asyncio.create_task(self._renew_lease(job_id, claimed_at))
+            try:
+                profile = UserProfile.model_validate_json(row["profile"])
+                result = await self.run(profile, bool(row["bypass_cache"]))
+                await asyncio.to_thread(self.store.finish, job_id, claimed_at, result)
+            except asyncio.CancelledError:
+                # Shutdown or redeploy: the job goes back in the queue for the next worker
+                await asyncio.to_thread(self.store.requeue, job_id, claimed_at)
+                raise
+            except Exception as e:
+                await asyncio.to_thread(self.store.finish, job_id, claimed_at, None, f"{type(e).__name__}: {str(e)}")
+            finally:
+                heartbeat.cancel()
+
+    async def _renew_lease(self, job_id: str, claimed_at: float):
+        """Renew a job's lease while it runs, so only jobs of dead workers expire."""
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            await asyncio.to_thread(self.store.renew, job_id, claimed_at)
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        _store = JobStore(config.JOB_DB_PATH, config.JOB_LEASE_SECONDS)
+    return _store
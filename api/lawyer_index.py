@@ -0,0 +1,292 @@
+import csv
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from models import LawyerProfile
+
+import config
+
+# Placeholder values and Avvo link parsing are shared with the scraper-side corpus
+from scraped_values import clean_value, name_from_link, parse_rating
+
+# Local lawyer index built from the scraper output: the lawyer corpus (lawyer_corpus.sqlite3,
+# written by test_scraper.py / scrape_scheduler.py and vetted by lawyer_finder.py) and the
+# older CSV files (lawyers.csv, lawyers_5_pages.csv, eb1_lawyers.csv). Rows live in a plain
+# table keyed by profile link with an FTS5 index over the text columns, so the graph can
+# look lawyers up in milliseconds before paying for a live Perplexity search.
+#
+# Build or refresh it by hand with: python lawyer_index.py [csv or corpus ...]
+
+US_STATES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA",
+    "colorado": "CO", "connecticut": "CT", "delaware": "DE", "district of columbia": "DC",
+    "florida": "FL", "georgia": "GA", "hawaii": "HI", "idaho": "ID", "illinois": "IL",
+    "indiana": "IN", "iowa": "IA", "kansas": "KS", "kentucky": "KY", "louisiana": "LA",
+    "maine": "ME", "maryland": "MD", "massachusetts": "MA", "michigan": "MI", "minnesota": "MN",
+    "mississippi": "MS", "missouri": "MO", "montana": "MT", "nebraska": "NE", "nevada": "NV",
+    "new hampshire": "NH", "new jersey": "NJ", "new mexico": "NM", "new york": "NY",
+    "north carolina": "NC", "north dakota": "ND", "ohio": "OH", "oklahoma": "OK", "oregon": "OR",
+    "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC", "south dakota": "SD",
+    "tennessee": "TN", "texas": "TX", "utah": "UT", "vermont": "VT", "virginia": "VA",
+    "washington": "WA", "west virginia": "WV", "wisconsin": "WI", "wyoming": "WY",
+}
+STATE_NAMES = {code: name.title() for name, code in US_STATES.items()}
+
+_FTS_TOKEN = re.compile(r"\w+")
+
+
+def expand_location(location: str) -> str:
+    """'San Jose, CA' -> 'San Jose, CA (California)', so full state names match too."""
+    code = location.rsplit(",", 1)[-1].strip().upper()
+    return f"{location} ({STATE_NAMES[code]})" if code in STATE_NAMES and "," in location else location
+
+
+def location_patterns(location: str) -> List[str]:
+    """LIKE patterns matching a user's location preference against 'City, ST' locations."""
+    location = location.strip()
+    patterns = [f"%{location}%"]
+    code = US_STATES.get(location.lower())
+    if code:
+        patterns.append(f"%, {code}")
+    return patterns
+
+
+def fts_query(text: str) -> str:
+    """Require every word of free text, as quoted FTS5 terms so user input can't break the syntax."""
+    return " ".join(f'"{token}"' for token in dict.fromkeys(_FTS_TOKEN.findall(text.lower())))
+
+
+def is_corpus(path: str) -> bool:
+    return path.endswith((".sqlite3", ".db"))
+
+
+def read_corpus_rows(path: str) -> Iterable[dict]:
+    """Rows from a lawyer corpus (see lawyer_corpus.py), which is already normalized and keyed by profile link."""
+    source = os.path.basename(path)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        for row in conn.execute(
+            "SELECT profile_link, name, location, rating, snippet, eb1, eb1_details, mention_count FROM lawyers"
+        ):
+            yield {
+                **dict(row),
+                "name": row["name"] or name_from_link(row["profile_link"]),
+                # NULL until lawyer_finder.py has vetted the lawyer
+                "eb1": row["eb1"] or 0,
+                "source": source,
+            }
+    finally:
+        conn.close()
+
+
+def source_updated_at(path: str) -> float:
+    """When a source last changed: the file's mtime, or for a corpus its newest row (WAL writes skip the main file)."""
+    if not is_corpus(path):
+        return os.path.getmtime(path)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    try:
+        return conn.execute("SELECT MAX(updated_at) FROM lawyers").fetchone()[0] or 0.0
+    finally:
+        conn.close()
+
+
+def read_lawyer_rows(path: str) -> Iterable[dict]:
+    """Normalized rows from a scraper or lawyer_finder CSV, or a lawyer corpus. Rows without a profile link are skipped."""
+    if is_corpus(path):
+        yield from read_corpus_rows(path)
+        return
+    source = os.path.basename(path)
+    with open(path, "r", encoding="utf-8", newline="") as csvfile:
+        for row in csv.DictReader(csvfile):
+            profile_link = clean_value(row.get("Profile Link"))
+            if not profile_link.startswith("http"):
+                continue
+            yield {
+                "profile_link": profile_link,
+                "name": clean_value(row.get("Name")) or name_from_link(profile_link),
+                "location": clean_value(row.get("Location")),
+                "rating": parse_rating(row.get("Avvo Rating"))[0],
+                "snippet": clean_value(row.get("Details Snippet")),
+                "eb1": int(clean_value(row.get("EB-1 Expertise")).lower() == "yes"),
+                "eb1_details": clean_value(row.get("EB-1 Details")),
+                "mention_count": int(clean_value(row.get("Mention Count")) or 0),
+                "source": source,
+            }
+
+
+class LawyerIndex:
+    """SQLite table of scraped lawyers with an FTS5 index over name, location, snippet and EB-1 details."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS lawyers (
+                    profile_link TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    rating REAL,
+                    snippet TEXT NOT NULL,
+                    eb1 INTEGER NOT NULL DEFAULT 0,
+                    eb1_details TEXT NOT NULL,
+                    mention_count INTEGER NOT NULL DEFAULT 0,
+                    source TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lawyers_location ON lawyers (location)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lawyers_rating ON lawyers (eb1, rating)")
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS lawyers_fts USING fts5 (
+                    name, location, snippet, eb1_details, content='lawyers', content_rowid='rowid'
+                )
+                """
+            )
+
+    def add(self, rows: Iterable[dict]) -> int:
+        """Upsert rows by profile link, keeping known values when a later source lacks them."""
+        now = time.time()
+        count = 0
+        with self._connect() as conn:
+            for row in rows:
+                conn.execute(
+                    """
+                    INSERT INTO lawyers (profile_link, name, location, rating, snippet, eb1, eb1_details,
+                                         mention_count, source, updated_at)
+                    VALUES (:profile_link, :name, :location, :rating, :snippet, :eb1, :eb1_details,
+                            :mention_count, :source, :updated_at)
+                    ON CONFLICT (profile_link) DO UPDATE SET
+                        name = COALESCE(NULLIF(excluded.name, ''), name),
+                        location = COALESCE(NULLIF(excluded.location, ''), location),
+                        rating = COALESCE(excluded.rating, rating),
+                        snippet = COALESCE(NULLIF(excluded.snippet, ''), snippet),
+                        eb1 = MAX(eb1, excluded.eb1),
+                        eb1_details = COALESCE(NULLIF(excluded.eb1_details, ''), eb1_details),
+                        mention_count = MAX(mention_count, excluded.mention_count),
+                        updated_at = excluded.updated_at
+                    """,
+                    {**row, "updated_at": now}
+                )
+                count += 1
+            # External-content FTS tables don't track the source table on their own
+            conn.execute("INSERT INTO lawyers_fts (lawyers_fts) VALUES ('rebuild')")
+        return count
+
+    def build(self, paths: Iterable[str]) -> int:
+        """Index every CSV or corpus in paths that exists. Returns the number of rows read."""
+        return sum(self.add(read_lawyer_rows(path)) for path in paths if os.path.exists(path))
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM lawyers").fetchone()[0]
+
+    def is_stale(self, paths: Iterable[str]) -> bool:
+        """True if the index is empty or any source changed after it was last written."""
+        with self._connect() as conn:
+            built_at = conn.execute("SELECT MAX(updated_at) FROM lawyers").fetchone()[0]
+        if built_at is None:
+            return True
+        return any(source_updated_at(path) > built_at for path in paths if os.path.exists(path))
+
+    def search(self, text: str = "", location: Optional[str] = None, min_rating: Optional[float] = None,
+               eb1_only: bool = False, limit: int = 20) -> List[Dict]:
+        """Best matching lawyers: EB-1 vetted first, then by full-text relevance (when text is given), mentions and rating."""
+        clauses, params = [], []
+        join, relevance = "", ""
+        query = fts_query(text)
+        if query:
+            join = " JOIN lawyers_fts ON lawyers_fts.rowid = lawyers.rowid"
+            relevance = "bm25(lawyers_fts), "
+            clauses.append("lawyers_fts MATCH ?")
+            params.append(query)
+        if location:
+            patterns = location_patterns(location)
+            clauses.append("(" + " OR ".join("lawyers.location LIKE ?" for _ in patterns) + ")")
+            params.extend(patterns)
+        if min_rating is not None:
+            clauses.append("lawyers.rating >= ?")
+            params.append(min_rating)
+        if eb1_only:
+            clauses.append("lawyers.eb1 = 1")
+
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT lawyers.* FROM lawyers{join}{where}
+                ORDER BY lawyers.eb1 DESC, {relevance}lawyers.mention_count DESC, lawyers.rating IS NULL,
+                         lawyers.rating DESC, lawyers.name
+                LIMIT ?
+                """,
+                params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def to_lawyer_profile(row: Dict) -> LawyerProfile:
+    # The scraped listings don't include a firm, email or phone; the profile page is the contact point
+    return LawyerProfile(name=row["name"], firm="", contact_info={"website": row["profile_link"]})
+
+
+def describe(row: Dict) -> str:
+    """One line of search-result style text for a row, so the scoring engine has context to read."""
+    parts = [f"**{row['name']}**"]
+    if row["location"]:
+        parts.append(f"- Located in {expand_location(row['location'])}.")
+    if row["rating"] is not None:
+        parts.append(f"Avvo rating {row['rating']:g}/10.")
+    if row["eb1"]:
+        parts.append(f"Vetted for EB-1 expertise ({row['mention_count']} mentions): {row['eb1_details']}")
+    if row["snippet"]:
+        parts.append(row["snippet"])
+    parts.append(f"Website: {row['profile_link']}")
+    return " ".join(parts)
+
+
+_index: Optional[LawyerIndex] = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_lawyer_index() -> LawyerIndex:
+    """Shared index, (re)built from config.LAWYER_INDEX_SOURCES when missing or out of date.
+
+    Sources are re-checked every LAWYER_INDEX_REFRESH_SECONDS, so a long-running API picks up
+    a re-scraped corpus or CSV without a restart.
+    """
+    global _index, _checked_at
+    if _index is not None and time.monotonic() - _checked_at < config.LAWYER_INDEX_REFRESH_SECONDS:
+        return _index
+    with _index_lock:
+        if _index is None or time.monotonic() - _checked_at >= config.LAWYER_INDEX_REFRESH_SECONDS:
+            index = _index or LawyerIndex(config.LAWYER_INDEX_PATH)
+            if index.is_stale(config.LAWYER_INDEX_SOURCES):
+                index.build(config.LAWYER_INDEX_SOURCES)
+            _index, _checked_at = index, time.monotonic()
+    return _index
+
+
+if __name__ == "__main__":
+    sources = [path for path in sys.argv[1:] or config.LAWYER_INDEX_SOURCES if os.path.exists(path)]
+    index = LawyerIndex(config.LAWYER_INDEX_PATH)
+    rows = index.build(sources)
+    print(f"Indexed {rows} rows from {len(sources)} files into {config.LAWYER_INDEX_PATH} "
+          f"({index.count()} lawyers)")
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+import config
+from metrics import current_attempts, record_llm_call
+
+# Set per request (e.g. from the X-Cache-Bypass header) to skip cache reads for that request.
+# Fresh responses are still written back so the next caller benefits.
+cache_bypass: ContextVar[bool] = ContextVar("cache_bypass", default=False)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(messages: List[BaseMessage]) -> str:
+    """Collapse whitespace so prompts that only differ in indentation share a cache entry."""
+    return json.dumps(
+        [[message.type, _WHITESPACE.sub(" ", str(message.content)).strip()] for message in messages],
+        ensure_ascii=False
+    )
+
+
+def make_cache_key(model: str, messages: List[BaseMessage]) -> str:
+    """Build the cache key from the model name and the normalized prompt."""
+    return hashlib.sha256(f"{model}\n{normalize_prompt(messages)}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Two-tier response cache: an in-memory LRU in front of a SQLite store."""
+
+    def __init__(self, path: str, max_memory_entries: int = 1024):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    node TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _remember(self, key: str, content: str, expires_at: float):
+        self._memory[key] = (content, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _db_get(self, key: str) -> Optional[tuple]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT content, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and row[1] <= time.time():
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            return row
+
+    def _db_set(self, key: str, model: str, node: str, content: str, expires_at: float):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, node, content, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, node, content, time.time(), expires_at)
+            )
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry:
+            if entry[1] > time.time():
+                self._memory.move_to_end(key)
+                return entry[0]
+            del self._memory[key]
+
+        row = await asyncio.to_thread(self._db_get, key)
+        if row is None:
+            return None
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    async def set(self, key: str, model: str, node: str, content: str, ttl: float):
+        expires_at = time.time() + ttl
+        self._remember(key, content, expires_at)
+        await asyncio.to_thread(self._db_set, key, model, node, content, expires_at)
+
+    def clear(self):
+        self._memory.clear()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+
+_cache: Optional[LLMCache] = None
+
+
+def get_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        _cache = LLMCache(config.LLM_CACHE_PATH, config.LLM_CACHE_MEMORY_ENTRIES)
+    return _cache
+
+
+async def _timed_ainvoke(llm, messages: List[BaseMessage], node: str, cache: str, start: float):
+    """Call the LLM and record timing, tokens, retries and errors for it."""
+    model = llm.model_name
+    attempts = []
+    token = current_attempts.set(attempts)
+    try:
+        response = await llm.ainvoke(messages)
+    except (Exception, asyncio.CancelledError) as e:
+        record_llm_call(node, model, cache, time.perf_counter() - start, attempts=len(attempts), error=e)
+        raise
+    finally:
+        current_attempts.reset(token)
+    record_llm_call(node, model, cache, time.perf_counter() - start, response, attempts=len(attempts))
+    return response
+
+
+async def cached_ainvoke(llm, messages: List[BaseMessage], node: str):
+    """Drop-in replacement for llm.ainvoke(messages) that serves repeat prompts from the cache."""
+    start = time.perf_counter()
+    ttl = config.LLM_CACHE_TTL_SECONDS.get(node, 0)
+    if not config.LLM_CACHE_ENABLED or ttl <= 0:
+        return await _timed_ainvoke(llm, messages, node, "disabled", start)
+
+    cache = get_cache()
+    model = llm.model_name
+    key = make_cache_key(model, messages)
+
+    bypass = cache_bypass.get()
+    if not bypass:
+        content = await cache.get(key)
+        if content is not None:
+            record_llm_call(node, model, "hit", time.perf_counter() - start)
+            return AIMessage(content=content)
+
+    response = await _timed_ainvoke(llm, messages, node, "bypass" if bypass else "miss", start)
+    if isinstance(response.content, str) and response.content:
+        await cache.set(key, model, node, response.content, ttl)
+    return response
@@ -2,16 +2,18 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from models import UserProfile
-from graph import create_eb1a_agent
+from graph import get_eb1a_agent
+from nodes import generate_summary
+from llm_cache import cache_bypass
+from metrics import current_trace
+import config
 import asyncio
 import json
 from datetime import datetime
 
-async def find_eb1a_lawyers(user_profile: UserProfile):
-    """Main function to find and recommend EB-1A lawyers."""
-    
-    # Initialize state
-    initial_state = {
+def build_initial_state(user_profile: UserProfile, include_summary: bool = True) -> dict:
+    """Initial graph state for a user profile."""
+    return {
         "user_profile": user_profile,
         "search_queries": [],
         "raw_search_results": [],
@@ -19,27 +21,107 @@ async def find_eb1a_lawyers(user_profile: UserProfile):
         "compatibility_scores": {},
         "recommendations": [],
         "reasoning": "",
+        "include_summary": include_summary,
         "messages": []
     }
-    
-    # Create and run agent
-    agent = create_eb1a_agent()
-    
-    # Execute the graph
-    result = await agent.ainvoke(initial_state)
-    
-    # Format final output
+
+def format_output(user_profile: UserProfile, result: dict, trace: list = None) -> dict:
+    """Shape the final graph state into the API output."""
     output = {
         "status": "success",
         "user": user_profile.name,
         "recommendations": result["recommendations"],
+        "compatibility_scores": result.get("compatibility_scores", {}),
         "summary": result["reasoning"],
         "process_log": result["messages"],
         "timestamp": datetime.now().isoformat()
     }
-    
+    if trace is not None:
+        output["trace"] = trace
     return output
 
+async def find_eb1a_lawyers(user_profile: UserProfile, bypass_cache: bool = False, include_summary: bool = True):
+    """Main function to find and recommend EB-1A lawyers.
+
+    Set bypass_cache to force fresh LLM calls instead of serving cached responses.
+    Set include_summary to False to skip the summary LLM call; "summary" is then empty.
+    """
+    
+    # Initialize state
+    initial_state = build_initial_state(user_profile, include_summary)
+    
+    # Get the shared compiled agent
+    agent = get_eb1a_agent()
+    
+    # Per-request structured trace, collected by the metrics instrumentation
+    trace = [] if config.REQUEST_TRACE_ENABLED else None
+
+    # Execute the graph
+    token = cache_bypass.set(bypass_cache)
+    trace_token = current_trace.set(trace)
+    try:
+        result = await agent.ainvoke(initial_state)
+    finally:
+        current_trace.reset(trace_token)
+        cache_bypass.reset(token)
+    
+    # Format final output
+    return format_output(user_profile, result, trace)
+
+async def stream_eb1a_lawyers(user_profile: UserProfile, bypass_cache: bool = False):
+    """Run the agent and yield (event, data) pairs as each node makes progress.
+
+    Events, in order: "queries" and "profiles" if a warm cohort pool was loaded; otherwise
+    "profiles" if the local index found lawyers, then (unless the local index found enough)
+    "queries", one "search_result" per query as it completes, "profiles"; then "scores",
+    "recommendations", "summary", then "done" with the same payload find_eb1a_lawyers returns.
+    A "progress" event is emitted after every node.
+    The summary is generated after the recommendations have been sent, so it never delays them.
+    """
+
+    initial_state = build_initial_state(user_profile, include_summary=False)
+    agent = get_eb1a_agent()
+    result = dict(initial_state)
+    trace = [] if config.REQUEST_TRACE_ENABLED else None
+
+    token = cache_bypass.set(bypass_cache)
+    trace_token = current_trace.set(trace)
+    try:
+        async for mode, chunk in agent.astream(initial_state, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                # Emitted from inside a node (see nodes.emit_event)
+                yield chunk["event"], chunk["data"]
+                continue
+
+            for node, update in chunk.items():
+                result.update(update or {})
+
+                if node == "load_cohort":
+                    if result["lawyer_profiles"]:
+                        yield "queries", result["search_queries"]
+                        yield "profiles", [lawyer.model_dump() for lawyer in result["lawyer_profiles"]]
+                elif node == "search_local":
+                    if result["lawyer_profiles"]:
+                        yield "profiles", [lawyer.model_dump() for lawyer in result["lawyer_profiles"]]
+                elif node == "generate_queries":
+                    yield "queries", result["search_queries"]
+                elif node == "extract_profiles":
+                    yield "profiles", [lawyer.model_dump() for lawyer in result["lawyer_profiles"]]
+                elif node == "score_lawyers":
+                    yield "scores", result["compatibility_scores"]
+                elif node == "generate_recommendations":
+                    yield "recommendations", result["recommendations"]
+
+                yield "progress", {"node": node, "messages": result["messages"]}
+
+        result["reasoning"] = await generate_summary(user_profile, result["recommendations"], result["messages"])
+        yield "summary", result["reasoning"]
+    finally:
+        current_trace.reset(trace_token)
+        cache_bypass.reset(token)
+
+    yield "done", format_output(user_profile, result, trace)
+
 # Example usage
 if __name__ == "__main__":
     # Example user profile
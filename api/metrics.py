@@ -0,0 +1,201 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+
+import config
+
+# Minimal Prometheus-style metrics (text exposition format 0.0.4). prometheus_client isn't
+# a dependency, and we only need labelled counters and histograms. Values are per
+# process; with several uvicorn workers, scrape each worker or run one worker per container.
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+logger = structlog.get_logger("eb1a")
+
+
+def _escape_label_value(value) -> str:
+    """Escape a label value as the exposition format requires (backslash, double quote, newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, +Inf count, sum)
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0, 0.0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, total_sum) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {total}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total_sum}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {total}")
+        return lines
+
+
+NODE_DURATION = Histogram("eb1a_node_duration_seconds", "Wall time of each graph node.", ("node",))
+NODE_ERRORS = Counter("eb1a_node_errors_total", "Graph node runs that raised.", ("node",))
+LLM_DURATION = Histogram("eb1a_llm_call_duration_seconds", "Wall time of LLM calls, cache hits included.",
+                         ("node", "model", "cache"))
+LLM_CALLS = Counter("eb1a_llm_calls_total", "LLM calls by cache outcome (hit, miss, bypass, disabled).",
+                    ("node", "model", "cache"))
+LLM_ERRORS = Counter("eb1a_llm_errors_total", "LLM calls that raised.", ("node", "model"))
+LLM_RETRIES = Counter("eb1a_llm_retries_total", "HTTP retries made by the OpenAI SDK inside LLM calls.",
+                      ("node", "model"))
+LLM_TOKENS = Counter("eb1a_llm_tokens_total", "Tokens reported by the upstream API.", ("node", "model", "type"))
+LLM_COST = Counter("eb1a_llm_cost_usd_total", "Estimated LLM spend from LLM_PRICING.", ("node", "model"))
+UPSTREAM_REQUESTS = Counter("eb1a_upstream_http_requests_total", "HTTP requests sent to LLM APIs.",
+                            ("upstream", "status"))
+COHORT_LOOKUPS = Counter("eb1a_cohort_lookups_total", "Warm cohort pool lookups (hit, miss).", ("outcome",))
+
+REGISTRY = [
+    NODE_DURATION, NODE_ERRORS, LLM_DURATION, LLM_CALLS, LLM_ERRORS, LLM_RETRIES, LLM_TOKENS, LLM_COST,
+    UPSTREAM_REQUESTS, COHORT_LOOKUPS,
+]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Per-request tracing ---
+
+# Set by find_eb1a_lawyers when tracing is enabled; nodes and LLM calls append events to it
+current_trace: ContextVar[Optional[list]] = ContextVar("current_trace", default=None)
+
+# Counts HTTP attempts made inside one LLM call so retries can be reported
+current_attempts: ContextVar[Optional[list]] = ContextVar("current_attempts", default=None)
+
+
+def trace_event(event: str, **fields):
+    trace = current_trace.get()
+    if trace is None:
+        return
+    trace.append({"event": event, **fields})
+    logger.info(event, **fields)
+
+
+def instrument_node(name: str, fn):
+    """Wrap a graph node to record its wall time (failed runs included) and errors."""
+
+    @wraps(fn)
+    async def wrapper(state):
+        start = time.perf_counter()
+        try:
+            result = await fn(state)
+        except Exception as e:
+            NODE_ERRORS.inc(node=name)
+            trace_event("node_error", node=name, error=str(e))
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            NODE_DURATION.observe(elapsed, node=name)
+        if current_trace.get() is not None:
+            trace_event("node", node=name, seconds=round(elapsed, 4))
+            result["messages"].append(f"[trace] {name} took {elapsed:.3f}s")
+        return result
+
+    return wrapper
+
+
+def record_llm_call(node: str, model: str, cache: str, elapsed: float, response=None,
+                    attempts: int = 0, error: Optional[Exception] = None):
+    """Record metrics (and a trace event) for one cached_ainvoke call."""
+    LLM_CALLS.inc(node=node, model=model, cache=cache)
+    LLM_DURATION.observe(elapsed, node=node, model=model, cache=cache)
+    if attempts > 1:
+        LLM_RETRIES.inc(attempts - 1, node=node, model=model)
+
+    fields = {"node": node, "model": model, "cache": cache, "seconds": round(elapsed, 4), "attempts": attempts}
+
+    if error is not None:
+        LLM_ERRORS.inc(node=node, model=model)
+        trace_event("llm_error", error=str(error), **fields)
+        return
+
+    usage = getattr(response, "usage_metadata", None) or {}
+    prompt_tokens = usage.get("input_tokens", 0)
+    completion_tokens = usage.get("output_tokens", 0)
+    if prompt_tokens or completion_tokens:
+        LLM_TOKENS.inc(prompt_tokens, node=node, model=model, type="prompt")
+        LLM_TOKENS.inc(completion_tokens, node=node, model=model, type="completion")
+        prompt_price, completion_price = config.LLM_PRICING.get(model, (0.0, 0.0))
+        cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+        if cost:
+            LLM_COST.inc(cost, node=node, model=model)
+        fields.update(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=round(cost, 6))
+
+    trace_event("llm_call", **fields)
+
+
+def make_upstream_hook(upstream: str):
+    """httpx response hook counting requests per upstream and attempts per LLM call."""
+
+    async def on_response(response):
+        UPSTREAM_REQUESTS.inc(upstream=upstream, status=response.status_code)
+        attempts = current_attempts.get()
+        if attempts is not None:
+            attempts.append(response.status_code)
+
+    return on_response
@@ -38,6 +38,8 @@ class AgentState(TypedDict):
     search_queries: List[str]
     raw_search_results: List[dict]
     lawyer_profiles: List[LawyerProfile]
+    compatibility_scores: Dict[str, float]
     recommendations: List[dict]
     reasoning: str
+    include_summary: bool
     messages: List[str]
\ No newline at end of file
@@ -2,6 +2,18 @@ from models import AgentState, LawyerProfile, UserProfile
 from prompts import LAWYER_FINDER_AGENT_PROMPT
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
+from langgraph.config import get_stream_writer
+import asyncio
+import config
+from llm_cache import cache_bypass, cached_ainvoke
+from http_clients import get_http_client, get_sync_http_client, get_timeout
+from chunking import split_by_tokens
+from scoring import rank_lawyers, scores_by_name
+from lawyer_index import describe, get_lawyer_index, to_lawyer_profile
+from entity_resolution import dedupe_lawyer_profiles
+from cohorts import cohort_of, get_cohort_store
+from metrics import COHORT_LOOKUPS
+from typing import Dict, List
 import json
 import os
 import re
@@ -9,27 +21,131 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# LLM for Perplexity Search
-# Print API keys to check if they are loaded
-perplexity_key = os.environ.get("PERPLEXITY_API_KEY")
-openrouter_key = os.environ.get("OPENROUTER_API_KEY")
+# ChatOpenAI settings per upstream: Perplexity for the searches, OpenRouter for
+# generation, extraction and scoring
+LLM_SETTINGS = {
+    "perplexity": {"model": "sonar", "base_url": config.PERPLEXITY_BASE_URL, "api_key_env": "PERPLEXITY_API_KEY"},
+    "openrouter": {
+        "model": "mistralai/mistral-small-3.2-24b-instruct:free",
+        # "model": "deepseek/deepseek-chat-v3-0324:free",
+        "base_url": config.OPENROUTER_BASE_URL,
+        "api_key_env": "OPENROUTER_API_KEY",
+    },
+}
 
-# print(f"Perplexity API Key loaded: {perplexity_key}")
-# print(f"OpenRouter API Key loaded: {openrouter_key}")
+_llms: Dict[str, tuple] = {}
 
-perplexity_llm = ChatOpenAI(
-    model="sonar",
-    api_key=perplexity_key,
-    base_url="https://api.perplexity.ai"
-)
 
-# LLM for other tasks (generation, extraction, scoring)
-openrouter_llm = ChatOpenAI(
-    model="mistralai/mistral-small-3.2-24b-instruct:free",
-    # model="deepseek/deepseek-chat-v3-0324:free",
-    api_key=openrouter_key,
-    base_url="https://openrouter.ai/api/v1"
-)
+def get_llm(name: str) -> ChatOpenAI:
+    """
+    The shared ChatOpenAI client for an upstream, built on the pooled HTTP clients.
+
+    Rebuilt whenever those clients were replaced: after close_http_clients(), or when
+    called from a new event loop (see get_http_client), so it never holds a closed client
+    or connections from a finished loop.
+    """
+    http_client, http_async_client = get_sync_http_client(name), get_http_client(name)
+    entry = _llms.get(name)
+    if entry is None or entry[1] is not http_client or entry[2] is not http_async_client:
+        settings = LLM_SETTINGS[name]
+        llm = ChatOpenAI(
+            model=settings["model"],
+            api_key=os.environ.get(settings["api_key_env"]),
+            base_url=settings["base_url"],
+            http_client=http_client,
+            http_async_client=http_async_client,
+            timeout=get_timeout()
+        )
+        entry = (llm, http_client, http_async_client)
+        _llms[name] = entry
+    return entry[0]
+
+# Placeholder text used when a search fails, so later nodes can skip it
+MOCK_SEARCH_RESULT_PREFIX = "Mock search results for:"
+
+# Query label of the raw_search_results entry holding local index hits
+LOCAL_INDEX_QUERY = "local lawyer index"
+
+def emit_event(event: str, data) -> None:
+    """Send a partial result to stream_mode="custom" consumers. No-op outside a streaming graph run."""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # Called directly, not from inside a graph run
+        return
+    writer({"event": event, "data": data})
+
+# Warm cohort pools: precomputed queries, search results and lawyers (see precompute_cohorts.py)
+async def load_cohort_pool(state: AgentState) -> AgentState:
+    """Load the precomputed lawyer pool for the user's cohort, if one is warm (no LLM call).
+
+    Skipped for cache-bypassing requests, which want fresh searches.
+    """
+
+    if not config.COHORT_CACHE_ENABLED or cache_bypass.get():
+        return state
+
+    cohort = cohort_of(state["user_profile"])
+    try:
+        pool = await asyncio.to_thread(get_cohort_store().get, cohort)
+    except Exception as e:
+        state["messages"].append(f"Error loading cohort pool: {str(e)}")
+        return state
+
+    COHORT_LOOKUPS.inc(outcome="hit" if pool else "miss")
+    if pool:
+        state["search_queries"] = pool["search_queries"]
+        state["raw_search_results"] = pool["raw_search_results"]
+        state["lawyer_profiles"] = pool["lawyer_profiles"]
+        state["messages"].append(
+            f"Loaded {len(pool['lawyer_profiles'])} lawyers from the warm pool for "
+            f"{cohort['nationality']} / {cohort['industry']} / {cohort['location_preference']}"
+        )
+    return state
+
+def route_after_cohort(state: AgentState) -> str:
+    """Go straight to ranking when a warm cohort pool was loaded."""
+    if state["lawyer_profiles"]:
+        return "score_lawyers"
+    return "search_local"
+
+# Node 0: Look up lawyers in the local index
+async def search_local_index(state: AgentState) -> AgentState:
+    """Find lawyers in the local scraped index (no LLM call).
+
+    Hits become lawyer profiles plus one raw_search_results entry describing them, so the
+    scoring engine can rank them like live search results.
+    """
+
+    if not config.LAWYER_INDEX_ENABLED:
+        return state
+
+    user_profile = state["user_profile"]
+    try:
+        index = await asyncio.to_thread(get_lawyer_index)
+        rows = await asyncio.to_thread(
+            index.search,
+            config.LAWYER_INDEX_QUERY,
+            location=user_profile.location_preference,
+            min_rating=config.LAWYER_INDEX_MIN_RATING,
+            eb1_only=config.LAWYER_INDEX_EB1_ONLY,
+            limit=config.LAWYER_INDEX_MAX_RESULTS
+        )
+    except Exception as e:
+        state["messages"].append(f"Error searching local lawyer index: {str(e)}")
+        return state
+
+    if rows:
+        state["lawyer_profiles"] = dedupe_lawyer_profiles([to_lawyer_profile(row) for row in rows])
+        state["raw_search_results"] = [{"query": LOCAL_INDEX_QUERY, "results": "\n".join(describe(row) for row in rows)}]
+    state["messages"].append(f"Found {len(rows)} lawyers in the local index")
+    return state
+
+def route_after_local_search(state: AgentState) -> str:
+    """Skip the live search when the local index already found enough lawyers."""
+    if len(state["lawyer_profiles"]) >= config.LAWYER_INDEX_MIN_RESULTS:
+        return "score_lawyers"
+    return "generate_queries"
 
 async def generate_search_queries(state: AgentState) -> AgentState:
     """Generate targeted search queries based on user profile."""
@@ -59,13 +175,12 @@ async def generate_search_queries(state: AgentState) -> AgentState:
     Focus on finding lawyers with verifiable success rates and specific EB-1A experience.
     """
 
-    response = await openrouter_llm.ainvoke([
+    response = await cached_ainvoke(get_llm("openrouter"), [
         SystemMessage(content="You are an expert at generating search queries for finding specialized lawyers."),
         HumanMessage(content=search_prompt)
-    ])
+    ], node="generate_queries")
 
     # Parse the queries from LLM response
-    import re
     queries_text = response.content
 
     # Extract JSON array from response
@@ -88,11 +203,11 @@ async def generate_search_queries(state: AgentState) -> AgentState:
 
 # Node 2: Execute Perplexity Search
 async def search_with_perplexity(state: AgentState) -> AgentState:
-    """Execute searches using Perplexity API."""
+    """Execute searches using Perplexity API, running the queries concurrently."""
 
-    all_results = []
+    semaphore = asyncio.Semaphore(max(1, config.SEARCH_CONCURRENCY))
 
-    for query in state["search_queries"]:
+    async def run_search(query: str) -> dict:
         perplexity_prompt = f"""
         Search for information about EB-1A immigration lawyers with the following query:
         "{query}"
@@ -105,116 +220,178 @@ async def search_with_perplexity(state: AgentState) -> AgentState:
         Provide detailed, factual information with sources when available.
         """
 
-        try:
-            response = await perplexity_llm.ainvoke([
-                SystemMessage(content="You are a helpful assistant finding information about immigration lawyers."),
-                HumanMessage(content=perplexity_prompt)
-            ])
-
-            all_results.append({
-                "query": query,
-                "results": response.content
-            })
-
-        except Exception as e:
-            state["messages"].append(f"Error searching with Perplexity: {str(e)}")
-            # Fallback to regular LLM with mock data
-            all_results.append({
-                "query": query,
-                "results": f"Mock search results for: {query}"
-            })
-
-    state["raw_search_results"] = all_results
+        async with semaphore:
+            try:
+                response = await asyncio.wait_for(
+                    cached_ainvoke(get_llm("perplexity"), [
+                        SystemMessage(content="You are a helpful assistant finding information about immigration lawyers."),
+                        HumanMessage(content=perplexity_prompt)
+                    ], node="search_lawyers"),
+                    timeout=config.SEARCH_TIMEOUT_SECONDS
+                )
+
+                result = {
+                    "query": query,
+                    "results": response.content
+                }
+
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    error = f"timed out after {config.SEARCH_TIMEOUT_SECONDS}s"
+                else:
+                    error = str(e)
+                state["messages"].append(f"Error searching with Perplexity: {error}")
+                # Fallback to regular LLM with mock data
+                result = {
+                    "query": query,
+                    "results": f"{MOCK_SEARCH_RESULT_PREFIX} {query}"
+                }
+
+        emit_event("search_result", result)
+        return result
+
+    # gather() keeps the results in the same order as state["search_queries"]
+    all_results = await asyncio.gather(*(run_search(query) for query in state["search_queries"]))
+
+    # Keep any local index hits ahead of the live results
+    state["raw_search_results"] = state["raw_search_results"] + list(all_results)
     state["messages"].append(f"Completed {len(all_results)} searches")
     return state
 
 # Node 3: Extract and Generate Lawyer Profiles
+def parse_lawyer_profiles(text: str) -> List[LawyerProfile]:
+    """Parse the JSON array of lawyer profiles out of an LLM response. Raises ValueError if none is found."""
+    json_match = re.search(r'\[.*\]', text, re.DOTALL)
+    if not json_match:
+        raise ValueError("no JSON array in response")
+    try:
+        return [LawyerProfile(**profile) for profile in json.loads(json_match.group())]
+    except TypeError as e:
+        raise ValueError(str(e)) from e
+
+def build_extraction_chunks(raw_search_results: List[dict]) -> List[str]:
+    """Compact, token-bounded chunks: one per search result, split further if a result is too long."""
+    chunks = []
+    for result in raw_search_results:
+        text = str(result["results"])
+        if text.startswith(MOCK_SEARCH_RESULT_PREFIX) or result["query"] == LOCAL_INDEX_QUERY:
+            # Placeholder from a failed search, or local hits that are already profiles
+            continue
+        for piece in split_by_tokens(text, config.EXTRACT_CHUNK_TOKENS, config.EXTRACT_CHUNK_OVERLAP_TOKENS):
+            chunks.append(json.dumps({"query": result["query"], "results": piece}, ensure_ascii=False))
+    return chunks
+
 async def extract_lawyer_profiles(state: AgentState) -> AgentState:
-    """Extract structured lawyer profiles from search results."""
+    """Extract structured lawyer profiles from search results.
 
-    extraction_prompt = f"""
-    You are an expert at extracting structured information about lawyers from search results.
+    Map: each chunk of search results is extracted concurrently with its own small prompt.
+    Reduce: the per-chunk profiles are merged and deduplicated.
+    """
 
-    Search Results:
-    {json.dumps(state["raw_search_results"], indent=2)}
+    semaphore = asyncio.Semaphore(max(1, config.EXTRACT_CONCURRENCY))
 
-    Extract information about EB-1A immigration lawyers and create detailed profiles.
+    async def extract_chunk(chunk: str) -> List[LawyerProfile]:
+        extraction_prompt = f"""
+        You are an expert at extracting structured information about lawyers from search results.
 
-    For each lawyer found, extract:
-    - Full name
-    - Law firm
-    - Contact information (email, phone, website)
+        Search Results:
+        {chunk}
 
-    IMPORTANT RULES:
-    1. Verify the lawyer specializes in EB-1A specifically, not just general immigration.
-    2. Only include lawyers where you can find contact information.
+        Extract information about EB-1A immigration lawyers and create detailed profiles.
 
-    Return the profiles as a JSON array. Each profile should match this structure:
-    {{
-        "name": "string",
-        "firm": "string",
-        "contact_info": {{"email": "string", "phone": "string", "website": "string"}}
-    }}
-    """
+        For each lawyer found, extract:
+        - Full name
+        - Law firm
+        - Contact information (email, phone, website)
 
-    response = await openrouter_llm.ainvoke([
-        SystemMessage(content="You are an expert at extracting and structuring lawyer information from text."),
-        HumanMessage(content=extraction_prompt)
-    ])
+        IMPORTANT RULES:
+        1. Verify the lawyer specializes in EB-1A specifically, not just general immigration.
+        2. Only include lawyers where you can find contact information.
 
-    # Parse lawyer profiles
-    profiles_text = response.content
-    json_match = re.search(r'\[.*\]', profiles_text, re.DOTALL)
+        Return the profiles as a JSON array (an empty array if there are none). Each profile should match this structure:
+        {{
+            "name": "string",
+            "firm": "string",
+            "contact_info": {{"email": "string", "phone": "string", "website": "string"}}
+        }}
+        """
+
+        async with semaphore:
+            try:
+                response = await cached_ainvoke(get_llm("openrouter"), [
+                    SystemMessage(content="You are an expert at extracting and structuring lawyer information from text."),
+                    HumanMessage(content=extraction_prompt)
+                ], node="extract_profiles")
+            except Exception as e:
+                state["messages"].append(f"Error extracting lawyer profiles: {str(e)}")
+                return []
 
-    if json_match:
         try:
-            profiles_data = json.loads(json_match.group())
-            lawyer_profiles = [LawyerProfile(**profile) for profile in profiles_data]
-        except (json.JSONDecodeError, TypeError) as e:
-            state["messages"].append(f"Error parsing lawyer profiles: {str(e)}. No profiles extracted.")
-            lawyer_profiles = []
-    else:
-        # Fallback with no profiles if no JSON is found
+            return parse_lawyer_profiles(response.content)
+        except ValueError as e:
+            state["messages"].append(f"Error parsing lawyer profiles: {str(e)}. No profiles extracted from chunk.")
+            return []
+
+    chunks = build_extraction_chunks(state["raw_search_results"])
+    chunk_profiles = await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks))
+    extracted = [profile for profiles in chunk_profiles for profile in profiles]
+    # Local index hits (if any) come first, so they win ties when merging duplicates
+    lawyer_profiles = dedupe_lawyer_profiles(state["lawyer_profiles"] + extracted)
+
+    if not lawyer_profiles:
         state["messages"].append("Could not find any lawyer profiles in the search results.")
-        lawyer_profiles = []
 
     state["lawyer_profiles"] = lawyer_profiles
-    state["messages"].append(f"Extracted {len(lawyer_profiles)} qualified lawyer profiles")
+    state["messages"].append(f"Extracted {len(lawyer_profiles)} qualified lawyer profiles from {len(chunks)} chunks")
     return state
 
-# Node 5: Generate Final Recommendations
-async def generate_recommendations(state: AgentState) -> AgentState:
-    """Generate final lawyer recommendations."""
+# Node 4: Score and Rank Lawyers
+async def score_lawyer_profiles(state: AgentState) -> AgentState:
+    """Rank lawyer profiles against the user's priorities with the local scoring engine (no LLM call)."""
 
-    user_profile = state["user_profile"]
+    ranked = rank_lawyers(state["lawyer_profiles"], state["user_profile"], state["raw_search_results"])
+
+    state["lawyer_profiles"] = [lawyer for lawyer, _ in ranked]
+    state["compatibility_scores"] = scores_by_name(ranked)
+    state["messages"].append(f"Scored {len(ranked)} lawyer profiles")
+    return state
+
+# Node 5: Generate Final Recommendations
+def default_recommendation_text(lawyer: LawyerProfile) -> dict:
+    """Prose used when the LLM doesn't return usable text for a lawyer."""
+    return {
+        "reason": f"Found profile for {lawyer.name} specializing in EB-1A cases. "
+                  "Contact information is available to start the process.",
+        "next_steps": f"Schedule initial consultation via {lawyer.contact_info.get('email') or 'their website'}. "
+                      "Prepare your CV and list of achievements for discussion, and "
+                      "inquire about their specific experience with cases like yours."
+    }
+
+async def write_recommendation_text(user_profile, recommendations: List[dict], messages: List[str]):
+    """Ask the LLM for the reason and next steps of each recommendation, in place.
+
+    Recommendations keep their default text when the call fails or can't be parsed.
+    """
 
     recommendation_prompt = f"""
     You are an expert at making personalized lawyer recommendations for EB-1A visa applications.
 
     User Profile:
-    {user_profile.model_dump_json(indent=2)}
+    {user_profile.model_dump_json()}
 
-    Lawyer Profiles:
-    {json.dumps([lawyer.model_dump() for lawyer in state["lawyer_profiles"]], indent=2)}
+    Selected Lawyers (already ranked for this user, with compatibility scores out of 100):
+    {json.dumps([{"name": r["lawyer"]["name"], "firm": r["lawyer"]["firm"], "compatibility_score": r["compatibility_score"]} for r in recommendations])}
 
-    Based on the available information, recommend the TOP 2 lawyers for this user.
+    For each selected lawyer, explain why they are a good fit for this user and what to do next.
 
-    Your response MUST be a single, valid JSON array. Each object in the array represents one
-    lawyer recommendation and MUST conform to the exact structure below. Do not add any
-    introductory text or explanations outside of the JSON structure.
+    Your response MUST be a single, valid JSON array with one object per lawyer, in the same order,
+    conforming to the exact structure below. Do not add any introductory text or explanations
+    outside of the JSON structure.
 
     ```json
     [
       {{
-        "lawyer": {{
-          "name": "Lawyer's Full Name",
-          "firm": "Name of the Law Firm",
-          "contact_info": {{
-            "email": "lawyer@example.com",
-            "phone": "123-456-7890",
-            "website": "[www.lawfirm.com](https://www.lawfirm.com)"
-          }}
-        }},
+        "name": "Lawyer's Full Name",
         "reason": "A brief statement on why they are a good starting point for the user.",
         "next_steps": "Specific, actionable next steps the user should take."
       }}
@@ -222,48 +399,83 @@ async def generate_recommendations(state: AgentState) -> AgentState:
     ```
     """
 
-    response = await openrouter_llm.ainvoke([
-        SystemMessage(content="You are an expert immigration consultant providing personalized lawyer recommendations."),
-        HumanMessage(content=recommendation_prompt)
-    ])
-
-    # Parse recommendations
-    recommendations_text = response.content
-    json_match = re.search(r'\[.*\]', recommendations_text, re.DOTALL)
-
-    if json_match:
-        recommendations = json.loads(json_match.group())
-    else:
-        # Create default recommendations
-        sorted_lawyers = state["lawyer_profiles"][:2]
-
-        recommendations = []
-        for i, lawyer in enumerate(sorted_lawyers):
-            recommendations.append({
-                "rank": i + 1,
-                "lawyer": lawyer.model_dump(),
-                "why_recommended": [
-                    f"Found profile for {lawyer.name} specializing in EB-1A cases.",
-                    "Contact information is available to start the process."
-                ],
-                "next_steps": [
-                    f"Schedule initial consultation via {lawyer.contact_info.get('email', 'their website')}",
-                    "Prepare your CV and list of achievements for discussion",
-                    "Inquire about their specific experience with cases like yours.",
-                ]
-            })
-
-    state["recommendations"] = recommendations
+    try:
+        response = await cached_ainvoke(get_llm("openrouter"), [
+            SystemMessage(content="You are an expert immigration consultant providing personalized lawyer recommendations."),
+            HumanMessage(content=recommendation_prompt)
+        ], node="generate_recommendations")
+
+        # Parse recommendation text
+        json_match = re.search(r'\[.*\]', response.content, re.DOTALL)
+        if json_match:
+            texts = [text for text in json.loads(json_match.group()) if isinstance(text, dict)]
+            texts_by_name = {str(text.get("name", "")).lower(): text for text in texts}
+            for i, recommendation in enumerate(recommendations):
+                # Match on name, falling back to position
+                text = texts_by_name.get(recommendation["lawyer"]["name"].lower())
+                if text is None and i < len(texts):
+                    text = texts[i]
+                for field in ("reason", "next_steps"):
+                    if text and text.get(field):
+                        recommendation[field] = text[field]
+        else:
+            messages.append("Could not parse recommendation text, using defaults.")
+    except Exception as e:
+        messages.append(f"Error generating recommendation text: {str(e)}. Using defaults.")
+
+async def generate_summary(user_profile, recommendations: List[dict], messages: List[str]) -> str:
+    """Summarize in 2-3 sentences why these lawyers were selected.
+
+    Only needs the selected names, so it can run alongside the recommendation text
+    or after the recommendations have been returned. Returns "" if the call fails.
+    """
 
-    # Generate final reasoning
     reasoning_prompt = f"""
     Summarize why these lawyers were selected for the user in 2-3 sentences.
     User priorities: {user_profile.priority_factors}
     Selected lawyers: {[r['lawyer']['name'] for r in recommendations]}
     """
 
-    reasoning_response = await openrouter_llm.ainvoke([HumanMessage(content=reasoning_prompt)])
-    state["reasoning"] = reasoning_response.content
+    try:
+        reasoning_response = await cached_ainvoke(get_llm("openrouter"), [HumanMessage(content=reasoning_prompt)], node="generate_recommendations")
+    except Exception as e:
+        messages.append(f"Error generating summary: {str(e)}. Summary left empty.")
+        return ""
+    return reasoning_response.content
+
+async def generate_recommendations(state: AgentState) -> AgentState:
+    """Generate final lawyer recommendations.
+
+    The top 2 lawyers are picked by compatibility score; the LLM only writes the reason and next steps.
+    The summary is generated concurrently with that text, or skipped when state["include_summary"] is False.
+    """
+
+    user_profile = state["user_profile"]
+    scores = state.get("compatibility_scores") or {}
+    top_lawyers = state["lawyer_profiles"][:2]
+
+    recommendations = [
+        {
+            "rank": i + 1,
+            "lawyer": lawyer.model_dump(),
+            "compatibility_score": scores.get(lawyer.name),
+            **default_recommendation_text(lawyer)
+        }
+        for i, lawyer in enumerate(top_lawyers)
+    ]
+
+    # The summary only depends on which lawyers were picked, not on their text
+    tasks = []
+    if recommendations:
+        tasks.append(write_recommendation_text(user_profile, recommendations, state["messages"]))
+    include_summary = state.get("include_summary", True)
+    if include_summary:
+        tasks.append(generate_summary(user_profile, recommendations, state["messages"]))
+
+    results = await asyncio.gather(*tasks)
+
+    state["recommendations"] = recommendations
+    state["reasoning"] = results[-1] if include_summary else ""
 
     state["messages"].append(f"Generated {len(recommendations)} lawyer recommendations")
-    return state
\ No newline at end of file
+    return state
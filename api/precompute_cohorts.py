@@ -0,0 +1,153 @@
+# precompute_cohorts.py - Warms the cohort pools live requests are served from.
+#
+# For every cohort in the matrix (COHORT_MATRIX, or --matrix), runs the expensive front
+# half of the graph once for a representative profile: local index lookup, query
+# generation, the Perplexity searches and profile extraction. The resulting queries,
+# search results and deduplicated lawyer pool are stored in the cohort cache (see
+# cohorts.py); requests in a warm cohort then only pay for ranking and recommendation text.
+#
+# Run it on a schedule shorter than COHORT_CACHE_TTL (e.g. from cron) to keep pools warm.
+#
+# Usage:
+#   python precompute_cohorts.py                       # every cohort in COHORT_MATRIX
+#   python precompute_cohorts.py --only-missing        # skip cohorts that are still warm
+#   python precompute_cohorts.py --matrix cohorts.json --refresh --concurrency 4
+#   python precompute_cohorts.py --list
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from cohorts import cohort_of, cohort_profile, expand_matrix, get_cohort_store
+from http_clients import close_http_clients
+from llm_cache import cache_bypass
+from main import build_initial_state
+from nodes import (LOCAL_INDEX_QUERY, MOCK_SEARCH_RESULT_PREFIX, extract_lawyer_profiles, generate_search_queries,
+                   search_local_index, search_with_perplexity)
+import config
+
+
+async def precompute_cohort(cohort: Dict[str, Optional[str]], refresh: bool = False) -> dict:
+    """
+    Build and store the pool for one cohort.
+
+    Args:
+        cohort: Raw matrix values, e.g. {"nationality": "Indian", "industry": "Technology", "location_preference": None}
+        refresh: Skip cached LLM responses so the searches are fresh
+
+    Returns:
+        A report: the cohort, lawyers and searches in the pool, seconds taken, and the error if it wasn't stored
+    """
+    start = time.perf_counter()
+    user_profile = cohort_profile(cohort)
+    state = build_initial_state(user_profile, include_summary=False)
+
+    token = cache_bypass.set(refresh)
+    try:
+        # Always search live: a warm pool should hold more than the local hits alone
+        state = await search_local_index(state)
+        state = await generate_search_queries(state)
+        state = await search_with_perplexity(state)
+        state = await extract_lawyer_profiles(state)
+    except Exception as e:
+        return {"cohort": cohort, "error": str(e), "seconds": round(time.perf_counter() - start, 1)}
+    finally:
+        cache_bypass.reset(token)
+
+    live_results = [
+        result for result in state["raw_search_results"]
+        if result["query"] != LOCAL_INDEX_QUERY and not str(result["results"]).startswith(MOCK_SEARCH_RESULT_PREFIX)
+    ]
+    report = {
+        "cohort": cohort,
+        "lawyers": len(state["lawyer_profiles"]),
+        "searches": f"{len(live_results)}/{len(state['search_queries'])}",
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+    # Don't serve a degraded pool for a whole TTL; the next run retries
+    if not live_results:
+        report["error"] = "every search failed"
+    elif not state["lawyer_profiles"]:
+        report["error"] = "no lawyers extracted"
+    else:
+        await asyncio.to_thread(
+            get_cohort_store().set, cohort_of(user_profile), state["search_queries"], state["raw_search_results"],
+            state["lawyer_profiles"], config.COHORT_CACHE_TTL_SECONDS
+        )
+    return report
+
+
+async def precompute(cohorts: List[Dict[str, Optional[str]]], concurrency: int = config.COHORT_PRECOMPUTE_CONCURRENCY,
+                     refresh: bool = False, only_missing: bool = False) -> List[dict]:
+    """Precompute every cohort, at most `concurrency` at a time. Reports are in cohort order."""
+    store = get_cohort_store()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(cohort):
+        if only_missing and await asyncio.to_thread(store.get, cohort_of(cohort_profile(cohort))):
+            report = {"cohort": cohort, "skipped": "still warm"}
+        else:
+            async with semaphore:
+                report = await precompute_cohort(cohort, refresh)
+        print(format_report(report), flush=True)
+        return report
+
+    return await asyncio.gather(*(run(cohort) for cohort in cohorts))
+
+
+def format_report(report: dict) -> str:
+    cohort = " / ".join(str(value or "any") for value in report["cohort"].values())
+    if "skipped" in report:
+        return f"{cohort}: skipped ({report['skipped']})"
+    if "error" in report:
+        return f"{cohort}: NOT STORED, {report['error']} ({report['seconds']}s)"
+    return f"{cohort}: {report['lawyers']} lawyers from {report['searches']} searches ({report['seconds']}s)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute lawyer pools for common user cohorts.")
+    parser.add_argument("--matrix", help="JSON file with the cohort matrix (default: COHORT_MATRIX)")
+    parser.add_argument("--concurrency", type=int, default=config.COHORT_PRECOMPUTE_CONCURRENCY,
+                        help="Cohorts precomputed at the same time")
+    parser.add_argument("--refresh", action="store_true", help="Bypass the LLM cache for fresh searches")
+    parser.add_argument("--only-missing", action="store_true", help="Skip cohorts whose pool is still warm")
+    parser.add_argument("--list", action="store_true", help="List the stored pools and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for entry in get_cohort_store().list():
+            cohort = " / ".join(entry["cohort"].values())
+            expires = datetime.fromtimestamp(entry["expires_at"]).isoformat(timespec="minutes")
+            print(f"{cohort}: {entry['lawyers']} lawyers, expires {expires}")
+        return
+
+    matrix = config.COHORT_MATRIX
+    if args.matrix:
+        with open(args.matrix, "r", encoding="utf-8") as f:
+            matrix = json.load(f)
+    cohorts = expand_matrix(matrix)
+    print(f"Precomputing {len(cohorts)} cohorts (concurrency {args.concurrency})")
+
+    async def run_all():
+        try:
+            return await precompute(cohorts, args.concurrency, args.refresh, args.only_missing)
+        finally:
+            await close_http_clients()
+
+    reports = asyncio.run(run_all())
+    failed = [report for report in reports if "error" in report]
+    stored = [report for report in reports if "lawyers" in report and "error" not in report]
+    print(f"Stored {len(stored)} pools, "
+          f"{sum('skipped' in report for report in reports)} skipped, {len(failed)} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import re
+from typing import Dict, List, Tuple
+
+from models import LawyerProfile, UserProfile
+
+# Deterministic lawyer ranking. Every lawyer is turned into a feature vector in [0, 1]
+# built from their profile and the search-result text around their mentions. The
+# score is the weighted average of that vector, with weights boosted by the user's
+# priority_factors. There is no LLM or randomness, so the same input always produces
+# the same ranking.
+
+FEATURES = ["mentions", "contact", "location", "industry", "nationality", "success_rate", "cost", "timeline"]
+
+BASE_WEIGHTS = {
+    "mentions": 1.0,
+    "contact": 1.0,
+    "location": 1.0,
+    "industry": 1.0,
+    "nationality": 0.5,
+    "success_rate": 1.0,
+    "cost": 1.0,
+    "timeline": 0.5,
+}
+
+# Maps the free-form priority_factors users send onto features
+PRIORITY_ALIASES = {
+    "success_rate": "success_rate",
+    "success": "success_rate",
+    "approval_rate": "success_rate",
+    "cost": "cost",
+    "budget": "cost",
+    "price": "cost",
+    "fees": "cost",
+    "location": "location",
+    "industry_expertise": "industry",
+    "industry": "industry",
+    "expertise": "industry",
+    "nationality": "nationality",
+    "timeline": "timeline",
+    "speed": "timeline",
+    "reputation": "mentions",
+    "communication": "contact",
+}
+
+# Neutral value for features we have no evidence for either way
+UNKNOWN = 0.5
+
+CONTEXT_CHARS = 300
+MAX_CONTEXTS = 20
+
+_SUCCESS_RATE = re.compile(r"(\d{2,3}(?:\.\d+)?)\s?%\s*(?:\w+\s){0,3}?(?:success|approval)|(?:success|approval)\s+rates?\D{0,20}(\d{2,3}(?:\.\d+)?)\s?%", re.IGNORECASE)
+_SUCCESS_WORDS = re.compile(r"success rate|approval rate|high success|approved", re.IGNORECASE)
+_DOLLARS = re.compile(r"\$\s?(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k\b)?", re.IGNORECASE)
+_FAST_WORDS = re.compile(r"premium processing|expedit|fast|quick|rapid|within \d+ (?:days|weeks)", re.IGNORECASE)
+
+
+def feature_weights(user_profile: UserProfile) -> List[float]:
+    """Weight vector for a user. Earlier priority factors get bigger boosts."""
+    weights = dict(BASE_WEIGHTS)
+    factors = user_profile.priority_factors or []
+    for position, factor in enumerate(factors):
+        feature = PRIORITY_ALIASES.get(factor.strip().lower().replace(" ", "_"))
+        if feature:
+            weights[feature] += len(factors) - position + 1
+    if user_profile.timeline_urgency.strip().lower() == "urgent":
+        weights["timeline"] += 2
+    return [weights[feature] for feature in FEATURES]
+
+
+def mention_contexts(lawyer: LawyerProfile, raw_search_results: List[dict]) -> Tuple[int, str]:
+    """Number of search results mentioning the lawyer, and the text around those mentions."""
+    names = [re.escape(value.strip()) for value in (lawyer.name, lawyer.firm) if value and value.strip()]
+    if not names:
+        return 0, ""
+    pattern = re.compile(r"\b(?:" + "|".join(names) + r")\b", re.IGNORECASE)
+
+    hits = 0
+    contexts = []
+    for result in raw_search_results:
+        text = str(result.get("results", ""))
+        end = -1
+        found = False
+        for match in pattern.finditer(text):
+            found = True
+            if len(contexts) >= MAX_CONTEXTS:
+                break
+            start = max(0, match.start() - CONTEXT_CHARS)
+            if start < end:
+                # Overlaps the previous window, extend it instead of duplicating text
+                start = end
+            end = match.end() + CONTEXT_CHARS
+            contexts.append(text[start:end])
+        hits += found
+    return hits, "\n".join(contexts)
+
+
+def _contains_any(text: str, terms: List[str]) -> bool:
+    """Whole-word, case-insensitive match of any term (so "NY" doesn't match "many")."""
+    terms = [re.escape(term.strip()) for term in terms if term and term.strip()]
+    if not terms:
+        return False
+    return re.search(r"\b(?:" + "|".join(terms) + r")\b", text, re.IGNORECASE) is not None
+
+
+def _dollar_amounts(text: str) -> List[float]:
+    amounts = []
+    for number, thousands in _DOLLARS.findall(text):
+        value = float(number.replace(",", ""))
+        amounts.append(value * 1000 if thousands else value)
+    # Ignore small amounts like filing fees; attorney fees for EB-1A are in the thousands
+    return [amount for amount in amounts if amount >= 1000]
+
+
+def lawyer_features(lawyer: LawyerProfile, user_profile: UserProfile, raw_search_results: List[dict]) -> List[float]:
+    """Feature vector for one lawyer, in FEATURES order."""
+    hits, context = mention_contexts(lawyer, raw_search_results)
+    features = {}
+
+    features["mentions"] = min(1.0, hits / 3)
+
+    contact_fields = ["email", "phone", "website"]
+    features["contact"] = sum(1 for field in contact_fields if lawyer.contact_info.get(field)) / len(contact_fields)
+
+    if user_profile.location_preference:
+        location_terms = [user_profile.location_preference] + [
+            part.strip() for part in user_profile.location_preference.split(",")
+        ]
+        features["location"] = 1.0 if _contains_any(context, location_terms) else 0.0
+    else:
+        features["location"] = UNKNOWN
+
+    features["industry"] = 1.0 if _contains_any(context, [user_profile.industry, user_profile.occupation]) else 0.0
+    features["nationality"] = 1.0 if _contains_any(context, [user_profile.nationality]) else 0.0
+
+    rates = [float(a or b) for a, b in _SUCCESS_RATE.findall(context)]
+    rates = [rate for rate in rates if rate <= 100]
+    if rates:
+        features["success_rate"] = max(rates) / 100
+    else:
+        features["success_rate"] = 0.6 if _SUCCESS_WORDS.search(context) else 0.0
+
+    amounts = _dollar_amounts(context)
+    budget_max = user_profile.budget_range.get("max", float("inf"))
+    if not amounts:
+        features["cost"] = UNKNOWN
+    elif min(amounts) <= budget_max:
+        features["cost"] = 1.0
+    else:
+        # Scale down the further the cheapest quote is above the budget
+        features["cost"] = max(0.0, 1 - (min(amounts) - budget_max) / max(budget_max, 1))
+
+    features["timeline"] = 1.0 if _FAST_WORDS.search(context) else 0.0
+
+    return [features[feature] for feature in FEATURES]
+
+
+def score_lawyers(lawyers: List[LawyerProfile], user_profile: UserProfile,
+                  raw_search_results: List[dict]) -> List[float]:
+    """Compatibility scores (0-100) for each lawyer, in input order."""
+    weights = feature_weights(user_profile)
+    total_weight = sum(weights)
+    matrix = [lawyer_features(lawyer, user_profile, raw_search_results) for lawyer in lawyers]
+    return [
+        round(100 * sum(value * weight for value, weight in zip(row, weights)) / total_weight, 2)
+        for row in matrix
+    ]
+
+
+def rank_lawyers(lawyers: List[LawyerProfile], user_profile: UserProfile,
+                 raw_search_results: List[dict]) -> List[Tuple[LawyerProfile, float]]:
+    """Lawyers paired with their score, best first. Ties are broken by name so ordering is stable."""
+    scores = score_lawyers(lawyers, user_profile, raw_search_results)
+    return sorted(zip(lawyers, scores), key=lambda pair: (-pair[1], pair[0].name.lower(), pair[0].firm.lower()))
+
+
+def scores_by_name(ranked: List[Tuple[LawyerProfile, float]]) -> Dict[str, float]:
+    return {lawyer.name: score for lawyer, score in ranked}
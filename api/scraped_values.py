@@ -0,0 +1,36 @@
+import re
+from typing import Optional, Tuple
+
+# Placeholder handling and Avvo link parsing for scraped lawyer listings, shared by the API
+# (lawyer_index.py, entity_resolution.py) and the scraper-side corpus (../lawyer_corpus.py).
+# Standard library only, so both sides can import it without pulling in the other's dependencies.
+
+# Values the scraper writes when a field is missing
+MISSING_VALUES = {"", "name not found", "link not found", "rating not found", "location not found",
+                  "see profile", "visit profile for details", "licensed for x years"}
+
+# e.g. https://www.avvo.com/attorneys/33180-fl-andrey-plaksin-3795376.html
+_AVVO_SLUG = re.compile(r"/attorneys/\d+-[a-z]{2}-(?P<slug>[a-z0-9-]+?)-\d+\.html", re.IGNORECASE)
+_RATING = re.compile(r"^\s*(?P<rating>\d+(?:\.\d+)?)")
+_REVIEWS = re.compile(r"(?P<count>\d+)\s+reviews?", re.IGNORECASE)
+
+
+def clean_value(value) -> str:
+    """Collapse whitespace; scraper placeholders like 'Name not found' become ''."""
+    value = " ".join(str(value or "").split())
+    return "" if value.lower() in MISSING_VALUES else value
+
+
+def name_from_link(profile_link: str) -> str:
+    """Recover a lawyer's name from an Avvo profile URL when the scraper missed it."""
+    match = _AVVO_SLUG.search(profile_link)
+    return match.group("slug").replace("-", " ").title() if match else ""
+
+
+def parse_rating(value) -> Tuple[Optional[float], Optional[int]]:
+    """'9.8 (12 reviews)' -> (9.8, 12); placeholders -> (None, None)."""
+    value = clean_value(value)
+    rating = _RATING.match(value)
+    reviews = _REVIEWS.search(value)
+    return (float(rating.group("rating")) if rating else None,
+            int(reviews.group("count")) if reviews else None)
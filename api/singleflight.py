@@ -0,0 +1,31 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+from models import UserProfile
+
+
+def profile_key(user_profile: UserProfile, *extra: Any) -> str:
+    """Canonical hash of a profile (plus any request options that change the result)."""
+    payload = json.dumps([user_profile.model_dump(mode="json"), list(extra)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one shared execution."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield() so a caller that disconnects doesn't cancel the run for everyone else
+        return await asyncio.shield(task)
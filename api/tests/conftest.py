@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The api modules import each other flat (e.g. "from models import ..."), as when run from api/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
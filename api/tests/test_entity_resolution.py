@@ -0,0 +1,67 @@
+from entity_resolution import EntityRecord, dedupe_lawyer_profiles, dedupe_rows, resolve
+from models import LawyerProfile
+
+
+def row(name, link="Link not found", location=""):
+    return {"Name": name, "Profile Link": link, "Location": location}
+
+
+def test_same_lawyer_variants_merge():
+    profiles = [
+        LawyerProfile(name="John A. Smith, Esq.", firm="Smith Immigration Law PLLC", contact_info={"phone": "(212) 555-0100"}),
+        LawyerProfile(name="Smith, John", firm="Smith Law Firm", contact_info={"email": "john@smithlaw.com"}),
+        LawyerProfile(name="J. Smith", firm="", contact_info={"website": "https://www.smithlaw.com/team", "phone": "212.555.0100"}),
+    ]
+    merged = dedupe_lawyer_profiles(profiles)
+    assert len(merged) == 1
+    assert merged[0].name == "John A. Smith, Esq."
+    assert merged[0].contact_info == {
+        "phone": "(212) 555-0100", "email": "john@smithlaw.com", "website": "https://www.smithlaw.com/team",
+    }
+
+
+def test_same_profile_link_merges():
+    link = "https://www.avvo.com/attorneys/10004-ny-william-josephson-771385.html"
+    merged, clusters = dedupe_rows([row("William Josephson", link), row("Name not found", link)])
+    assert clusters == [[0, 1]]
+    assert merged[0]["Name"] == "William Josephson"
+
+
+def test_different_people_stay_apart():
+    profiles = [
+        LawyerProfile(name="John Smith", firm="Smith Immigration Law", contact_info={}),
+        LawyerProfile(name="Jane Smith", firm="Smith Immigration Law", contact_info={}),
+        LawyerProfile(name="Maria Garcia", firm="Garcia & Associates", contact_info={}),
+        LawyerProfile(name="Maria Garcia", firm="Baker McKenzie LLP", contact_info={}),
+        LawyerProfile(name="Maria Garcia", firm="", contact_info={}),
+    ]
+    assert len(dedupe_lawyer_profiles(profiles)) == 4
+
+
+def test_placeholder_links_are_not_shared_contact():
+    rows = [
+        row("John Smith", location="New York, NY"),
+        row("Jon Smith", location="Austin, TX"),
+        row("J. Smith", location="Miami, FL"),
+        row("Name not found", location="Boston, MA"),
+        row("Name not found", location="Denver, CO"),
+    ]
+    _, clusters = dedupe_rows(rows)
+    assert len(clusters) == 5
+
+
+def test_placeholder_emails_are_not_shared_contact():
+    records = [
+        EntityRecord("Wei Zhang", "Zhang & Partners", "not provided"),
+        EntityRecord("Wei Wang", "Berardi Immigration", "not provided"),
+        EntityRecord("Li Chen", "Chen Law", "N/A", "N/A", "N/A"),
+        EntityRecord("Li Chen", "Baker McKenzie", "n/a", "n/a", "n/a"),
+    ]
+    assert len(resolve(records)) == 4
+
+
+def test_invalid_contact_values_are_dropped():
+    record = EntityRecord("Wei Zhang", email="contact via website", phone="see site", website="Not available")
+    assert (record.email, record.phone, record.url, record.domains) == ("", "", "", set())
+    assert EntityRecord(website="localhost/profile").url == ""
+    assert EntityRecord(email="wei@zhanglaw.com").domains == {"zhanglaw.com"}
@@ -0,0 +1,33 @@
+import asyncio
+
+import nodes
+from http_clients import close_http_clients
+
+
+def test_llm_clients_are_rebuilt_after_close(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+    llm = nodes.get_llm("openrouter")
+    assert nodes.get_llm("openrouter") is llm
+
+    asyncio.run(close_http_clients())
+    rebuilt = nodes.get_llm("openrouter")
+    assert rebuilt is not llm
+    assert not rebuilt.http_async_client.is_closed
+    assert not rebuilt.http_client.is_closed
+
+
+def test_llm_clients_are_rebuilt_in_a_new_event_loop(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+
+    async def current():
+        return nodes.get_llm("openrouter")
+
+    first = asyncio.run(current())
+    assert asyncio.run(current()).http_async_client is not first.http_async_client
+
+    async def twice():
+        return nodes.get_llm("openrouter"), nodes.get_llm("openrouter")
+
+    same, again = asyncio.run(twice())
+    assert same is again
+    asyncio.run(close_http_clients())
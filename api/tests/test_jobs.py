@@ -0,0 +1,75 @@
+import asyncio
+import sqlite3
+
+from jobs import QUEUED, RUNNING, SUCCEEDED, JobRunner, JobStore
+from models import UserProfile
+
+PROFILE = UserProfile(
+    name="Test", occupation="Researcher", industry="Technology", nationality="Indian",
+    budget_range={"min": 1000, "max": 2000}, timeline_urgency="moderate", achievements=[], priority_factors=[],
+)
+
+
+def test_expired_lease_is_requeued(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), lease_seconds=30)
+    job_id = store.create([PROFILE])[0]
+    assert store.claim_next()["id"] == job_id
+    assert store.claim_next() is None
+
+    # The worker died: its lease is never renewed
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE jobs SET updated_at = updated_at - 60 WHERE id = ?", (job_id,))
+    assert store.claim_next()["id"] == job_id
+    assert store.get(job_id)["status"] == RUNNING
+
+
+def test_late_finish_of_lost_claim_is_ignored(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), lease_seconds=30)
+    job_id = store.create([PROFILE])[0]
+    stale = store.claim_next()
+
+    # The first worker stalls past its lease and the job is claimed again
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE jobs SET updated_at = updated_at - 60 WHERE id = ?", (job_id,))
+    fresh = store.claim_next()
+    assert fresh["id"] == job_id and fresh["claimed_at"] != stale["claimed_at"]
+
+    assert not store.finish(job_id, stale["claimed_at"], None, "TimeoutError: stale worker")
+    store.renew(job_id, stale["claimed_at"])
+    store.requeue(job_id, stale["claimed_at"])
+    assert store.get(job_id)["status"] == RUNNING
+
+    assert store.finish(job_id, fresh["claimed_at"], {"ok": True})
+    assert not store.finish(job_id, stale["claimed_at"], None, "TimeoutError: stale worker")
+    job = store.get(job_id)
+    assert job["status"] == SUCCEEDED and job["result"] == {"ok": True} and job["error"] is None
+
+
+def test_shutdown_requeues_running_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create([PROFILE])[0]
+    started = asyncio.Event()
+
+    async def run(profile, bypass_cache):
+        started.set()
+        await asyncio.sleep(60)
+
+    async def scenario():
+        runner = JobRunner(store, run, workers=1, poll_interval=0.01)
+        runner.start()
+        await asyncio.wait_for(started.wait(), 5)
+        await runner.stop()
+
+    asyncio.run(scenario())
+    job = store.get(job_id)
+    assert job["status"] == QUEUED and job["error"] is None
+
+    async def finish():
+        runner = JobRunner(store, lambda profile, bypass_cache: asyncio.sleep(0, {"ok": True}), workers=1,
+                           poll_interval=0.01)
+        runner.start()
+        while store.get(job_id)["status"] != SUCCEEDED:
+            await asyncio.sleep(0.01)
+        await runner.stop()
+
+    asyncio.run(asyncio.wait_for(finish(), 5))
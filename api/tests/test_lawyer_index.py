@@ -0,0 +1,46 @@
+import lawyer_index
+from lawyer_index import LawyerIndex, fts_query
+
+
+def row(name, snippet, eb1_details="", eb1=0, mention_count=0):
+    slug = name.lower().replace(" ", "-")
+    return {
+        "profile_link": f"https://www.avvo.com/attorneys/{slug}.html", "name": name, "location": "New York, NY",
+        "rating": None, "snippet": snippet, "eb1": eb1, "eb1_details": eb1_details,
+        "mention_count": mention_count, "source": "test.csv",
+    }
+
+
+def test_search_requires_every_term_and_ranks_by_relevance(tmp_path):
+    index = LawyerIndex(str(tmp_path / "index.sqlite3"))
+    index.add([
+        row("Ann Lee", "Immigration lawyer"),
+        row("Bob Ray", "Immigration lawyer, EB1 extraordinary ability petitions", mention_count=1),
+        row("Cy Tan", "EB1 extraordinary ability, EB1 extraordinary ability only"),
+    ])
+
+    assert fts_query('EB1 "extraordinary" eb1') == '"eb1" "extraordinary"'
+    names = [hit["name"] for hit in index.search("EB1 extraordinary ability")]
+    # Ann Lee has none of the terms; Cy Tan mentions them most densely despite fewer mentions
+    assert names == ["Cy Tan", "Bob Ray"]
+    assert len(index.search()) == 3
+
+
+def test_shared_index_rechecks_sources(tmp_path, monkeypatch):
+    source = tmp_path / "lawyers.csv"
+    source.write_text(
+        "Name,Profile Link,Location,Avvo Rating,Details Snippet\n"
+        "Ann Lee,https://www.avvo.com/attorneys/ann-lee.html,\"New York, NY\",,Immigration\n"
+    )
+    monkeypatch.setattr(lawyer_index.config, "LAWYER_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+    monkeypatch.setattr(lawyer_index.config, "LAWYER_INDEX_SOURCES", [str(source)])
+    monkeypatch.setattr(lawyer_index.config, "LAWYER_INDEX_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(lawyer_index, "_index", None)
+    assert lawyer_index.get_lawyer_index().count() == 1
+
+    with source.open("a") as f:
+        f.write("Bob Ray,https://www.avvo.com/attorneys/bob-ray.html,\"New York, NY\",,Immigration\n")
+    # Backdate the index so the rewritten source is newer than it
+    with lawyer_index.get_lawyer_index()._connect() as conn:
+        conn.execute("UPDATE lawyers SET updated_at = updated_at - 60")
+    assert lawyer_index.get_lawyer_index().count() == 2
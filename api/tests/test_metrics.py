@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+
+from metrics import NODE_DURATION, NODE_ERRORS, Counter, instrument_node
+
+
+def test_label_values_are_escaped():
+    counter = Counter("test_total", "Test counter.", ("model",))
+    counter.inc(model='a\\b "c"\nd')
+    assert counter.render()[-1] == 'test_total{model="a\\\\b \\"c\\"\\nd"} 1.0'
+
+
+def test_failing_nodes_are_timed():
+    async def broken(state):
+        raise RuntimeError("boom")
+
+    node = instrument_node("test_broken_node", broken)
+    with pytest.raises(RuntimeError):
+        asyncio.run(node({"messages": []}))
+    assert NODE_ERRORS.value(node="test_broken_node") == 1
+    assert 'eb1a_node_duration_seconds_count{node="test_broken_node"} 1' in NODE_DURATION.render()
@@ -0,0 +1,61 @@
+import pytest
+
+from models import LawyerProfile, UserProfile
+from scoring import feature_weights, lawyer_features, rank_lawyers, scores_by_name
+
+USER = UserProfile(
+    name="Test", occupation="Software Engineer", industry="Technology", nationality="Indian",
+    budget_range={"min": 5000, "max": 20000}, location_preference="San Jose, CA", timeline_urgency="urgent",
+    achievements=[], priority_factors=["success_rate", "cost"],
+)
+
+SEARCH_RESULTS = [
+    {"query": "q1", "results": (
+        "Jane Doe of Doe Immigration in San Jose, CA has a 95% approval rate for Technology clients, "
+        "many of them Indian engineers. Flat fees from $8,000, with premium processing available."
+    )},
+    {"query": "q2", "results": "Jane Doe was named a top EB-1A attorney. Separately, Bob Roe charges $45,000."},
+    {"query": "q3", "results": "Nothing about either lawyer here."},
+]
+
+JANE = LawyerProfile(name="Jane Doe", firm="Doe Immigration",
+                     contact_info={"email": "jane@doe.law", "website": "https://doe.law"})
+BOB = LawyerProfile(name="Bob Roe", firm="", contact_info={})
+
+
+def test_feature_weights_follow_priorities_and_urgency():
+    # mentions, contact, location, industry, nationality, success_rate, cost, timeline
+    assert feature_weights(USER) == [1.0, 1.0, 1.0, 1.0, 0.5, 4.0, 3.0, 2.5]
+
+
+def test_lawyer_features():
+    assert lawyer_features(JANE, USER, SEARCH_RESULTS) == pytest.approx([2 / 3, 2 / 3, 1, 1, 1, 0.95, 1, 1])
+    # One mention, no contact details, and a quote of $45,000 against a $20,000 budget
+    assert lawyer_features(BOB, USER, SEARCH_RESULTS) == pytest.approx([1 / 3, 0, 0, 0, 0, 0, 0, 0])
+
+
+def test_rank_lawyers_best_first():
+    ranked = rank_lawyers([BOB, JANE], USER, SEARCH_RESULTS)
+    assert [lawyer.name for lawyer, _ in ranked] == ["Jane Doe", "Bob Roe"]
+    assert ranked[0][1] > ranked[1][1]
+    # Same input, same ranking and scores
+    assert rank_lawyers([BOB, JANE], USER, SEARCH_RESULTS) == ranked
+
+
+def test_ties_are_broken_by_name_then_input_order():
+    unknown = [
+        LawyerProfile(name="Zed Alpha", firm="", contact_info={}),
+        LawyerProfile(name="Amy Beta", firm="", contact_info={"phone": "1"}),
+        LawyerProfile(name="Amy Beta", firm="", contact_info={"website": "https://b.law"}),
+        LawyerProfile(name="Cal Gamma", firm="", contact_info={}),
+    ]
+    ranked = rank_lawyers(unknown, USER, [])
+    # The Amy Betas score higher for their contact detail and keep their input order; the rest tie
+    assert [lawyer for lawyer, _ in ranked] == [unknown[1], unknown[2], unknown[3], unknown[0]]
+    assert rank_lawyers(list(reversed(unknown)), USER, [])[2:] == ranked[2:]
+
+
+def test_scores_by_name():
+    ranked = rank_lawyers([JANE, BOB], USER, SEARCH_RESULTS)
+    assert scores_by_name(ranked) == {lawyer.name: score for lawyer, score in ranked}
+    assert list(scores_by_name(ranked)) == ["Jane Doe", "Bob Roe"]
@@ -0,0 +1,132 @@
+# benchmark_parser.py
+# Compares profile_parser.scan_eb1_mentions with the original BeautifulSoup tree-scanning
+# implementation on saved profile pages: checks the mentions are identical and reports timings.
+# By default it uses the captured profile pages in fixtures/profiles/ (the layout
+# replay_fixtures.py reads), wherever it is run from.
+#
+# Usage:
+#   python benchmark_parser.py                                  # fixtures/profiles/*.html
+#   python benchmark_parser.py page1.html page2.html --repeat 20
+#   python benchmark_parser.py --from-cache page_cache.sqlite3 --limit 200
+#
+# Exits with status 1 if any page produces different mentions.
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import zstandard
+from bs4 import BeautifulSoup
+
+from profile_parser import scan_eb1_mentions
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'profiles')
+
+
+def reference_eb1_mentions(html):
+    """The original check_eb1_expertise parsing: a full soup plus three tree scans."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Search for EB-1 mentions in the profile
+    eb1_patterns = [
+        r'EB-?1', r'EB-?1[ABC]?', r'extraordinary ability', r'outstanding professor',
+        r'outstanding researcher', r'multinational manager', r'multinational executive',
+        r'first preference', r'employment.{0,20}first.{0,20}preference'
+    ]
+
+    # Compile regex pattern
+    pattern = re.compile('|'.join(eb1_patterns), re.IGNORECASE)
+
+    # Check different sections of the profile
+    eb1_mentions = []
+
+    # Check practice areas
+    practice_areas = soup.find_all(['div', 'section'], class_=lambda x: x and 'practice' in str(x).lower())
+    for area in practice_areas:
+        text = area.get_text()
+        if pattern.search(text):
+            eb1_mentions.append(f"Practice area: {text[:200]}...")
+
+    # Check biography/about section
+    bio_sections = soup.find_all(['div', 'section'], class_=lambda x: x and any(word in str(x).lower() for word in ['bio', 'about', 'description']))
+    for bio in bio_sections:
+        text = bio.get_text()
+        matches = pattern.findall(text)
+        if matches:
+            # Get context around the match
+            for match in matches[:3]:  # Limit to first 3 matches
+                idx = text.lower().find(match.lower())
+                context = text[max(0, idx-50):idx+50]
+                eb1_mentions.append(f"Bio mention: ...{context}...")
+
+    # Check if they list specific visa types
+    visa_sections = soup.find_all(string=pattern)
+    for visa_text in visa_sections[:5]:  # Limit to first 5 mentions
+        if len(visa_text) > 20:  # Only include substantial text
+            eb1_mentions.append(f"Visa expertise: {visa_text[:100]}...")
+
+    return eb1_mentions
+
+
+def find_profile_pages(directory=PROFILES_DIR):
+    """Captured profile pages in directory, in name order."""
+    names = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+    return [os.path.join(directory, name) for name in names if name.endswith(('.html', '.htm'))]
+
+
+def load_fixtures(paths, cache_path=None, limit=None):
+    fixtures = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            fixtures.append((path, f.read()))
+    if cache_path:
+        with sqlite3.connect(cache_path) as conn:
+            query = "SELECT url, body FROM pages ORDER BY url" + (" LIMIT ?" if limit else "")
+            for url, body in conn.execute(query, (limit,) if limit else ()):
+                fixtures.append((url, zstandard.decompress(body)))
+    return fixtures
+
+
+def time_parser(parse, fixtures, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in fixtures:
+            parse(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass EB-1 profile parser.")
+    parser.add_argument('paths', nargs='*', help="Saved profile pages (default: fixtures/profiles/*.html)")
+    parser.add_argument('--from-cache', help="Also use every page stored in this page_cache.sqlite3")
+    parser.add_argument('--limit', type=int, help="Maximum pages taken from the page cache")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    paths = args.paths or ([] if args.from_cache else find_profile_pages())
+    fixtures = load_fixtures(paths, args.from_cache, args.limit)
+    if not fixtures:
+        print(f"No profile pages found: save some in {PROFILES_DIR} or pass paths / --from-cache.",
+              file=sys.stderr)
+        sys.exit(1)
+
+    mismatches = [name for name, html in fixtures if reference_eb1_mentions(html) != scan_eb1_mentions(html)]
+    total_bytes = sum(len(html) for _, html in fixtures)
+    print(f"{len(fixtures)} pages, {total_bytes / 1024:.0f} KiB, {args.repeat} repeats")
+
+    reference = time_parser(reference_eb1_mentions, fixtures, args.repeat)
+    streaming = time_parser(scan_eb1_mentions, fixtures, args.repeat)
+    print(f"Tree scans (reference): {reference * 1000:.1f} ms per pass, {len(fixtures) / reference:.1f} pages/s")
+    print(f"Single pass:            {streaming * 1000:.1f} ms per pass, {len(fixtures) / streaming:.1f} pages/s")
+    print(f"Speedup: {reference / streaming:.2f}x")
+
+    for name in mismatches:
+        print(f"MISMATCH: {name}", file=sys.stderr)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmark_scraper.py
+# Measures search results card extraction on captured pages (see replay_fixtures.py),
+# for each stage of the card selector chain in search_parser.py: every selector is
+# timed on its own, followed by extraction of the cards it finds, plus the profile-link
+# fallback and the full parse_search_results path test_scraper.py uses.
+#
+# Usage:
+#   python benchmark_scraper.py                       # fixtures/results/, or debug_page.html
+#   python benchmark_scraper.py page1.html page2.html --repeat 20
+
+import argparse
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from replay_fixtures import FIXTURES_DIR, RESULTS, find_fixtures, read_page, replay_results_page
+from search_parser import CARD_SELECTORS, parse_lawyer_card, parse_profile_links
+
+
+def extract_cards(find_cards, soup, location):
+    lawyers = []
+    for card in find_cards(soup):
+        try:
+            lawyers.append(parse_lawyer_card(card, location))
+        except Exception:
+            continue
+    return lawyers
+
+
+def time_stage(stage, pages, repeat):
+    """Seconds per pass over all pages, and the rows one pass produces."""
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = sum(len(stage(page)) for page in pages)
+    return (time.perf_counter() - start) / repeat, rows
+
+
+def report(name, seconds, rows, pages):
+    rate = f"{rows / seconds:,.0f} cards/s" if rows else "no cards"
+    print(f"{name:<22} {seconds * 1000:9.1f} ms per pass  {rows:6d} cards  {rate:>16}  "
+          f"{len(pages) / seconds:8.1f} pages/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search results card extraction.")
+    parser.add_argument('paths', nargs='*', help=f"Results pages (default: {FIXTURES_DIR}/{RESULTS}/ or debug_page.html)")
+    parser.add_argument('--location', default="New York, NY")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    paths = args.paths or find_fixtures()[RESULTS]
+    if not paths:
+        print("No results pages found.", file=sys.stderr)
+        sys.exit(1)
+    html_pages = [read_page(path) for path in paths]
+    print(f"{len(html_pages)} pages, {sum(map(len, html_pages)) / 1024:.0f} KiB, {args.repeat} repeats\n")
+
+    seconds, _ = time_stage(lambda html: [BeautifulSoup(html, 'html.parser')], html_pages, args.repeat)
+    print(f"{'soup (html.parser)':<22} {seconds * 1000:9.1f} ms per pass")
+
+    # Selector stages run on pre-built soups, so they measure the selector and card extraction only
+    soups = [BeautifulSoup(html, 'html.parser') for html in html_pages]
+    for name, find_cards in CARD_SELECTORS:
+        seconds, rows = time_stage(lambda soup: extract_cards(find_cards, soup, args.location), soups, args.repeat)
+        report(name, seconds, rows, soups)
+    seconds, rows = time_stage(lambda soup: parse_profile_links(soup, args.location), soups, args.repeat)
+    report('profile-link fallback', seconds, rows, soups)
+
+    print()
+    seconds, rows = time_stage(lambda html: replay_results_page(html, args.location), html_pages, args.repeat)
+    report('parse_search_results', seconds, rows, html_pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# crawl_checkpoint.py
+# Persistent per-URL record of EB-1 vetting for lawyer_finder.py.
+# Every profile's outcome is written as soon as it is known, with a hash of the page
+# content, so an interrupted run can resume and later runs only re-parse pages that changed.
+
+import hashlib
+import json
+import sqlite3
+import time
+
+DEFAULT_PATH = 'vetting_checkpoint.sqlite3'
+
+VETTED = 'vetted'            # Parsed; the result is stored
+UNREACHABLE = 'unreachable'  # Non-200 response or not in the page cache
+ERROR = 'error'              # Fetch or parse raised
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+class CrawlCheckpoint:
+    """SQLite table of vetted profile URLs, their status, content hash and EB-1 result."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.reused = 0
+        self.vetted = 0
+        self.failed = 0
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS vetting (
+                    url TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    content_hash TEXT,
+                    result TEXT,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, url):
+        """The stored (status, content_hash, result) for url, or None if it was never checked."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, content_hash, result FROM vetting WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2]) if row[2] else None
+
+    def lookup(self, url, digest):
+        """The stored result if url was vetted with exactly this content, else None."""
+        entry = self.get(url)
+        if entry and entry[0] == VETTED and entry[1] == digest:
+            self.reused += 1
+            return entry[2]
+        return None
+
+    def record(self, url, status, digest=None, result=None):
+        """Store url's outcome. A failed re-check never replaces a stored result."""
+        if status == VETTED:
+            self.vetted += 1
+        else:
+            self.failed += 1
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO vetting (url, status, content_hash, result, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    status = excluded.status,
+                    content_hash = excluded.content_hash,
+                    result = excluded.result,
+                    updated_at = excluded.updated_at
+                WHERE status != 'vetted' OR excluded.status = 'vetted'
+                """,
+                (url, status, digest, json.dumps(result) if result is not None else None, time.time())
+            )
+
+    def stats(self):
+        return {'reused': self.reused, 'vetted': self.vetted, 'failed': self.failed}
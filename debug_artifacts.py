@@ -0,0 +1,124 @@
+# debug_artifacts.py
+# Opt-in debug dumps (screenshot + page HTML) for the Selenium scrapers.
+#
+# Capturing every page costs a PNG encode and ~1 MB of disk writes per search, so it is off
+# unless enabled, successful pages can be sampled, and files are written on a background
+# thread. Each run gets its own directory, so concurrent workers and later runs never
+# overwrite each other's files. HTML is stored zstandard-compressed (`zstd -d` to read).
+#
+# Environment:
+#   SCRAPER_DEBUG_ARTIFACTS=1          enable (default: off)
+#   SCRAPER_DEBUG_SAMPLE_RATE=0.1      fraction of successful pages captured (errors always are)
+#   SCRAPER_DEBUG_DIR=debug_artifacts  base directory; each run writes to <dir>/<run id>/
+
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import zstandard
+
+DEFAULT_DIR = 'debug_artifacts'
+COMPRESSION_LEVEL = 3
+
+_LABEL_CHARS = re.compile(r'[^a-z0-9]+')
+
+
+def _env_flag(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def run_id():
+    """Unique per process run: start time plus pid."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+class DebugArtifacts:
+    """
+    Sampled, off-thread writer of page screenshots and HTML.
+
+    Args:
+        enabled (bool): Capture anything at all
+        sample_rate (float): Fraction of successful pages captured; errors are always captured
+        directory (str): Base directory; this run's files go to a unique subdirectory
+    """
+
+    def __init__(self, enabled=False, sample_rate=1.0, directory=DEFAULT_DIR):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.directory = os.path.join(directory, run_id())
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._writer = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=_env_flag('SCRAPER_DEBUG_ARTIFACTS'),
+            sample_rate=float(os.getenv('SCRAPER_DEBUG_SAMPLE_RATE', '1.0')),
+            directory=os.getenv('SCRAPER_DEBUG_DIR', DEFAULT_DIR),
+        )
+
+    def should_capture(self, error=False):
+        if not self.enabled:
+            return False
+        return error or random.random() < self.sample_rate
+
+    def capture(self, driver, label, error=False, page_source=None):
+        """
+        Dump the browser's current screenshot and HTML if this page is sampled.
+
+        Only grabbing the screenshot (and the page source, unless it is passed in) happens
+        on the calling thread; compressing and writing them is queued to the background writer.
+
+        Returns:
+            str: Path prefix the files will be written to, or None if nothing is captured
+        """
+        if not self.should_capture(error):
+            return None
+        try:
+            screenshot = driver.get_screenshot_as_png()
+            if page_source is None:
+                page_source = driver.page_source
+        except Exception as e:
+            print(f"--> DEBUG: Could not capture '{label}': {e}")
+            return None
+        return self.save(label, page_source, screenshot, error)
+
+    def save(self, label, page_source, screenshot=None, error=False):
+        """Queue already-captured HTML (and optionally a PNG screenshot) for writing."""
+        prefix = os.path.join(self.directory, self._name(label, error))
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='debug-artifacts')
+            self._writer.submit(self._write, prefix, page_source, screenshot)
+        return prefix
+
+    def _name(self, label, error):
+        slug = _LABEL_CHARS.sub('-', label.lower()).strip('-') or 'page'
+        return f"{next(self._sequence):04d}-{'error-' if error else ''}{slug}"
+
+    def _write(self, prefix, page_source, screenshot):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(prefix + '.html.zst', 'wb') as f:
+                f.write(zstandard.compress(page_source.encode('utf-8'), COMPRESSION_LEVEL))
+            if screenshot:
+                with open(prefix + '.png', 'wb') as f:
+                    f.write(screenshot)
+        except Exception as e:
+            print(f"--> DEBUG: Could not write {prefix}: {e}")
+
+    def close(self):
+        """Wait for queued writes to finish."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+            print(f"--> DEBUG: Artifacts saved under '{self.directory}'")
@@ -0,0 +1,278 @@
+# lawyer_corpus.py
+# The scraped lawyer corpus: one SQLite table of lawyers keyed by profile link, shared by
+# test_scraper.py / scrape_scheduler.py (which upsert scraped listings) and lawyer_finder.py
+# (which reads candidates from it and records EB-1 vetting back). Columns are typed (ratings
+# and counts are numbers, EB-1 status is NULL until vetted), scraper placeholders such as
+# "Name not found" are stored as missing values, and readers stream rows in batches, so
+# large corpora are never loaded or rewritten whole. The API's local lawyer index
+# (api/lawyer_index.py) reads this file as one of its sources.
+#
+# Usage:
+#   python lawyer_corpus.py import lawyers.csv lawyers_5_pages.csv eb1_lawyers.csv
+#   python lawyer_corpus.py export corpus.csv [--eb1-only]
+#   python lawyer_corpus.py stats
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+
+# Placeholder handling is shared with the API's lawyer index, which lives in api/
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+from scraped_values import clean_value, name_from_link, parse_rating  # noqa: E402
+
+DEFAULT_PATH = 'lawyer_corpus.sqlite3'
+BATCH_SIZE = 500
+
+# Column order of test_scraper.py's CSVs, plus the scheduler's practice area and
+# lawyer_finder.py's EB-1 columns
+CSV_FIELDS = ['Name', 'Profile Link', 'Location', 'Avvo Rating', 'Details Snippet', 'Practice Area',
+              'EB-1 Expertise', 'Mention Count', 'EB-1 Details']
+
+
+def normalize_row(row, source=''):
+    """
+    A typed corpus row from a scraper or lawyer_finder CSV row.
+
+    Returns:
+        dict: Corpus columns, or None for rows without a profile link (they can't be keyed or vetted)
+    """
+    profile_link = clean_value(row.get('Profile Link'))
+    if not profile_link.startswith('http'):
+        return None
+    rating, review_count = parse_rating(row.get('Avvo Rating'))
+    eb1 = clean_value(row.get('EB-1 Expertise')).lower()
+    return {
+        'profile_link': profile_link,
+        'name': clean_value(row.get('Name')) or name_from_link(profile_link),
+        'location': clean_value(row.get('Location')),
+        'rating': rating,
+        'review_count': review_count,
+        'snippet': clean_value(row.get('Details Snippet')),
+        'practice_area': clean_value(row.get('Practice Area')),
+        # Only lawyer_finder output carries EB-1 status; anything else is unvetted
+        'eb1': {'yes': 1, 'no': 0}.get(eb1),
+        'eb1_details': clean_value(row.get('EB-1 Details')),
+        'mention_count': int(clean_value(row.get('Mention Count')) or 0),
+        'source': source,
+    }
+
+
+def to_csv_row(lawyer):
+    """A corpus row in the CSV column format the scripts share."""
+    rating = 'Rating not found'
+    if lawyer['rating'] is not None:
+        rating = f"{lawyer['rating']:g}"
+        if lawyer['review_count'] is not None:
+            rating += f" ({lawyer['review_count']} reviews)"
+    return {
+        'Name': lawyer['name'] or 'Name not found',
+        'Profile Link': lawyer['profile_link'],
+        'Location': lawyer['location'],
+        'Avvo Rating': rating,
+        'Details Snippet': lawyer['snippet'],
+        'Practice Area': lawyer['practice_area'],
+        'EB-1 Expertise': {1: 'Yes', 0: 'No'}.get(lawyer['eb1'], ''),
+        'Mention Count': lawyer['mention_count'] if lawyer['eb1'] is not None else '',
+        'EB-1 Details': lawyer['eb1_details'],
+    }
+
+
+def read_csv_rows(path, source=None):
+    """Stream normalized rows from a CSV, skipping rows without a profile link."""
+    source = source if source is not None else os.path.basename(path)
+    with open(path, 'r', encoding='utf-8', newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            lawyer = normalize_row(row, source)
+            if lawyer is not None:
+                yield lawyer
+
+
+class LawyerCorpus:
+    """SQLite table of scraped lawyers with indexes on location, rating and EB-1 status."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS lawyers (
+                    profile_link TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    rating REAL,
+                    review_count INTEGER,
+                    snippet TEXT NOT NULL,
+                    practice_area TEXT NOT NULL DEFAULT '',
+                    eb1 INTEGER,
+                    eb1_details TEXT NOT NULL DEFAULT '',
+                    mention_count INTEGER NOT NULL DEFAULT 0,
+                    source TEXT NOT NULL DEFAULT '',
+                    vetted_at REAL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lawyers_location ON lawyers (location)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lawyers_rating ON lawyers (rating)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_lawyers_eb1 ON lawyers (eb1, mention_count)")
+
+    def upsert(self, lawyers):
+        """
+        Insert or update lawyers by profile link, in one transaction.
+
+        Later values win, but a missing value never overwrites a known one, and EB-1
+        status is only changed by rows that carry it.
+
+        Args:
+            lawyers: Normalized rows (see normalize_row); None entries are skipped
+
+        Returns:
+            int: Rows written
+        """
+        now = time.time()
+        count = 0
+        with self._connect() as conn:
+            for lawyer in lawyers:
+                if lawyer is None:
+                    continue
+                conn.execute(
+                    """
+                    INSERT INTO lawyers (profile_link, name, location, rating, review_count, snippet, practice_area,
+                                         eb1, eb1_details, mention_count, source, vetted_at, updated_at)
+                    VALUES (:profile_link, :name, :location, :rating, :review_count, :snippet, :practice_area,
+                            :eb1, :eb1_details, :mention_count, :source,
+                            CASE WHEN :eb1 IS NULL THEN NULL ELSE :updated_at END, :updated_at)
+                    ON CONFLICT (profile_link) DO UPDATE SET
+                        name = COALESCE(NULLIF(excluded.name, ''), name),
+                        location = COALESCE(NULLIF(excluded.location, ''), location),
+                        rating = COALESCE(excluded.rating, rating),
+                        review_count = COALESCE(excluded.review_count, review_count),
+                        snippet = COALESCE(NULLIF(excluded.snippet, ''), snippet),
+                        practice_area = COALESCE(NULLIF(excluded.practice_area, ''), practice_area),
+                        eb1 = COALESCE(excluded.eb1, eb1),
+                        eb1_details = CASE WHEN excluded.eb1 IS NULL THEN eb1_details ELSE excluded.eb1_details END,
+                        mention_count = CASE WHEN excluded.eb1 IS NULL THEN mention_count ELSE excluded.mention_count END,
+                        vetted_at = COALESCE(excluded.vetted_at, vetted_at),
+                        source = COALESCE(NULLIF(excluded.source, ''), source),
+                        updated_at = excluded.updated_at
+                    """,
+                    {**lawyer, 'updated_at': now}
+                )
+                count += 1
+        return count
+
+    def import_csv(self, path):
+        """Upsert every row of a scraper or lawyer_finder CSV, streaming. Returns the rows written."""
+        return self.upsert(read_csv_rows(path))
+
+    def record_eb1(self, profile_link, eb1_info):
+        """Store lawyer_finder's verdict for a vetted profile."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE lawyers SET eb1 = ?, eb1_details = ?, mention_count = ?, vetted_at = ?, updated_at = ?
+                WHERE profile_link = ?
+                """,
+                (int(eb1_info['has_eb1']), '; '.join(eb1_info['mentions'][:3]), eb1_info['mention_count'],
+                 now, now, profile_link)
+            )
+
+    def _where(self, location=None, min_rating=None, eb1=None, vetted=None):
+        clauses, params = [], []
+        if location:
+            clauses.append("location LIKE ?")
+            params.append(f"%{location}%")
+        if min_rating is not None:
+            clauses.append("rating >= ?")
+            params.append(min_rating)
+        if eb1 is not None:
+            clauses.append("eb1 = ?")
+            params.append(int(eb1))
+        if vetted is not None:
+            clauses.append("eb1 IS NOT NULL" if vetted else "eb1 IS NULL")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def iter_lawyers(self, location=None, min_rating=None, eb1=None, vetted=None, batch_size=BATCH_SIZE):
+        """
+        Stream lawyers in insertion order, fetching `batch_size` rows at a time.
+
+        Args:
+            location (str): Substring of the location, e.g. 'NY' or 'San Jose'
+            min_rating (float): Minimum Avvo rating
+            eb1 (bool): Only lawyers vetted with (True) or without (False) EB-1 expertise
+            vetted (bool): Only lawyers lawyer_finder has (True) or hasn't (False) checked yet
+        """
+        where, params = self._where(location, min_rating, eb1, vetted)
+        conn = self._connect()
+        try:
+            cursor = conn.execute(f"SELECT * FROM lawyers{where} ORDER BY rowid", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+    def count(self, location=None, min_rating=None, eb1=None, vetted=None):
+        where, params = self._where(location, min_rating, eb1, vetted)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM lawyers{where}", params).fetchone()[0]
+
+    def export_csv(self, path, **filters):
+        """Write lawyers (optionally filtered as in iter_lawyers) to a CSV, streaming. Returns the rows written."""
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for lawyer in self.iter_lawyers(**filters):
+                writer.writerow(to_csv_row(lawyer))
+                count += 1
+        return count
+
+    def stats(self):
+        return {
+            'lawyers': self.count(),
+            'vetted': self.count(vetted=True),
+            'eb1': self.count(eb1=True),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the SQLite lawyer corpus.")
+    parser.add_argument('--path', default=DEFAULT_PATH, help="Corpus file")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="Upsert scraper or lawyer_finder CSVs")
+    import_parser.add_argument('csv_files', nargs='+')
+    export_parser = commands.add_parser('export', help="Write the corpus to a CSV")
+    export_parser.add_argument('csv_file')
+    export_parser.add_argument('--eb1-only', action='store_true', help="Only lawyers vetted with EB-1 expertise")
+    export_parser.add_argument('--location')
+    commands.add_parser('stats', help="Count lawyers, vetted lawyers and EB-1 lawyers")
+    args = parser.parse_args()
+
+    corpus = LawyerCorpus(args.path)
+    if args.command == 'import':
+        for path in args.csv_files:
+            print(f"{path}: {corpus.import_csv(path)} rows")
+    elif args.command == 'export':
+        rows = corpus.export_csv(args.csv_file, location=args.location, eb1=True if args.eb1_only else None)
+        print(f"Exported {rows} lawyers to {args.csv_file}")
+    stats = corpus.stats()
+    print(f"{args.path}: {stats['lawyers']} lawyers, {stats['vetted']} vetted, {stats['eb1']} with EB-1 expertise")
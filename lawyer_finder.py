@@ -1,11 +1,212 @@
 # eb1_visa_lawyer_finder.py
 # This script reads the scraped immigration lawyers CSV and checks their profiles for EB-1 expertise
 
+import argparse
+import asyncio
 import csv
-import requests
-from bs4 import BeautifulSoup
+import os
+import random
 import time
-import re
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+import httpx
+
+from crawl_checkpoint import DEFAULT_PATH as CHECKPOINT_PATH, ERROR, UNREACHABLE, VETTED, CrawlCheckpoint, content_hash
+from lawyer_corpus import DEFAULT_PATH as CORPUS_PATH, LawyerCorpus, to_csv_row
+from page_cache import DEFAULT_PATH as PAGE_CACHE_PATH, DEFAULT_TTL_SECONDS as PAGE_CACHE_TTL, PageCache
+from profile_parser import scan_eb1_mentions
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
+}
+
+# Crawler defaults. Requests to the same host are rate limited by a token bucket,
+# so raising the concurrency only helps when profiles span several hosts or the
+# site is slow to respond.
+CONCURRENCY = 8
+PER_HOST_RATE = 2.0        # requests per second per host
+PER_HOST_BURST = 2         # requests allowed back to back before the rate applies
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1.0      # doubled after each retry, plus jitter
+TIMEOUT_SECONDS = 20.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Parsing runs in a process pool fed from the fetchers through a bounded queue, so
+# large crawls (or offline runs from the page cache) use every core for parsing
+PARSE_WORKERS = os.cpu_count() or 1
+PARSE_QUEUE_PER_WORKER = 2   # fetched pages allowed to wait per parse worker
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One token bucket per host, created on first use."""
+
+    def __init__(self, rate=PER_HOST_RATE, burst=PER_HOST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    async def wait(self, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        await self.buckets[host].acquire()
+
+
+def make_client(concurrency=CONCURRENCY, timeout=TIMEOUT_SECONDS):
+    """Pooled HTTP client shared by every profile fetch in a crawl."""
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        follow_redirects=True,
+        timeout=httpx.Timeout(timeout),
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    )
+
+
+async def fetch_profile(client, limiter, profile_url, headers=None, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+    """
+    GET a profile page, retrying network errors and 429/5xx responses with exponential backoff.
+    Extra headers (e.g. conditional GET validators) are sent with every attempt.
+
+    Returns:
+        httpx.Response: The last response received (which may still be an error status)
+    """
+    for attempt in range(retries + 1):
+        await limiter.wait(profile_url)
+        try:
+            response = await client.get(profile_url, headers=headers)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                await asyncio.sleep(int(retry_after))
+                continue
+        await asyncio.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+
+
+def eb1_result(eb1_mentions):
+    return {
+        'has_eb1': len(eb1_mentions) > 0,
+        'mentions': eb1_mentions,
+        'mention_count': len(eb1_mentions)
+    }
+
+
+def parse_eb1_expertise(html):
+    """
+    Find EB-1 visa expertise mentions in a lawyer's profile page.
+    
+    Practice-area sections, bio sections and any text matching the EB-1 patterns are
+    collected in a single streaming pass (see profile_parser.py).
+    
+    Args:
+        html (bytes or str): Profile page HTML
+        
+    Returns:
+        dict: Contains EB-1 related information found on the profile
+    """
+    return eb1_result(scan_eb1_mentions(html))
+
+
+async def load_profile(client, limiter, profile_url, cache=None, checkpoint=None):
+    """
+    I/O stage of a profile check: fetch the page and decide whether it still needs parsing.
+    
+    Returns:
+        tuple: (eb1_info, None, None) when the outcome is already known (the profile could
+        not be fetched, or its content is unchanged since it was vetted), otherwise
+        (None, content, digest) for the parse stage
+    """
+    try:
+        if cache is None:
+            response = await fetch_profile(client, limiter, profile_url)
+            status_code, content = response.status_code, response.content
+        else:
+            status_code, content = await cache.fetch(
+                profile_url, lambda url, headers: fetch_profile(client, limiter, url, headers)
+            )
+        if status_code != 200:
+            if checkpoint is not None:
+                await asyncio.to_thread(checkpoint.record, profile_url, UNREACHABLE)
+            if status_code is None:
+                return {'has_eb1': False, 'details': 'Profile not in page cache'}, None, None
+            return {'has_eb1': False, 'details': 'Could not access profile'}, None, None
+
+        if checkpoint is None:
+            return None, content, None
+        digest = content_hash(content)
+        eb1_info = await asyncio.to_thread(checkpoint.lookup, profile_url, digest)
+        if eb1_info is not None:
+            return eb1_info, None, None
+        return None, content, digest
+    except Exception as e:
+        if checkpoint is not None:
+            await asyncio.to_thread(checkpoint.record, profile_url, ERROR)
+        return {'has_eb1': False, 'details': f'Error checking profile: {str(e)}'}, None, None
+
+
+async def vet_profile(profile_url, content, digest=None, checkpoint=None, pool=None):
+    """
+    Parse stage of a profile check: find EB-1 mentions in a fetched page and checkpoint the result.
+    
+    With a process pool the parse runs there, off the event loop; otherwise it runs inline.
+    """
+    try:
+        if pool is None:
+            eb1_info = parse_eb1_expertise(content)
+        else:
+            eb1_mentions = await asyncio.get_running_loop().run_in_executor(pool, scan_eb1_mentions, content)
+            eb1_info = eb1_result(eb1_mentions)
+    except Exception as e:
+        if checkpoint is not None:
+            await asyncio.to_thread(checkpoint.record, profile_url, ERROR)
+        return {'has_eb1': False, 'details': f'Error checking profile: {str(e)}'}
+    if checkpoint is not None:
+        await asyncio.to_thread(checkpoint.record, profile_url, VETTED, digest, eb1_info)
+    return eb1_info
+
+
+async def check_eb1_expertise_async(client, limiter, profile_url, cache=None, checkpoint=None, pool=None):
+    """
+    Check if a lawyer's profile mentions EB-1 visa expertise, using a shared client and rate limiter.
+    Pages are served from / stored in the PageCache when one is given. With a CrawlCheckpoint,
+    every outcome is recorded and pages whose content is unchanged since they were vetted
+    are not parsed again.
+    
+    Returns:
+        dict: Same shape as check_eb1_expertise
+    """
+    eb1_info, content, digest = await load_profile(client, limiter, profile_url, cache, checkpoint)
+    if eb1_info is None:
+        eb1_info = await vet_profile(profile_url, content, digest, checkpoint, pool)
+    return eb1_info
+
 
 def check_eb1_expertise(profile_url):
     """
@@ -17,124 +218,210 @@ def check_eb1_expertise(profile_url):
     Returns:
         dict: Contains EB-1 related information found on the profile
     """
+    async def check():
+        async with make_client(concurrency=1) as client:
+            return await check_eb1_expertise_async(client, HostRateLimiter(), profile_url)
+
+    return asyncio.run(check())
+
+
+async def crawl_profiles(lawyers, on_result, concurrency=CONCURRENCY, rate=PER_HOST_RATE, burst=PER_HOST_BURST,
+                         cache=None, checkpoint=None, parse_workers=PARSE_WORKERS):
+    """
+    Check every lawyer's profile, calling on_result(idx, lawyer, eb1_info) as each finishes.
+    
+    Fetching and parsing are separate stages: `concurrency` fetch workers download pages
+    and hand them to the parse stage through a bounded queue, which runs the parses in a
+    pool of `parse_workers` processes (inline on the event loop when 0). The queue bound
+    keeps fetchers from racing ahead of the parsers and piling pages up in memory.
+    
+    lawyers may be any iterable (e.g. a streaming CSV or corpus reader); it is consumed
+    as the fetchers need more work. on_result may return True to stop the crawl;
+    profiles still in flight are cancelled.
+    """
+    todo = enumerate(lawyers)
+    parse_queue = asyncio.Queue(maxsize=max(1, parse_workers) * PARSE_QUEUE_PER_WORKER)
+    limiter = HostRateLimiter(rate, burst)
+    stop = asyncio.Event()
+
+    def report(idx, lawyer, eb1_info):
+        if not stop.is_set() and on_result(idx, lawyer, eb1_info):
+            stop.set()
+
+    pool = ProcessPoolExecutor(parse_workers) if parse_workers > 0 else None
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
-        }
-        
-        response = requests.get(profile_url, headers=headers)
-        if response.status_code != 200:
-            return {'has_eb1': False, 'details': 'Could not access profile'}
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Search for EB-1 mentions in the profile
-        eb1_patterns = [
-            r'EB-?1', r'EB-?1[ABC]?', r'extraordinary ability', r'outstanding professor',
-            r'outstanding researcher', r'multinational manager', r'multinational executive',
-            r'first preference', r'employment.{0,20}first.{0,20}preference'
-        ]
-        
-        # Compile regex pattern
-        pattern = re.compile('|'.join(eb1_patterns), re.IGNORECASE)
-        
-        # Check different sections of the profile
-        eb1_mentions = []
-        
-        # Check practice areas
-        practice_areas = soup.find_all(['div', 'section'], class_=lambda x: x and 'practice' in str(x).lower())
-        for area in practice_areas:
-            text = area.get_text()
-            if pattern.search(text):
-                eb1_mentions.append(f"Practice area: {text[:200]}...")
-        
-        # Check biography/about section
-        bio_sections = soup.find_all(['div', 'section'], class_=lambda x: x and any(word in str(x).lower() for word in ['bio', 'about', 'description']))
-        for bio in bio_sections:
-            text = bio.get_text()
-            matches = pattern.findall(text)
-            if matches:
-                # Get context around the match
-                for match in matches[:3]:  # Limit to first 3 matches
-                    idx = text.lower().find(match.lower())
-                    context = text[max(0, idx-50):idx+50]
-                    eb1_mentions.append(f"Bio mention: ...{context}...")
-        
-        # Check if they list specific visa types
-        visa_sections = soup.find_all(string=pattern)
-        for visa_text in visa_sections[:5]:  # Limit to first 5 mentions
-            if len(visa_text) > 20:  # Only include substantial text
-                eb1_mentions.append(f"Visa expertise: {visa_text[:100]}...")
-        
-        return {
-            'has_eb1': len(eb1_mentions) > 0,
-            'mentions': eb1_mentions,
-            'mention_count': len(eb1_mentions)
-        }
-        
-    except Exception as e:
-        return {'has_eb1': False, 'details': f'Error checking profile: {str(e)}'}
+        async with make_client(concurrency) as client:
+            async def fetcher():
+                # The fetchers share one iterator; next() never awaits, so each lawyer goes to one fetcher
+                for idx, lawyer in todo:
+                    eb1_info, content, digest = await load_profile(
+                        client, limiter, lawyer['Profile Link'], cache, checkpoint
+                    )
+                    if eb1_info is not None:
+                        report(idx, lawyer, eb1_info)
+                    else:
+                        await parse_queue.put((idx, lawyer, content, digest))
+
+            async def parser():
+                while (item := await parse_queue.get()) is not None:
+                    idx, lawyer, content, digest = item
+                    report(idx, lawyer, await vet_profile(lawyer['Profile Link'], content, digest, checkpoint, pool))
+
+            fetchers = [asyncio.create_task(fetcher()) for _ in range(max(1, concurrency))]
+            parsers = [asyncio.create_task(parser()) for _ in range(max(1, parse_workers))]
+
+            async def run():
+                await asyncio.gather(*fetchers)
+                for _ in parsers:
+                    await parse_queue.put(None)
+                await asyncio.gather(*parsers)
+
+            runner = asyncio.create_task(run())
+            stopper = asyncio.create_task(stop.wait())
+            tasks = fetchers + parsers + [runner, stopper]
+            try:
+                await asyncio.wait({runner, stopper}, return_when=asyncio.FIRST_COMPLETED)
+                if runner.done():
+                    runner.result()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+OUTPUT_FIELDS = ['Name', 'Profile Link', 'Location', 'Avvo Rating', 'EB-1 Expertise', 'Mention Count', 'EB-1 Details']
+
 
+def eb1_row(lawyer):
+    """Output row for a lawyer marked with EB-1 expertise."""
+    return {
+        'Name': lawyer['Name'],
+        'Profile Link': lawyer['Profile Link'],
+        'Location': lawyer['Location'],
+        'Avvo Rating': lawyer['Avvo Rating'],
+        'EB-1 Expertise': lawyer['EB-1 Expertise'],
+        'Mention Count': lawyer['Mention Count'],
+        'EB-1 Details': lawyer['EB-1 Details'][:200]  # Limit details length
+    }
 
-def find_eb1_lawyers(csv_filename='lawyers_5_pages.csv', output_filename='eb1_lawyers.csv'):
+
+def read_candidates(csv_filename):
+    """Stream the lawyers worth checking from a scraped CSV, skipping placeholder rows."""
+    with open(csv_filename, 'r', encoding='utf-8') as csvfile:
+        for lawyer in csv.DictReader(csvfile):
+            # Skip invalid entries
+            if lawyer['Name'] != 'Name not found' and lawyer['Profile Link'].startswith('http'):
+                yield lawyer
+
+
+def find_eb1_lawyers(csv_filename='lawyers_5_pages.csv', output_filename='eb1_lawyers.csv',
+                     concurrency=CONCURRENCY, rate=PER_HOST_RATE, max_matches=None,
+                     cache_path=PAGE_CACHE_PATH, cache_ttl=PAGE_CACHE_TTL, cache_only=False,
+                     checkpoint_path=CHECKPOINT_PATH, parse_workers=PARSE_WORKERS,
+                     corpus_path=None, unvetted_only=False):
     """
-    Read the scraped lawyers CSV and identify those with EB-1 expertise.
+    Read the scraped lawyers and identify those with EB-1 expertise.
+    
+    Lawyers are streamed from the CSV, or from the lawyer corpus when corpus_path is
+    given, in which case every verdict is also recorded back in the corpus.
+    Profiles are fetched concurrently (at most `rate` requests per second per host),
+    but matches are kept in input order, so the output is the same as a serial crawl.
+    Matches are written to the output file as soon as they are known (the file is
+    rewritten from the start on every run), and every profile's outcome is
+    checkpointed: rerunning after an interruption only re-parses profiles that
+    failed, are new, or whose page changed.
     
     Args:
-        csv_filename (str): Input CSV file with lawyer data
+        csv_filename (str): Input CSV file with lawyer data (ignored when corpus_path is given)
         output_filename (str): Output CSV file for EB-1 specialists
+        concurrency (int): Profiles fetched at the same time
+        rate (float): Requests per second allowed per host
+        max_matches (int): Stop after finding this many EB-1 lawyers (None checks every profile)
+        cache_path (str): Page cache file, or None to always download profiles
+        cache_ttl (float): Seconds a cached page is used before revalidating it with a conditional GET
+        cache_only (bool): Work offline from the page cache only
+        checkpoint_path (str): Vetting checkpoint file, or None to re-vet every profile
+        parse_workers (int): Processes parsing fetched pages (0 parses on the event loop)
+        corpus_path (str): Lawyer corpus to read candidates from and record verdicts in
+        unvetted_only (bool): With a corpus, only check lawyers that were never vetted
     """
     eb1_lawyers = []
     
-    with open(csv_filename, 'r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        lawyers = list(reader)
-        
-        print(f"Checking {len(lawyers)} lawyers for EB-1 expertise...")
+    corpus = LawyerCorpus(corpus_path) if corpus_path else None
+    vetted = False if unvetted_only else None
+    if corpus is not None:
+        total = corpus.count(vetted=vetted)
+        candidates = (to_csv_row(lawyer) for lawyer in corpus.iter_lawyers(vetted=vetted))
+    else:
+        total = sum(1 for _ in read_candidates(csv_filename))
+        candidates = read_candidates(csv_filename)
+    
+    print(f"Checking {total} lawyers for EB-1 expertise...")
+    
+    results = {}
+    checked = 0
+    next_idx = 0
+    output = None
+    writer = None
+    
+    def on_result(idx, lawyer, eb1_info):
+        nonlocal checked, next_idx, output, writer
+        checked += 1
+        print(f"Checked {checked}/{total}: {lawyer['Name']}...")
+        if eb1_info['has_eb1']:
+            print(f"  ✓ Found EB-1 expertise! ({eb1_info['mention_count']} mentions)")
+        # Failed checks carry 'details' instead of mentions and are not verdicts
+        if corpus is not None and 'mentions' in eb1_info:
+            corpus.record_eb1(lawyer['Profile Link'], eb1_info)
+        results[idx] = (lawyer, eb1_info)
         
-        for idx, lawyer in enumerate(lawyers):
-            # Skip invalid entries
-            if lawyer['Name'] == 'Name not found' or not lawyer['Profile Link'].startswith('http'):
-                continue
-            
-            print(f"Checking {idx+1}/{len(lawyers)}: {lawyer['Name']}...")
-            
-            # Check their profile for EB-1 expertise
-            eb1_info = check_eb1_expertise(lawyer['Profile Link'])
-            
+        # Write matches in input order as soon as every earlier profile has been checked
+        while next_idx in results:
+            lawyer, eb1_info = results.pop(next_idx)
             if eb1_info['has_eb1']:
                 lawyer['EB-1 Expertise'] = 'Yes'
                 lawyer['EB-1 Details'] = '; '.join(eb1_info['mentions'][:3])  # Include first 3 mentions
                 lawyer['Mention Count'] = eb1_info['mention_count']
                 eb1_lawyers.append(lawyer)
-                print(f"  ✓ Found EB-1 expertise! ({eb1_info['mention_count']} mentions)")
-            
-            # Be respectful to the server
-            time.sleep(1)
+                
+                if writer is None:
+                    output = open(output_filename, 'w', newline='', encoding='utf-8')
+                    writer = csv.DictWriter(output, fieldnames=OUTPUT_FIELDS)
+                    writer.writeheader()
+                writer.writerow(eb1_row(lawyer))
+                output.flush()
+            next_idx += 1
             
             # Optional: Stop after finding a certain number
-            if len(eb1_lawyers) >= 20:
-                print("\nFound 20 EB-1 lawyers. Stopping search.")
-                break
+            if max_matches is not None and len(eb1_lawyers) >= max_matches:
+                print(f"\nFound {max_matches} EB-1 lawyers. Stopping search.")
+                return True
+        return False
+    
+    cache = PageCache(cache_path, cache_ttl, offline=cache_only) if cache_path else None
+    checkpoint = CrawlCheckpoint(checkpoint_path) if checkpoint_path else None
+    try:
+        asyncio.run(crawl_profiles(
+            candidates, on_result, concurrency=concurrency, rate=rate, cache=cache, checkpoint=checkpoint,
+            parse_workers=parse_workers
+        ))
+    finally:
+        if output is not None:
+            output.close()
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Page cache: {stats['hits']} hits, {stats['revalidated']} revalidated (304), {stats['misses']} downloaded")
+    if checkpoint is not None:
+        stats = checkpoint.stats()
+        print(f"Checkpoint: {stats['reused']} unchanged, {stats['vetted']} vetted, {stats['failed']} failed")
+    if corpus is not None:
+        stats = corpus.stats()
+        print(f"Corpus: {stats['vetted']}/{stats['lawyers']} lawyers vetted, {stats['eb1']} with EB-1 expertise")
     
-    # Save EB-1 lawyers to new CSV
     if eb1_lawyers:
-        with open(output_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Name', 'Profile Link', 'Location', 'Avvo Rating', 'EB-1 Expertise', 'Mention Count', 'EB-1 Details']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for lawyer in eb1_lawyers:
-                writer.writerow({
-                    'Name': lawyer['Name'],
-                    'Profile Link': lawyer['Profile Link'],
-                    'Location': lawyer['Location'],
-                    'Avvo Rating': lawyer['Avvo Rating'],
-                    'EB-1 Expertise': lawyer['EB-1 Expertise'],
-                    'Mention Count': lawyer['Mention Count'],
-                    'EB-1 Details': lawyer['EB-1 Details'][:200]  # Limit details length
-                })
-        
         print(f"\nFound {len(eb1_lawyers)} lawyers with EB-1 expertise!")
         print(f"Results saved to {output_filename}")
     else:
@@ -145,30 +432,59 @@ def find_eb1_lawyers(csv_filename='lawyers_5_pages.csv', output_filename='eb1_la
 
 
 # Example: Quick check for EB-1 keywords in a list of lawyers
-def quick_eb1_filter(csv_filename='lawyers.csv'):
+def quick_eb1_filter(csv_filename='lawyers.csv', corpus_path=None):
     """
     Quickly filter lawyers whose snippets might mention EB-1 related terms.
     This is faster but less accurate than checking full profiles.
+    Reads the lawyer corpus instead of the CSV when corpus_path is given.
     """
     potential_eb1_lawyers = []
     
-    with open(csv_filename, 'r', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        
-        for lawyer in reader:
+    if corpus_path:
+        lawyers = (to_csv_row(lawyer) for lawyer in LawyerCorpus(corpus_path).iter_lawyers())
+        csvfile = None
+    else:
+        csvfile = open(csv_filename, 'r', encoding='utf-8')
+        lawyers = csv.DictReader(csvfile)
+    
+    try:
+        for lawyer in lawyers:
             # Check if snippet contains EB-1 related keywords
             snippet = lawyer.get('Details Snippet', '').lower()
             if any(keyword in snippet for keyword in ['eb-1', 'eb1', 'extraordinary', 'multinational']):
                 potential_eb1_lawyers.append(lawyer)
                 print(f"Potential EB-1 lawyer: {lawyer['Name']}")
+    finally:
+        if csvfile is not None:
+            csvfile.close()
     
     return potential_eb1_lawyers
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check scraped lawyer profiles for EB-1 expertise.")
+    parser.add_argument('--input', default='lawyers_5_pages.csv')
+    parser.add_argument('--output', default='eb1_lawyers.csv')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help="Profiles fetched at the same time")
+    parser.add_argument('--rate', type=float, default=PER_HOST_RATE, help="Requests per second per host")
+    parser.add_argument('--cache-path', default=PAGE_CACHE_PATH, help="Page cache file")
+    parser.add_argument('--cache-ttl', type=float, default=PAGE_CACHE_TTL,
+                        help="Seconds before a cached page is revalidated")
+    parser.add_argument('--cache-only', action='store_true', help="Work offline from cached pages only")
+    parser.add_argument('--no-cache', action='store_true', help="Always download profiles")
+    parser.add_argument('--checkpoint-path', default=CHECKPOINT_PATH, help="Vetting checkpoint file")
+    parser.add_argument('--no-checkpoint', action='store_true', help="Re-vet every profile")
+    parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS,
+                        help="Processes parsing fetched pages (0 parses inline)")
+    parser.add_argument('--corpus', nargs='?', const=CORPUS_PATH,
+                        help=f"Read lawyers from this lawyer corpus (default: {CORPUS_PATH}) and record verdicts in it")
+    parser.add_argument('--unvetted-only', action='store_true', help="With --corpus, skip lawyers already vetted")
+    parser.add_argument('--max-matches', type=int, help="Stop after finding this many EB-1 lawyers")
+    args = parser.parse_args()
+    
     # First, try quick filtering based on snippets
     print("Quick scan for potential EB-1 lawyers...")
-    quick_results = quick_eb1_filter('lawyers_5_pages.csv')
+    quick_results = quick_eb1_filter(args.input, corpus_path=args.corpus)
     
     if quick_results:
         print(f"\nFound {len(quick_results)} potential EB-1 lawyers in snippets.")
@@ -178,4 +494,10 @@ if __name__ == "__main__":
     print("Starting detailed EB-1 expertise check...")
     print("="*50 + "\n")
     
-    eb1_specialists = find_eb1_lawyers('lawyers_5_pages.csv', 'eb1_lawyers.csv')
\ No newline at end of file
+    eb1_specialists = find_eb1_lawyers(
+        args.input, args.output, concurrency=args.concurrency, rate=args.rate,
+        max_matches=args.max_matches,
+        cache_path=None if args.no_cache else args.cache_path, cache_ttl=args.cache_ttl, cache_only=args.cache_only,
+        checkpoint_path=None if args.no_checkpoint else args.checkpoint_path, parse_workers=args.parse_workers,
+        corpus_path=args.corpus, unvetted_only=args.unvetted_only
+    )
\ No newline at end of file
@@ -0,0 +1,144 @@
+# page_cache.py
+# On-disk cache of fetched profile pages for lawyer_finder.py.
+# Bodies are stored zstandard-compressed in SQLite, keyed by URL, together with the
+# ETag / Last-Modified validators so stale pages are revalidated with a conditional GET.
+
+import asyncio
+import sqlite3
+import time
+
+import zstandard
+
+DEFAULT_PATH = 'page_cache.sqlite3'
+DEFAULT_TTL_SECONDS = 24 * 3600
+COMPRESSION_LEVEL = 3
+
+
+class CachedPage:
+    """A cached page body plus the validators needed to revalidate it."""
+
+    def __init__(self, url, content, etag, last_modified, fetched_at):
+        self.url = url
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, ttl):
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self):
+        """Headers for a conditional GET, so an unchanged page costs a 304 instead of a full transfer."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    SQLite-backed page cache.
+
+    Args:
+        path (str): SQLite file
+        ttl (float): Seconds a page is served without revalidation
+        offline (bool): Cache-only mode; never touch the network, misses are reported as such
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL_SECONDS, offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, url):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedPage(url, zstandard.decompress(row[0]), row[1], row[2], row[3])
+
+    def put(self, url, content, etag=None, last_modified=None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, zstandard.compress(content, COMPRESSION_LEVEL), etag, last_modified, time.time())
+            )
+
+    def touch(self, url, etag=None, last_modified=None):
+        """Mark a page as just revalidated (after a 304), updating validators the server resent."""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE pages SET fetched_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+                """,
+                (time.time(), etag, last_modified, url)
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM pages")
+
+    def stats(self):
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses}
+
+    async def fetch(self, url, fetch):
+        """
+        Return the page body for url, using the cache where possible.
+
+        Args:
+            url (str): Page URL
+            fetch: async callable(url, headers) returning an httpx.Response
+
+        Returns:
+            tuple: (status_code, content); status 200 for pages served from the cache
+        """
+        page = await asyncio.to_thread(self.get, url)
+        if self.offline:
+            if page is None:
+                self.misses += 1
+                return None, b''
+            self.hits += 1
+            return 200, page.content
+
+        if page is not None and page.is_fresh(self.ttl):
+            self.hits += 1
+            return 200, page.content
+
+        response = await fetch(url, page.conditional_headers() if page else {})
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if response.status_code == 304 and page is not None:
+            self.revalidated += 1
+            await asyncio.to_thread(self.touch, url, etag, last_modified)
+            return 200, page.content
+
+        self.misses += 1
+        if response.status_code == 200:
+            await asyncio.to_thread(self.put, url, response.content, etag, last_modified)
+        return response.status_code, response.content
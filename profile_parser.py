@@ -0,0 +1,256 @@
+# profile_parser.py
+# Single-pass EB-1 mention extraction for lawyer profile pages.
+#
+# lawyer_finder used to build a full BeautifulSoup tree and then walk it three times
+# (practice-area sections, bio sections, every matching string). This module listens to
+# the standard library's html.parser events directly and never builds a tree: strings are
+# collected into the open practice/bio sections as they are parsed, and matching strings
+# are picked up on the way. Entity decoding, void elements, tag nesting, whitespace
+# collapsing and which strings count as text follow Beautiful Soup's html.parser rules,
+# so the mentions are identical to the tree-based implementation (see benchmark_parser.py),
+# at a fraction of the cost.
+
+import re
+from html.parser import HTMLParser
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+EB1_PATTERNS = [
+    r'EB-?1', r'EB-?1[ABC]?', r'extraordinary ability', r'outstanding professor',
+    r'outstanding researcher', r'multinational manager', r'multinational executive',
+    r'first preference', r'employment.{0,20}first.{0,20}preference'
+]
+EB1_PATTERN = re.compile('|'.join(EB1_PATTERNS), re.IGNORECASE)
+
+PRACTICE_WORDS = ('practice',)
+BIO_WORDS = ('bio', 'about', 'description')
+SECTION_TAGS = ('div', 'section')
+
+MAX_BIO_MATCHES = 3
+MAX_VISA_STRINGS = 5
+
+# Beautiful Soup's HTML rules, so both implementations agree on the same markup
+VOID_TAGS = HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS
+PRESERVE_WHITESPACE_TAGS = HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS
+# Strings inside these (scripts, styles, templates, ruby annotations) are left out of get_text()
+NON_TEXT_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+ASCII_SPACES = ' \n\t\x0c\r'
+
+
+class _Section:
+    """An open or closed practice/bio section and the text parsed inside it so far."""
+
+    __slots__ = ('practice', 'bio', 'parts')
+
+    def __init__(self, practice, bio):
+        self.practice = practice
+        self.bio = bio
+        self.parts = []
+
+
+class EB1Scanner(HTMLParser):
+    """
+    Streaming html.parser handler for one profile page.
+
+    Keeps only the open-tag stack, the practice/bio sections in document order and the
+    first few strings matching the EB-1 pattern.
+    """
+
+    def __init__(self, original_encoding=None, pattern=EB1_PATTERN):
+        # Character references are decoded below, the way Beautiful Soup does it
+        super().__init__(convert_charrefs=False)
+        self.original_encoding = original_encoding
+        self.pattern = pattern
+        self.stack = []  # (tag name, section opened by the tag or None)
+        self.open_sections = []
+        self.sections = []
+        self.visa_strings = []
+        self.current_data = []
+        self.preserve_whitespace = 0
+        self.non_text_tags = []
+        # Void elements already closed at their start tag, whose stray end tags are ignored
+        self.closed_void_tags = []
+
+    # --- html.parser events ---
+
+    def handle_starttag(self, tag, attrs, self_closing=False):
+        self._end_string()
+        section = None
+        if tag in SECTION_TAGS:
+            # Later duplicates win; no keyword spans whitespace, so matching the raw
+            # attribute is the same as matching each class
+            css_class = ''
+            for name, value in attrs:
+                if name == 'class':
+                    css_class = (value or '').lower()
+            practice = any(word in css_class for word in PRACTICE_WORDS)
+            bio = any(word in css_class for word in BIO_WORDS)
+            if practice or bio:
+                section = _Section(practice, bio)
+                self.sections.append(section)
+                self.open_sections.append(section)
+        self.stack.append((tag, section))
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace += 1
+        if tag in NON_TEXT_TAGS:
+            self.non_text_tags.append(tag)
+        if tag in VOID_TAGS and not self_closing:
+            # html.parser sends no end tag for e.g. <br>
+            self._close(tag)
+            self.closed_void_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, self_closing=True)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void_tags:
+            self.closed_void_tags.remove(tag)
+        else:
+            self._close(tag)
+
+    def handle_data(self, data):
+        self.current_data.append(data)
+
+    def handle_charref(self, name):
+        codepoint = int(name[1:], 16) if name[:1] in ('x', 'X') else int(name)
+        data = None
+        if codepoint < 256:
+            # Pages often mean Windows-1252 by &#147; and friends
+            for encoding in (self.original_encoding, 'windows-1252'):
+                if not encoding:
+                    continue
+                try:
+                    data = bytearray([codepoint]).decode(encoding)
+                except UnicodeDecodeError:
+                    pass
+        if not data:
+            try:
+                data = chr(codepoint)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or '\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        # Unknown names are left as the literal text
+        self.handle_data(EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name, f'&{name}'))
+
+    def handle_comment(self, data):
+        self._other_string(data)
+
+    def handle_decl(self, decl):
+        self._other_string(decl[len('DOCTYPE '):])
+
+    def unknown_decl(self, data):
+        if data.upper().startswith('CDATA['):
+            # CDATA sections count as text
+            self._end_string()
+            self.handle_data(data[len('CDATA['):])
+            self._end_string()
+        else:
+            self._other_string(data)
+
+    def handle_pi(self, data):
+        self._other_string(data)
+
+    def close(self):
+        super().close()
+        self._end_string()
+        while self.stack:
+            self._pop()
+
+    # --- Strings and the tag stack ---
+
+    def _other_string(self, data):
+        """A comment, declaration or processing instruction: searched, but not section text."""
+        self._end_string()
+        self.handle_data(data)
+        self._end_string(is_text=False)
+
+    def _end_string(self, is_text=True):
+        if not self.current_data:
+            return
+        data = ''.join(self.current_data)
+        self.current_data = []
+        if not self.preserve_whitespace and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+
+        # find_all(string=pattern) matches strings of every type
+        if len(self.visa_strings) < MAX_VISA_STRINGS and self.pattern.search(data):
+            self.visa_strings.append(data)
+        if is_text and not self.non_text_tags:
+            for section in self.open_sections:
+                section.parts.append(data)
+
+    def _close(self, tag):
+        self._end_string()
+        # Pop up to and including the most recent open tag with this name, if there is one
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                while len(self.stack) > i:
+                    self._pop()
+                return
+
+    def _pop(self):
+        tag, section = self.stack.pop()
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace -= 1
+        if self.non_text_tags and tag == self.non_text_tags[-1]:
+            self.non_text_tags.pop()
+        if section is not None:
+            self.open_sections.remove(section)
+
+    # --- Results ---
+
+    def mentions(self):
+        """Mentions in the same order and format as the tree-based implementation."""
+        pattern = self.pattern
+        mentions = []
+        texts = [(section, "".join(section.parts)) for section in self.sections]
+
+        # Check practice areas
+        for section, text in texts:
+            if section.practice and pattern.search(text):
+                mentions.append(f"Practice area: {text[:200]}...")
+
+        # Check biography/about section
+        for section, text in texts:
+            if not section.bio:
+                continue
+            lowered = None
+            for match in pattern.findall(text)[:MAX_BIO_MATCHES]:
+                if lowered is None:
+                    lowered = text.lower()
+                idx = lowered.find(match.lower())
+                context = text[max(0, idx-50):idx+50]
+                mentions.append(f"Bio mention: ...{context}...")
+
+        # Check if they list specific visa types
+        for visa_text in self.visa_strings:
+            if len(visa_text) > 20:  # Only include substantial text
+                mentions.append(f"Visa expertise: {visa_text[:100]}...")
+
+        return mentions
+
+
+def scan_eb1_mentions(html):
+    """
+    Find EB-1 mentions in a profile page with one streaming parse.
+
+    Args:
+        html (bytes or str): Profile page HTML
+
+    Returns:
+        list: Mention strings, identical to the tree-based implementation's
+    """
+    original_encoding = None
+    if isinstance(html, bytes):
+        dammit = UnicodeDammit(html, known_definite_encodings=[], user_encodings=[], is_html=True)
+        html = dammit.unicode_markup
+        original_encoding = dammit.original_encoding
+
+    scanner = EB1Scanner(original_encoding)
+    scanner.feed(html)
+    scanner.close()
+    return scanner.mentions()
@@ -0,0 +1,147 @@
+# replay_fixtures.py
+# Offline replay of captured pages through the scraper's parsing code, with no browser
+# or network: search results pages go through search_parser.parse_search_results (the
+# card extraction test_scraper.py uses) and profile pages through lawyer_finder's EB-1
+# parser. A JSON snapshot of the output turns the fixtures into a regression test.
+#
+# Fixture layout:
+#   fixtures/results/*.html    captured search results pages
+#   fixtures/profiles/*.html   captured lawyer profile pages
+# Without captured results pages, the repo's debug_page.html is replayed as one.
+# Paths are resolved from this script, so it can be run from any directory; the
+# committed fixtures/snapshot.json is checked by tests/test_replay_fixtures.py. Pages dumped by debug_artifacts.py can be used as fixtures once
+# decompressed (zstd -d).
+#
+# Usage:
+#   python replay_fixtures.py                              # print what each page yields
+#   python replay_fixtures.py --output replayed.csv        # also write the lawyers found
+#   python replay_fixtures.py --snapshot fixtures/snapshot.json --update-snapshot
+#   python replay_fixtures.py --snapshot fixtures/snapshot.json   # exit 1 on any change
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+
+from lawyer_finder import parse_eb1_expertise
+from search_parser import parse_search_results
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(REPO_ROOT, 'fixtures')
+DEFAULT_RESULTS_PAGE = os.path.join(REPO_ROOT, 'debug_page.html')
+SNAPSHOT_PATH = os.path.join(FIXTURES_DIR, 'snapshot.json')
+DEFAULT_LOCATION = "New York, NY"
+RESULTS = 'results'
+PROFILES = 'profiles'
+
+
+def find_fixtures(fixtures_dir=FIXTURES_DIR):
+    """
+    Captured pages by kind, in name order.
+
+    Returns:
+        dict: {'results': [paths], 'profiles': [paths]}
+    """
+    fixtures = {}
+    for kind in (RESULTS, PROFILES):
+        directory = os.path.join(fixtures_dir, kind)
+        names = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+        fixtures[kind] = [os.path.join(directory, name) for name in names if name.endswith(('.html', '.htm'))]
+    if not fixtures[RESULTS] and os.path.exists(DEFAULT_RESULTS_PAGE):
+        fixtures[RESULTS] = [DEFAULT_RESULTS_PAGE]
+    return fixtures
+
+
+def read_page(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def replay_results_page(html_content, location=DEFAULT_LOCATION, quiet=True):
+    """The lawyers test_scraper.py would extract from a captured results page."""
+    if not quiet:
+        return parse_search_results(html_content, location)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_search_results(html_content, location)
+
+
+def replay_profile_page(html_content):
+    """The EB-1 check lawyer_finder.py would make on a captured profile page."""
+    return parse_eb1_expertise(html_content)
+
+
+def snapshot_key(path):
+    """A fixture's path relative to the repo root, so snapshots don't depend on where the repo lives."""
+    return os.path.relpath(path, REPO_ROOT).replace(os.sep, '/')
+
+
+def replay(fixtures, location=DEFAULT_LOCATION):
+    """
+    Replay every fixture.
+
+    Returns:
+        dict: {snapshot_key(path): list of lawyers (results pages) or EB-1 info (profile pages)}
+    """
+    output = {}
+    for path in fixtures[RESULTS]:
+        output[snapshot_key(path)] = replay_results_page(read_page(path), location)
+    for path in fixtures[PROFILES]:
+        output[snapshot_key(path)] = replay_profile_page(read_page(path))
+    return output
+
+
+def compare_snapshot(output, snapshot):
+    """Paths whose replayed output differs from (or is missing in) the snapshot."""
+    return sorted(path for path in output.keys() | snapshot.keys() if output.get(path) != snapshot.get(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured pages through the scraper's parsers.")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Directory with results/ and profiles/ pages")
+    parser.add_argument('--location', default=DEFAULT_LOCATION, help="Searched location for results pages")
+    parser.add_argument('--output', help="Write the lawyers found on results pages to this CSV")
+    parser.add_argument('--snapshot', help="JSON snapshot to compare the replayed output with")
+    parser.add_argument('--update-snapshot', action='store_true', help="Rewrite the snapshot instead of comparing")
+    args = parser.parse_args()
+
+    fixtures = find_fixtures(args.fixtures)
+    if not any(fixtures.values()):
+        print(f"No fixtures found in {args.fixtures}/ and no {DEFAULT_RESULTS_PAGE}.", file=sys.stderr)
+        sys.exit(1)
+
+    output = replay(fixtures, args.location)
+    for path in fixtures[RESULTS]:
+        lawyers = output[snapshot_key(path)]
+        with_links = sum(1 for lawyer in lawyers if lawyer['Profile Link'].startswith('http'))
+        print(f"{path}: {len(lawyers)} lawyers ({with_links} with profile links)")
+    for path in fixtures[PROFILES]:
+        eb1_info = output[snapshot_key(path)]
+        print(f"{path}: EB-1 {'yes' if eb1_info['has_eb1'] else 'no'} ({eb1_info['mention_count']} mentions)")
+
+    if args.output:
+        lawyers = [lawyer for path in fixtures[RESULTS] for lawyer in output[snapshot_key(path)]]
+        with open(args.output, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=['Name', 'Profile Link', 'Location', 'Avvo Rating', 'Details Snippet'])
+            writer.writeheader()
+            writer.writerows(lawyers)
+        print(f"Saved {len(lawyers)} lawyers to {args.output}")
+
+    if args.snapshot and args.update_snapshot:
+        with open(args.snapshot, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+        print(f"Snapshot written to {args.snapshot}")
+    elif args.snapshot:
+        with open(args.snapshot, 'r', encoding='utf-8') as f:
+            changed = compare_snapshot(output, json.load(f))
+        for path in changed:
+            print(f"CHANGED: {path}", file=sys.stderr)
+        if changed:
+            sys.exit(1)
+        print(f"All {len(output)} pages match {args.snapshot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# scrape_scheduler.py
+# Builds a lawyer corpus from Avvo results pages: every practice area x location x page
+# in a matrix is scraped by a pool of parallel browser (or plain HTTP) workers, result
+# pages are parsed in worker processes, and new lawyers are upserted into the lawyer
+# corpus (see lawyer_corpus.py) as soon as their page is parsed, deduplicated by profile link.
+#
+# Usage:
+#   python scrape_scheduler.py --practice-area Immigration \
+#       --location "New York, NY" --location "San Jose, CA" --pages 1-5 --workers 4
+#
+# lawyer_finder.py --corpus vets the lawyers straight from the corpus, and the API's local
+# lawyer index reads it as a source. --output additionally streams the rows to a CSV with
+# test_scraper.py's columns plus the practice area.
+
+import argparse
+import contextlib
+import csv
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import httpx
+
+from lawyer_corpus import DEFAULT_PATH as CORPUS_PATH, LawyerCorpus, normalize_row
+from lawyer_finder import HEADERS, TIMEOUT_SECONDS
+from search_parser import PARSE_WORKERS, parse_search_results
+
+BASE_URL = "https://www.avvo.com"
+WORKERS = 4
+RATE = 1.0  # pages started per second, across all workers
+MODES = ('browser', 'http')
+
+FIELDNAMES = ['Name', 'Profile Link', 'Location', 'Avvo Rating', 'Details Snippet', 'Practice Area']
+
+
+def practice_area_slug(practice_area):
+    """'Immigration' -> 'immigration-lawyer', 'Family Law' -> 'family-law-lawyer'."""
+    return "-".join(practice_area.lower().split()) + "-lawyer"
+
+
+def location_slug(location):
+    """'New York, NY' -> 'ny/new_york'."""
+    city, _, state = location.rpartition(",")
+    if not city or not state.strip():
+        raise ValueError(f"Location must look like 'City, ST': {location!r}")
+    return f"{state.strip().lower()}/{'_'.join(city.lower().split())}"
+
+
+def parse_page_range(spec):
+    """'3' -> range(3, 4), '1-5' -> range(1, 6)."""
+    first, _, last = spec.partition("-")
+    first, last = int(first), int(last or first)
+    if first < 1 or last < first:
+        raise ValueError(f"Invalid page range: {spec!r}")
+    return range(first, last + 1)
+
+
+class ScrapeJob:
+    """One results page: a practice area in a location, at a page number."""
+
+    def __init__(self, practice_area, location, page):
+        self.practice_area = practice_area
+        self.location = location
+        self.page = page
+
+    @property
+    def key(self):
+        return self.practice_area, self.location
+
+    @property
+    def url(self):
+        url = f"{BASE_URL}/{practice_area_slug(self.practice_area)}/{location_slug(self.location)}.html"
+        return url if self.page == 1 else f"{url}?page={self.page}"
+
+    def __repr__(self):
+        return f"{self.practice_area} in {self.location}, page {self.page}"
+
+
+def build_jobs(practice_areas, locations, pages):
+    """
+    Every practice area x location x page, each search's pages in order.
+
+    Raises:
+        ValueError: If a location doesn't look like 'City, ST', before anything is scraped
+    """
+    for location in locations:
+        location_slug(location)
+    return [
+        ScrapeJob(practice_area, location, page)
+        for practice_area in practice_areas
+        for location in locations
+        for page in pages
+    ]
+
+
+class Throttle:
+    """Spaces page loads at least 1/rate seconds apart across all workers."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_start = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def run_schedule(jobs, corpus_path=CORPUS_PATH, output_filename=None, workers=WORKERS, mode='browser', rate=RATE,
+                 parse_workers=PARSE_WORKERS):
+    """
+    Scrape every job and stream new lawyers to the corpus (and output_filename, if given).
+
+    Each worker loads a page, hands it to the parse pool and waits for the result before
+    taking the next job, so at most `workers` pages are in memory at once. Once a page of
+    a search comes back empty, that search's later pages are skipped.
+
+    Args:
+        jobs (list): ScrapeJobs, e.g. from build_jobs
+        corpus_path (str): Lawyer corpus the lawyers are upserted into, or None
+        output_filename (str): CSV the lawyers are also written to, or None
+        workers (int): Pages fetched in parallel (one browser each in browser mode)
+        mode (str): 'browser' (pooled headless Chrome) or 'http' (plain GET requests)
+        rate (float): Pages started per second across all workers (0 for no limit)
+        parse_workers (int): Processes parsing result pages (0 parses in the worker threads)
+
+    Returns:
+        dict: Counts of pages scraped, skipped and failed, and lawyers written
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+    throttle = Throttle(rate)
+    last_pages = {}  # search key -> first page that came back empty
+    lock = threading.Lock()
+    drivers = None
+    if mode == 'browser':
+        # Only browser mode needs selenium
+        from test_scraper import DriverPool, load_page_source
+        drivers = DriverPool(workers)
+    client = httpx.Client(headers=HEADERS, timeout=TIMEOUT_SECONDS, follow_redirects=True) if mode == 'http' else None
+    parse_pool = ProcessPoolExecutor(parse_workers) if parse_workers > 0 else None
+    if parse_pool is not None:
+        # Start the parse processes now, before the worker threads exist, so they aren't forked mid-crawl
+        parse_pool.submit(int).result()
+
+    def fetch(job):
+        if drivers is not None:
+            return load_page_source(job.url, drivers)
+        try:
+            response = client.get(job.url)
+        except httpx.HTTPError as e:
+            print(f"Error loading {job.url}: {e}")
+            return None
+        if response.status_code != 200:
+            print(f"Error loading {job.url}: HTTP {response.status_code}")
+            return None
+        return response.text
+
+    def work(job):
+        with lock:
+            if job.page > last_pages.get(job.key, job.page):
+                return None
+        throttle.wait()
+        html_content = fetch(job)
+        if not html_content:
+            return False
+        if parse_pool is None:
+            lawyers = parse_search_results(html_content, job.location)
+        else:
+            lawyers = parse_pool.submit(parse_search_results, html_content, job.location).result()
+        if not lawyers:
+            with lock:
+                last_pages[job.key] = min(job.page, last_pages.get(job.key, job.page))
+        return lawyers
+
+    stats = {'pages': 0, 'skipped': 0, 'failed': 0, 'lawyers': 0, 'duplicates': 0}
+    seen = set()
+    corpus = LawyerCorpus(corpus_path) if corpus_path else None
+    writer = None
+    try:
+        with contextlib.ExitStack() as stack:
+            if output_filename:
+                csvfile = stack.enter_context(open(output_filename, 'w', newline='', encoding='utf-8'))
+                writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+                writer.writeheader()
+            executor = stack.enter_context(ThreadPoolExecutor(max(1, workers)))
+            futures = {executor.submit(work, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    lawyers = future.result()
+                except Exception as e:
+                    # One broken page (a dead browser, a parse error) shouldn't end the whole run
+                    print(f"Error scraping {job}: {e}")
+                    stats['failed'] += 1
+                    continue
+                if lawyers is None:
+                    stats['skipped'] += 1
+                    continue
+                if lawyers is False:
+                    stats['failed'] += 1
+                    continue
+                stats['pages'] += 1
+                new = []
+                for lawyer in lawyers:
+                    profile_link = lawyer['Profile Link']
+                    # Rows without a profile link can't be vetted or deduplicated
+                    if not profile_link.startswith('http'):
+                        continue
+                    if profile_link in seen:
+                        stats['duplicates'] += 1
+                        continue
+                    seen.add(profile_link)
+                    new.append({**lawyer, 'Practice Area': job.practice_area})
+                if corpus is not None:
+                    corpus.upsert(normalize_row(lawyer, 'scrape_scheduler') for lawyer in new)
+                if writer is not None:
+                    writer.writerows(new)
+                    csvfile.flush()
+                stats['lawyers'] += len(new)
+                print(f"{job}: {len(lawyers)} lawyers, {len(new)} new ({stats['lawyers']} total)")
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+        if drivers is not None:
+            drivers.close()
+        if client is not None:
+            client.close()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Avvo results pages for many practice areas and locations.")
+    parser.add_argument('--practice-area', action='append', dest='practice_areas',
+                        help="Practice area to search (repeatable, default: Immigration)")
+    parser.add_argument('--location', action='append', dest='locations',
+                        help="'City, ST' to search (repeatable, default: New York, NY)")
+    parser.add_argument('--pages', type=parse_page_range, default=range(1, 6), help="Page or page range, e.g. 1-5")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Pages fetched in parallel")
+    parser.add_argument('--mode', choices=MODES, default='browser')
+    parser.add_argument('--rate', type=float, default=RATE, help="Pages started per second (0 for no limit)")
+    parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS,
+                        help="Processes parsing result pages (0 parses inline)")
+    parser.add_argument('--corpus', default=CORPUS_PATH, help="Lawyer corpus the lawyers are saved to")
+    parser.add_argument('--output', help="Also write the lawyers to this CSV")
+    args = parser.parse_args()
+
+    try:
+        jobs = build_jobs(args.practice_areas or ["Immigration"], args.locations or ["New York, NY"], args.pages)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Scraping {len(jobs)} pages with {args.workers} {args.mode} workers...")
+    stats = run_schedule(jobs, args.corpus, args.output, workers=args.workers, mode=args.mode, rate=args.rate,
+                         parse_workers=args.parse_workers)
+    print(f"\nScraped {stats['pages']} pages ({stats['skipped']} skipped past the last page, {stats['failed']} failed).")
+    print(f"Saved {stats['lawyers']} lawyers to {args.output or args.corpus} ({stats['duplicates']} duplicates dropped).")
@@ -0,0 +1,209 @@
+# search_parser.py
+# Lawyer extraction from Avvo search results pages, shared by test_scraper.py,
+# scrape_scheduler.py and replay_fixtures.py. It only needs the page HTML, so it runs in
+# parse worker processes and on saved pages without a browser.
+
+import os
+import re
+
+from bs4 import BeautifulSoup
+
+# Default number of processes parsing result pages while pages are fetched (see scrape_scheduler.py)
+PARSE_WORKERS = os.cpu_count() or 1
+
+NO_RESULTS_PHRASES = [
+    "try browsing in common practice areas",
+    "no results found",
+    "didn't find any lawyers",
+    "are you a lawyer?"
+]
+
+# Lawyer card selectors, most specific first; the first one that finds any cards wins
+CARD_SELECTORS = [
+    ('data-qa-id', lambda soup: soup.find_all('div', {'data-qa-id': 'lawyer-card'})),
+    ('lawyer-card class', lambda soup: soup.find_all('div', class_='lawyer-card')),
+    ('generic class', lambda soup: soup.find_all(['article', 'div'], class_=lambda x: x and ('lawyer' in x.lower() or 'attorney' in x.lower() or 'result' in x.lower()))),
+]
+MAX_PROFILE_LINKS = 10
+
+
+def is_no_results_page(soup):
+    """True if the page says the search found nothing."""
+    return bool(soup.find_all(string=lambda text: text and any(phrase in text.lower() for phrase in NO_RESULTS_PHRASES)))
+
+
+def find_lawyer_cards(soup):
+    """
+    Runs the card selector chain.
+
+    Returns:
+        tuple: (selector name, cards) for the first selector that matched, or (None, []).
+    """
+    for selector, find_cards in CARD_SELECTORS:
+        lawyer_cards = find_cards(soup)
+        if lawyer_cards:
+            return selector, lawyer_cards
+    return None, []
+
+
+def parse_profile_links(soup, location):
+    """Last resort when no cards are found: basic rows from lawyer profile links on the page."""
+    lawyers_data = []
+    lawyer_links = soup.find_all('a', href=lambda x: x and ('/lawyer/' in x or '/professional/' in x))
+    if lawyer_links:
+        print(f"Found {len(lawyer_links)} lawyer profile links")
+    for link in lawyer_links[:MAX_PROFILE_LINKS]:
+        try:
+            name = link.get_text(strip=True)
+            profile_link = link['href']
+            if not profile_link.startswith('http'):
+                profile_link = "https://www.avvo.com" + profile_link
+            
+            lawyers_data.append({
+                'Name': name,
+                'Profile Link': profile_link,
+                'Location': location,  # Use search location as default
+                'Avvo Rating': 'See profile',
+                'Details Snippet': 'Visit profile for details'
+            })
+        except Exception as e:
+            continue
+    return lawyers_data
+
+
+def parse_lawyer_card(card, location):
+    """
+    Extracts one lawyer from a result card.
+
+    Args:
+        card (Tag): The lawyer card element.
+        location (str): The searched location, used when the card has none.
+
+    Returns:
+        dict: The lawyer's profile row.
+    """
+    # Extract Lawyer Name and Profile Link
+    name_tag = card.find('a', {'data-qa-id': 'lawyer-name-link'})
+    if not name_tag:
+        # Try to find any link with attorney/lawyer in the href
+        name_tag = card.find('a', href=lambda x: x and ('/attorneys/' in x or '/lawyer/' in x))
+    if not name_tag:
+        # Try finding h2, h3, or h4 tags with lawyer name
+        name_tag = card.find(['h2', 'h3', 'h4'])
+    
+    name = name_tag.get_text(strip=True) if name_tag else "Name not found"
+    
+    # Extract profile link
+    if name_tag and name_tag.name == 'a':
+        profile_link = name_tag.get('href', 'Link not found')
+    else:
+        # If name wasn't in a link, find the profile link separately
+        link_tag = card.find('a', href=lambda x: x and ('/attorneys/' in x or '/lawyer/' in x))
+        profile_link = link_tag.get('href', 'Link not found') if link_tag else "Link not found"
+    
+    if profile_link != "Link not found" and not profile_link.startswith('http'):
+        profile_link = "https://www.avvo.com" + profile_link
+
+    # Extract Location
+    location_tag = card.find('div', {'data-qa-id': 'lawyer-location'})
+    if not location_tag:
+        # Look for location in address or span tags
+        location_tag = card.find(['address', 'span', 'div'], string=lambda x: x and (', ' in x and 
+            any(state in x for state in ['NY', 'New York', 'CA', 'FL', 'TX', 'PA', 'NJ'])))
+    location_text = location_tag.get_text(strip=True) if location_tag else location
+
+    # Extract Avvo Rating and Review Count
+    rating_text = "Rating not found"
+    review_count = ""
+    
+    # Look for rating spans
+    rating_spans = card.find_all('span', class_=['sr-only', 'text-truncate'])
+    for span in rating_spans:
+        text = span.get_text(strip=True)
+        if 'Avvo Rating' in text:
+            # Extract rating number
+            rating_match = re.search(r'(\d+\.?\d*)', text)
+            if rating_match:
+                rating_text = rating_match.group(1)
+        elif 'review' in text.lower():
+            review_count = f" ({text})"
+    
+    # Alternative: look for rating in strong tags
+    if rating_text == "Rating not found":
+        strong_tag = card.find('strong')
+        if strong_tag:
+            rating_text = strong_tag.get_text(strip=True)
+    
+    full_rating = rating_text + review_count
+    
+    # Extract Snippet / Experience
+    snippet_tag = card.find('div', {'data-qa-id': 'lawyer-snippet'})
+    if not snippet_tag:
+        # Look for practice areas or description
+        snippet_tag = card.find(['p', 'div'], class_=lambda x: x and any(word in str(x).lower() 
+            for word in ['practice', 'area', 'description', 'experience', 'focus']))
+    
+    # If still not found, get any paragraph text
+    if not snippet_tag:
+        snippet_tag = card.find('p')
+        
+    experience_snippet = snippet_tag.get_text(strip=True) if snippet_tag else "Licensed for X years"
+
+    return {
+        'Name': name,
+        'Profile Link': profile_link,
+        'Location': location_text,
+        'Avvo Rating': full_rating,
+        'Details Snippet': experience_snippet
+    }
+
+
+def parse_search_results(html_content, location):
+    """
+    Extracts lawyer profiles from a search results page.
+
+    Only depends on its arguments, so it can run in a worker process (see
+    scrape_scheduler.py) or on saved pages (see replay_fixtures.py).
+
+    Args:
+        html_content (str): The results page HTML.
+        location (str): The searched location, used when a card has none.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary represents a lawyer's profile.
+    """
+
+    # --- Step 2: Parse the HTML ---
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    lawyers_data = []
+
+    # --- Step 3: Find and Extract the Data ---
+    # Check if this is a "no results" page
+    if is_no_results_page(soup):
+        print("No lawyers found for this search. The search may be too specific.")
+        print("Consider using broader search terms like 'Immigration' instead of 'EB-1 Visa'")
+        return []
+    
+    # Try multiple selectors for lawyer cards
+    _, lawyer_cards = find_lawyer_cards(soup)
+
+    print(f"Found {len(lawyer_cards)} lawyer profiles on the page.")
+
+    if not lawyer_cards:
+        print("No lawyer cards found. Checking for alternative formats...")
+        
+        # Look for lawyer profile links directly
+        lawyers_data = parse_profile_links(soup, location)
+        if not lawyers_data:
+            print("No lawyer profiles found on this page.")
+        return lawyers_data
+
+    for card in lawyer_cards:
+        try:
+            lawyers_data.append(parse_lawyer_card(card, location))
+        except Exception as e:
+            print(f"Error parsing a lawyer card: {e}")
+            continue
+            
+    return lawyers_data
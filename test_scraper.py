@@ -8,8 +8,11 @@
 
 import requests
 from bs4 import BeautifulSoup
+import atexit
 import csv
-import time
+import queue
+import threading
+from functools import lru_cache
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
@@ -19,7 +22,122 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 
-def perform_search_and_get_page_source(search_query, location):
+from debug_artifacts import DebugArtifacts
+from lawyer_corpus import DEFAULT_PATH as CORPUS_PATH, LawyerCorpus, normalize_row
+from search_parser import parse_search_results
+
+PAGE_LOAD_TIMEOUT = 30  # seconds
+WAIT_TIMEOUT = 10       # seconds to wait for elements or navigation
+RESULTS_SELECTOR = "div[data-qa-id='lawyer-card'], .lawyer-card, .search-results, .results-list"
+
+def chrome_options():
+    """Headless Chrome options shared by every scraping session."""
+    options = Options()
+    # To see what the browser is doing, comment out the line below
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36")
+    return options
+
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    """Resolves (and if needed downloads) the chromedriver binary once per process."""
+    return ChromeDriverManager().install()
+
+def new_driver():
+    print("Setting up Selenium WebDriver...")
+    service = ChromeService(executable_path=chromedriver_path())
+    driver = webdriver.Chrome(service=service, options=chrome_options())
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+def wait_for_page_load(driver, timeout=WAIT_TIMEOUT):
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+class DriverPool:
+    """
+    Long-lived headless Chrome sessions reused across searches.
+
+    Browsers are started on first use, at most `size` of them; acquire() blocks while
+    they are all busy. A browser released after an error is quit instead of reused,
+    and a fresh one is started in its place when needed.
+    """
+
+    def __init__(self, size=1):
+        self.size = max(1, size)
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._drivers = []
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            driver = new_driver()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def release(self, driver, discard=False):
+        if discard:
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+        self._slots.release()
+
+    def _quit(self, driver):
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quits every browser. Call only when no session is in use."""
+        if self._drivers:
+            print("Closing the Selenium drivers.")
+        for driver in list(self._drivers):
+            self._quit(driver)
+        self._idle = queue.LifoQueue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_driver_pool = None
+
+def get_driver_pool():
+    """The shared single-browser pool used when no pool is passed in."""
+    global _driver_pool
+    if _driver_pool is None:
+        _driver_pool = DriverPool()
+        atexit.register(_driver_pool.close)
+    return _driver_pool
+
+_debug_artifacts = None
+
+def get_debug_artifacts():
+    """Shared debug dumps, configured from SCRAPER_DEBUG_* (off by default); see debug_artifacts.py."""
+    global _debug_artifacts
+    if _debug_artifacts is None:
+        _debug_artifacts = DebugArtifacts.from_env()
+        atexit.register(_debug_artifacts.close)
+    return _debug_artifacts
+
+def perform_search_and_get_page_source(search_query, location, pool=None, debug=None):
     """
     Automates a browser to perform a search on Avvo.com and returns the results page HTML.
     This mimics human behavior to avoid being blocked.
@@ -27,35 +145,28 @@ def perform_search_and_get_page_source(search_query, location):
     Args:
         search_query (str): The practice area to search for.
         location (str): The location to search in.
+        pool (DriverPool): Browsers to use (default: the shared single-browser pool).
+        debug (DebugArtifacts): Where to dump screenshots and HTML (default: the shared, env-configured one).
 
     Returns:
         str: The page source HTML of the search results, or None if an error occurs.
     """
-    # Setup Chrome options
-    chrome_options = Options()
-    # To see what the browser is doing, comment out the line below
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36")
-
+    pool = pool or get_driver_pool()
+    debug = debug or get_debug_artifacts()
     driver = None
+    failed = True
     try:
-        print("Setting up Selenium WebDriver...")
-        service = ChromeService(executable_path=ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.set_page_load_timeout(30)
+        driver = pool.acquire()
         
         # --- Step 1: Go to the homepage ---
         print("Navigating to Avvo homepage...")
         driver.get("https://www.avvo.com")
         
         # Wait for page to load
-        time.sleep(3)
+        wait_for_page_load(driver)
 
         # --- Step 2: Find input fields and type search terms ---
-        wait = WebDriverWait(driver, 10)
+        wait = WebDriverWait(driver, WAIT_TIMEOUT)
         
         print("Finding search input fields...")
         
@@ -82,6 +193,7 @@ def perform_search_and_get_page_source(search_query, location):
         
         # --- Step 3: Submit the search ---
         print("Submitting search...")
+        home_url = driver.current_url
         
         # Try multiple ways to submit
         try:
@@ -107,7 +219,11 @@ def perform_search_and_get_page_source(search_query, location):
         print("Waiting for search results page to load...")
         
         # Wait for URL change or results to appear
-        time.sleep(5)  # Give it time to load
+        try:
+            wait.until(EC.url_changes(home_url))
+            wait_for_page_load(driver)
+        except:
+            print("Warning: The search did not navigate away from the homepage...")
         
         # Check if we're on a results page
         current_url = driver.current_url
@@ -115,44 +231,27 @@ def perform_search_and_get_page_source(search_query, location):
         
         # Wait for lawyer cards or any results indicator
         try:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-qa-id='lawyer-card'], .lawyer-card, .search-results, .results-list")))
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, RESULTS_SELECTOR)))
         except:
             print("Warning: Could not find expected result elements, but continuing anyway...")
 
         print("Retrieving page source...")
         page_source = driver.page_source
 
-        # --- DEBUGGING STEP ---
-        screenshot_filename = "debug_screenshot.png"
-        driver.save_screenshot(screenshot_filename)
-        print(f"--> DEBUG: Screenshot saved to '{screenshot_filename}'")
-        
-        # Save HTML for debugging
-        with open("debug_page.html", "w", encoding="utf-8") as f:
-            f.write(page_source)
-        print("--> DEBUG: Page HTML saved to 'debug_page.html'")
-        # --- END DEBUGGING STEP ---
+        # --- DEBUGGING STEP (opt-in, sampled) ---
+        debug.capture(driver, f"search {search_query} {location}", page_source=page_source)
 
+        failed = False
         return page_source
     except Exception as e:
         print(f"An error occurred with Selenium: {e}")
         if driver:
-            error_screenshot_filename = "error_screenshot.png"
-            driver.save_screenshot(error_screenshot_filename)
-            print(f"--> DEBUG: Error screenshot saved to '{error_screenshot_filename}'")
-            
-            # Save error page HTML
-            try:
-                with open("error_page.html", "w", encoding="utf-8") as f:
-                    f.write(driver.page_source)
-                print("--> DEBUG: Error page HTML saved to 'error_page.html'")
-            except:
-                pass
+            debug.capture(driver, f"search {search_query} {location}", error=True)
         return None
     finally:
         if driver:
-            print("Closing the Selenium driver.")
-            driver.quit()
+            # A browser that hit an error may be in a bad state; start a fresh one next time
+            pool.release(driver, discard=failed)
 
 
 def scrape_lawyers(search_query, location):
@@ -174,151 +273,7 @@ def scrape_lawyers(search_query, location):
         print("Failed to fetch page content with Selenium.")
         return []
 
-    # --- Step 2: Parse the HTML ---
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    lawyers_data = []
-
-    # --- Step 3: Find and Extract the Data ---
-    # Check if this is a "no results" page
-    no_results_indicators = soup.find_all(string=lambda text: text and any(phrase in text.lower() for phrase in [
-        "try browsing in common practice areas",
-        "no results found",
-        "didn't find any lawyers",
-        "are you a lawyer?"
-    ]))
-    
-    if no_results_indicators:
-        print("No lawyers found for this search. The search may be too specific.")
-        print("Consider using broader search terms like 'Immigration' instead of 'EB-1 Visa'")
-        return []
-    
-    # Try multiple selectors for lawyer cards
-    lawyer_cards = soup.find_all('div', {'data-qa-id': 'lawyer-card'})
-    
-    if not lawyer_cards:
-        # Try alternative selectors
-        lawyer_cards = soup.find_all('div', class_='lawyer-card')
-    
-    if not lawyer_cards:
-        # Try more generic selectors
-        lawyer_cards = soup.find_all(['article', 'div'], class_=lambda x: x and ('lawyer' in x.lower() or 'attorney' in x.lower() or 'result' in x.lower()))
-
-    print(f"Found {len(lawyer_cards)} lawyer profiles on the page.")
-
-    if not lawyer_cards:
-        print("No lawyer cards found. Checking for alternative formats...")
-        
-        # Look for lawyer profile links directly
-        lawyer_links = soup.find_all('a', href=lambda x: x and ('/lawyer/' in x or '/professional/' in x))
-        
-        if lawyer_links:
-            print(f"Found {len(lawyer_links)} lawyer profile links")
-            # Try to extract basic info from links
-            for link in lawyer_links[:10]:  # Limit to first 10
-                try:
-                    name = link.get_text(strip=True)
-                    profile_link = link['href']
-                    if not profile_link.startswith('http'):
-                        profile_link = "https://www.avvo.com" + profile_link
-                    
-                    lawyers_data.append({
-                        'Name': name,
-                        'Profile Link': profile_link,
-                        'Location': location,  # Use search location as default
-                        'Avvo Rating': 'See profile',
-                        'Details Snippet': 'Visit profile for details'
-                    })
-                except Exception as e:
-                    continue
-            return lawyers_data
-        else:
-            print("No lawyer profiles found on this page.")
-            return []
-
-    for card in lawyer_cards:
-        try:
-            # Extract Lawyer Name and Profile Link
-            name_tag = card.find('a', {'data-qa-id': 'lawyer-name-link'})
-            if not name_tag:
-                # Try to find any link with attorney/lawyer in the href
-                name_tag = card.find('a', href=lambda x: x and ('/attorneys/' in x or '/lawyer/' in x))
-            if not name_tag:
-                # Try finding h2, h3, or h4 tags with lawyer name
-                name_tag = card.find(['h2', 'h3', 'h4'])
-            
-            name = name_tag.get_text(strip=True) if name_tag else "Name not found"
-            
-            # Extract profile link
-            if name_tag and name_tag.name == 'a':
-                profile_link = name_tag.get('href', 'Link not found')
-            else:
-                # If name wasn't in a link, find the profile link separately
-                link_tag = card.find('a', href=lambda x: x and ('/attorneys/' in x or '/lawyer/' in x))
-                profile_link = link_tag.get('href', 'Link not found') if link_tag else "Link not found"
-            
-            if profile_link != "Link not found" and not profile_link.startswith('http'):
-                profile_link = "https://www.avvo.com" + profile_link
-
-            # Extract Location
-            location_tag = card.find('div', {'data-qa-id': 'lawyer-location'})
-            if not location_tag:
-                # Look for location in address or span tags
-                location_tag = card.find(['address', 'span', 'div'], string=lambda x: x and (', ' in x and 
-                    any(state in x for state in ['NY', 'New York', 'CA', 'FL', 'TX', 'PA', 'NJ'])))
-            location_text = location_tag.get_text(strip=True) if location_tag else location
-
-            # Extract Avvo Rating and Review Count
-            rating_text = "Rating not found"
-            review_count = ""
-            
-            # Look for rating spans
-            rating_spans = card.find_all('span', class_=['sr-only', 'text-truncate'])
-            for span in rating_spans:
-                text = span.get_text(strip=True)
-                if 'Avvo Rating' in text:
-                    # Extract rating number
-                    import re
-                    rating_match = re.search(r'(\d+\.?\d*)', text)
-                    if rating_match:
-                        rating_text = rating_match.group(1)
-                elif 'review' in text.lower():
-                    review_count = f" ({text})"
-            
-            # Alternative: look for rating in strong tags
-            if rating_text == "Rating not found":
-                strong_tag = card.find('strong')
-                if strong_tag:
-                    rating_text = strong_tag.get_text(strip=True)
-            
-            full_rating = rating_text + review_count
-            
-            # Extract Snippet / Experience
-            snippet_tag = card.find('div', {'data-qa-id': 'lawyer-snippet'})
-            if not snippet_tag:
-                # Look for practice areas or description
-                snippet_tag = card.find(['p', 'div'], class_=lambda x: x and any(word in str(x).lower() 
-                    for word in ['practice', 'area', 'description', 'experience', 'focus']))
-            
-            # If still not found, get any paragraph text
-            if not snippet_tag:
-                snippet_tag = card.find('p')
-                
-            experience_snippet = snippet_tag.get_text(strip=True) if snippet_tag else "Licensed for X years"
-
-            lawyers_data.append({
-                'Name': name,
-                'Profile Link': profile_link,
-                'Location': location_text,
-                'Avvo Rating': full_rating,
-                'Details Snippet': experience_snippet
-            })
-
-        except Exception as e:
-            print(f"Error parsing a lawyer card: {e}")
-            continue
-            
-    return lawyers_data
+    return parse_search_results(html_content, location)
 
 def save_to_csv(data, filename="lawyers.csv"):
     """
@@ -341,13 +296,65 @@ def save_to_csv(data, filename="lawyers.csv"):
     
     print(f"Data successfully saved to {filename}")
 
-def scrape_lawyers_direct_url(practice_area_slug, location_slug):
+def load_page_source(url, pool=None, debug=None):
+    """
+    Loads a results page in a pooled browser and returns its HTML once the results appear.
+
+    Args:
+        url (str): The page to load.
+        pool (DriverPool): Browsers to use (default: the shared single-browser pool).
+        debug (DebugArtifacts): Where to dump screenshots and HTML (default: the shared, env-configured one).
+
+    Returns:
+        str: The page source HTML, or None if an error occurs.
+    """
+    pool = pool or get_driver_pool()
+    debug = debug or get_debug_artifacts()
+    driver = None
+    failed = True
+    try:
+        driver = pool.acquire()
+        driver.get(url)
+        try:
+            WebDriverWait(driver, WAIT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, RESULTS_SELECTOR)))
+        except:
+            print("Warning: Could not find expected result elements, but continuing anyway...")
+        page_source = driver.page_source
+        debug.capture(driver, url.split('://', 1)[-1], page_source=page_source)
+        failed = False
+        return page_source
+    except Exception as e:
+        print(f"Error loading {url}: {e}")
+        if driver:
+            debug.capture(driver, url.split('://', 1)[-1], error=True)
+        return None
+    finally:
+        if driver:
+            pool.release(driver, discard=failed)
+
+def save_to_corpus(data, path=CORPUS_PATH, source="test_scraper"):
+    """
+    Upserts the extracted lawyer data into the lawyer corpus (see lawyer_corpus.py).
+
+    Lawyers already in the corpus are updated in place, keyed by profile link; rows
+    without a profile link are skipped.
+
+    Args:
+        data (list): A list of lawyer dictionaries.
+        path (str): The corpus file.
+        source (str): Recorded as where the rows came from.
+    """
+    rows = LawyerCorpus(path).upsert(normalize_row(lawyer, source) for lawyer in data)
+    print(f"Saved {rows} of {len(data)} lawyers to {path}")
+
+def scrape_lawyers_direct_url(practice_area_slug, location_slug, pool=None):
     """
     Alternative approach: Navigate directly to practice area page.
     
     Args:
         practice_area_slug (str): URL slug for practice area (e.g., "immigration-lawyer")
         location_slug (str): URL slug for location (e.g., "ny/new_york")
+        pool (DriverPool): Browsers to use (default: the shared single-browser pool).
     
     Returns:
         list: A list of lawyer dictionaries
@@ -355,21 +362,11 @@ def scrape_lawyers_direct_url(practice_area_slug, location_slug):
     url = f"https://www.avvo.com/{practice_area_slug}/{location_slug}.html"
     print(f"\nTrying direct URL approach: {url}")
     
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36")
-    
-    driver = None
+    html_content = load_page_source(url, pool)
+    if not html_content:
+        return []
+
     try:
-        service = ChromeService(executable_path=ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.get(url)
-        time.sleep(3)  # Wait for page to load
-        
-        html_content = driver.page_source
         soup = BeautifulSoup(html_content, 'html.parser')
         
         # Parse the page using the same extraction logic
@@ -409,9 +406,6 @@ def scrape_lawyers_direct_url(practice_area_slug, location_slug):
     except Exception as e:
         print(f"Error with direct URL approach: {e}")
         return []
-    finally:
-        if driver:
-            driver.quit()
 
 
 # --- Main execution block ---
@@ -429,7 +423,8 @@ if __name__ == "__main__":
         scraped_data = scrape_lawyers_direct_url("immigration-lawyer", "ny/new_york")
     
     if scraped_data:
-        save_to_csv(scraped_data)
+        save_to_corpus(scraped_data)
+        print("Export it as CSV with: python lawyer_corpus.py export lawyers.csv")
     else:
         print("\nScraping finished with no data.")
         print("\nAlternative: You can also try browsing lawyers directly:")
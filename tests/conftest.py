@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper scripts import each other flat (e.g. "from search_parser import ..."), as when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from benchmark_parser import find_profile_pages, reference_eb1_mentions
+from profile_parser import scan_eb1_mentions
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = find_profile_pages() + [os.path.join(REPO_ROOT, 'debug_page.html')]
+
+
+def test_profile_fixtures_are_committed():
+    assert len(PAGES) > 1
+
+
+@pytest.mark.parametrize('path', PAGES, ids=os.path.basename)
+def test_single_pass_matches_tree_scans(path):
+    with open(path, 'rb') as f:
+        html = f.read()
+    assert scan_eb1_mentions(html) == reference_eb1_mentions(html)
+    # Decoded text takes the same path as lawyer_finder's response.text
+    text = html.decode('utf-8', errors='replace')
+    assert scan_eb1_mentions(text) == reference_eb1_mentions(text)
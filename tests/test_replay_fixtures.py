@@ -0,0 +1,20 @@
+import json
+
+from replay_fixtures import PROFILES, RESULTS, SNAPSHOT_PATH, compare_snapshot, find_fixtures, replay
+
+
+def test_replayed_pages_match_snapshot():
+    with open(SNAPSHOT_PATH, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    output = replay(find_fixtures())
+
+    assert 'debug_page.html' in output
+    assert compare_snapshot(output, snapshot) == []
+
+
+def test_debug_page_cards():
+    fixtures = find_fixtures()
+    cards = replay({RESULTS: fixtures[RESULTS], PROFILES: []})['debug_page.html']
+    linked = [card for card in cards if card['Profile Link'].startswith('https://www.avvo.com/attorneys/')]
+    assert len(linked) == 31
+    assert all(card['Name'] != 'Name not found' for card in linked)